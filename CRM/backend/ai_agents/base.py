@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import logging
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Iterable, Optional
 
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
 from core.db import SessionLocal
@@ -46,6 +47,29 @@ class AgentBase:
         logger.info("[%s] Insight recorded id=%s", self.name, insight.id)
         return insight
 
+    def add_insights(self, insights: Iterable[dict]) -> int:
+        """
+        Record many insights (``add_insight`` keyword arguments) with one
+        executemany INSERT and one commit; returns how many were written.
+        """
+        rows = [
+            {
+                "agent_name": self.name,
+                "level": insight.get("level", "info"),
+                "entity_type": insight.get("entity_type", "general"),
+                "entity_id": str(insight.get("entity_id", "-")),
+                "title": insight["title"],
+                "body": insight["body"],
+                "meta": insight.get("meta") or {},
+            }
+            for insight in insights
+        ]
+        if rows:
+            self.db.execute(insert(AIInsight), rows)
+            self.db.commit()
+        logger.info("[%s] %d insights recorded", self.name, len(rows))
+        return len(rows)
+
     def add_task(
         self,
         description: str,
@@ -1,55 +1,79 @@
 from __future__ import annotations
 
-from sqlalchemy import inspect, text
+import uuid
+from collections import Counter
+
+from sqlalchemy import inspect
 
 from ai_agents.base import AgentBase
+from services import dedup
+
+KIND_LABELS = {"doctor": "doctor", "pharmacy": "pharmacy", "hcp": "HCP"}
+# Records named in one suggestion's body; meta always lists them all.
+BODY_RECORDS = 10
 
 
 class DataQualityAgent(AgentBase):
     name = "data_quality_agent"
 
     async def run(self) -> None:
-        engine = self.db.get_bind()
-        inspector = inspect(engine)
-        if "pharmacies" not in inspector.get_table_names():
+        tables = set(inspect(self.db.get_bind()).get_table_names())
+        missing = sorted({"doctors", "pharmacies", "hcps"} - tables)
+        if missing:
             self.add_insight(
-                title="Pharmacies table missing",
-                body="Could not find pharmacies table to check duplicates.",
+                title="Master data tables missing",
+                body=f"Could not find {', '.join(missing)} to check for duplicates.",
                 level="warning",
                 entity_type="data_quality",
-                entity_id="pharmacies",
+                entity_id=",".join(missing),
             )
             return
 
-        duplicates = list(
-            self.db.execute(
-                text(
-                    """
-                    SELECT lower(name) AS name_key,
-                           lower(coalesce(city, '')) AS city_key,
-                           lower(coalesce(area, '')) AS area_key,
-                           COUNT(*) AS cnt
-                    FROM pharmacies
-                    GROUP BY name_key, city_key, area_key
-                    HAVING COUNT(*) > 1
-                    """
-                )
-            )
-        )
-        if duplicates:
-            for dup in duplicates:
-                self.add_insight(
-                    title="Duplicate pharmacy detected",
-                    body=f"Name='{dup.name_key}', city='{dup.city_key}', area='{dup.area_key}', count={dup.cnt}.",
-                    level="warning",
-                    entity_type="pharmacy",
-                    entity_id=dup.name_key,
-                )
-        else:
+        records = dedup.load_records(self.db)
+        clusters = dedup.find_duplicates(records)
+        if not clusters:
             self.add_insight(
-                title="Pharmacy data quality OK",
-                body="No duplicate pharmacies detected by name+city+area heuristic.",
+                title="Master data quality OK",
+                body=f"No likely duplicates among {len(records)} doctors, pharmacies and HCPs.",
                 level="info",
-                entity_type="pharmacy",
+                entity_type="data_quality",
                 entity_id="all",
             )
+            return
+
+        # One batch per run: every suggestion carries its id so the batch can be reviewed (or discarded) together.
+        batch = uuid.uuid4().hex
+        per_kind = Counter(cluster.kind for cluster in clusters)
+        summary = ", ".join(f"{count} {KIND_LABELS[kind]}" for kind, count in sorted(per_kind.items()))
+        insights = [
+            {
+                "title": "Duplicate scan finished",
+                "body": f"{len(clusters)} merge suggestions ({summary}) from {len(records)} records.",
+                "level": "info",
+                "entity_type": "data_quality",
+                "entity_id": batch,
+                "meta": {"batch": batch, "records": len(records), "suggestions": dict(per_kind)},
+            }
+        ]
+        for cluster in clusters:
+            label = KIND_LABELS[cluster.kind]
+            listed = "; ".join(f"#{record.id} {record.name}" for record in cluster.records[:BODY_RECORDS])
+            more = len(cluster.records) - BODY_RECORDS
+            insights.append(
+                {
+                    "title": f"Possible duplicate {label}",
+                    "body": f"{len(cluster.records)} {label} records look like the same account: {listed}"
+                    + (f" and {more} more" if more > 0 else "")
+                    + f". Keep #{cluster.keep.id} and merge the others.",
+                    "level": "warning",
+                    "entity_type": cluster.kind,
+                    "entity_id": cluster.keep.id,
+                    "meta": {
+                        "batch": batch,
+                        "keep": cluster.keep.id,
+                        "merge": [record.id for record in cluster.merge],
+                        "score": cluster.score,
+                    },
+                }
+            )
+        self.add_insights(insights)
@@ -3,6 +3,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import os
+import time
 
 from ai_agents.collection_planner_agent import CollectionPlannerAgent
 from ai_agents.content_helper_agent import ContentHelperAgent
@@ -11,6 +12,8 @@ from ai_agents.data_quality_agent import DataQualityAgent
 from ai_agents.sales_trend_agent import SalesTrendAgent
 from ai_agents.stock_risk_agent import StockRiskAgent
 
+from core.metrics import agent_runs
+
 logger = logging.getLogger(__name__)
 
 
@@ -24,12 +27,16 @@ async def run_agents_once() -> None:
         ContentHelperAgent(),
     ]
     for agent in agents:
+        started = time.perf_counter()
+        outcome = "ok"
         try:
             await agent.run()
         except Exception as exc:  # noqa: BLE001
+            outcome = "error"
             logger.exception("Agent %s failed: %s", agent.name, exc)
         finally:
             agent.close()
+            agent_runs.observe(agent.name, outcome, value=time.perf_counter() - started)
 
 
 async def run_scheduled() -> None:
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 
-from api import admin_ai, dev, hcps
+from api import admin_ai, admin_profiles, dev, hcps
 from api.v1 import router as api_v1_router
 from core.security import require_roles
 from dpm_ledger import router as dpm_ledger_router
@@ -23,4 +23,9 @@ api_router.include_router(
     prefix="/admin/ai",
     tags=["admin_ai"],
 )
+api_router.include_router(
+    admin_profiles.router,
+    prefix="/admin/profiles",
+    tags=["admin_profiles"],
+)
 api_router.include_router(dev.router, prefix="/dev", tags=["default"])
@@ -3,6 +3,7 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
+from api.v1.utils import TotalMode, paginate
 from core.db import get_db
 from core.security import require_roles
 from models.ai import AIInsight, AIMessageDraft, AITask, CollectionPlan
@@ -17,19 +18,15 @@ from schemas.ai import (
 router = APIRouter()
 
 
-def _paginate(query, page: int, page_size: int, order_by_column):
-    total = query.count()
-    items = (
-        query.order_by(order_by_column)
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
+def _paginate(query, page: int, page_size: int, order_by_column, total_mode: TotalMode = "exact"):
+    items, count = paginate(query.order_by(order_by_column), page, page_size, total_mode)
     meta = {
         "page": page,
         "page_size": page_size,
-        "total": total,
-        "total_pages": (total + page_size - 1) // page_size if total else 0,
+        "total": count.total,
+        "total_pages": None if count.total is None else (count.total + page_size - 1) // page_size,
+        "has_more": count.has_more,
+        "total_estimated": count.estimated,
     }
     return items, meta
 
@@ -38,6 +35,7 @@ def _paginate(query, page: int, page_size: int, order_by_column):
 def list_insights(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=200),
+    total_mode: TotalMode = "exact",
     agent_name: str | None = None,
     entity_type: str | None = None,
     user=Depends(require_roles("admin", "sales_manager")),
@@ -48,7 +46,7 @@ def list_insights(
         query = query.filter(AIInsight.agent_name == agent_name)
     if entity_type:
         query = query.filter(AIInsight.entity_type == entity_type)
-    items, meta = _paginate(query, page, page_size, AIInsight.created_at.desc())
+    items, meta = _paginate(query, page, page_size, AIInsight.created_at.desc(), total_mode)
     data = [AIInsightOut.model_validate(item) for item in items]
     return {"data": data, "meta": meta}
 
@@ -57,6 +55,7 @@ def list_insights(
 def list_tasks(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=200),
+    total_mode: TotalMode = "exact",
     status_filter: str | None = Query(default=None, alias="status"),
     user=Depends(require_roles("admin", "sales_manager")),
     db: Session = Depends(get_db),
@@ -64,7 +63,7 @@ def list_tasks(
     query = db.query(AITask)
     if status_filter:
         query = query.filter(AITask.status == status_filter)
-    items, meta = _paginate(query, page, page_size, AITask.created_at.desc())
+    items, meta = _paginate(query, page, page_size, AITask.created_at.desc(), total_mode)
     data = [AITaskOut.model_validate(item) for item in items]
     return {"data": data, "meta": meta}
 
@@ -90,6 +89,7 @@ def update_task(
 def list_drafts(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=200),
+    total_mode: TotalMode = "exact",
     channel: str | None = None,
     user=Depends(require_roles("admin", "sales_manager")),
     db: Session = Depends(get_db),
@@ -97,19 +97,7 @@ def list_drafts(
     query = db.query(AIMessageDraft)
     if channel:
         query = query.filter(AIMessageDraft.channel == channel)
-    total = query.count()
-    items = (
-        query.order_by(AIMessageDraft.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
-    meta = {
-        "page": page,
-        "page_size": page_size,
-        "total": total,
-        "total_pages": (total + page_size - 1) // page_size if total else 0,
-    }
+    items, meta = _paginate(query, page, page_size, AIMessageDraft.created_at.desc(), total_mode)
     data = [AIMessageDraftOut.model_validate(item) for item in items]
     return {"data": data, "meta": meta}
 
@@ -118,6 +106,7 @@ def list_drafts(
 def list_collection_plan(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=50, ge=1, le=200),
+    total_mode: TotalMode = "exact",
     status_filter: str | None = Query(default=None, alias="status"),
     user=Depends(require_roles("admin", "sales_manager")),
     db: Session = Depends(get_db),
@@ -125,18 +114,6 @@ def list_collection_plan(
     query = db.query(CollectionPlan)
     if status_filter:
         query = query.filter(CollectionPlan.status == status_filter)
-    total = query.count()
-    items = (
-        query.order_by(CollectionPlan.planned_date.asc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
-    meta = {
-        "page": page,
-        "page_size": page_size,
-        "total": total,
-        "total_pages": (total + page_size - 1) // page_size if total else 0,
-    }
+    items, meta = _paginate(query, page, page_size, CollectionPlan.planned_date.asc(), total_mode)
     data = [CollectionPlanOut.model_validate(item) for item in items]
     return {"data": data, "meta": meta}
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import FileResponse
+
+from core.profiling import list_profiles, profile_path
+from core.security import require_roles
+
+router = APIRouter(dependencies=[Depends(require_roles("admin"))])
+
+
+@router.get("", response_model=list[dict])
+def recent_profiles(limit: int = Query(default=50, ge=1, le=500)) -> list[dict]:
+    """Most recent request profiles first (metadata only)."""
+    return list_profiles(limit)
+
+
+@router.get("/{profile_id}", response_class=FileResponse)
+def download_profile(profile_id: str) -> FileResponse:
+    """Folded stacks for ``flamegraph.pl`` or https://www.speedscope.app."""
+    path = profile_path(profile_id)
+    if path is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found.")
+    return FileResponse(path, media_type="text/plain; charset=utf-8", filename=path.name)
@@ -6,6 +6,7 @@ from typing import List, Tuple
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
+from api.v1.utils import PageCount, TotalMode, paginate
 from core.db import get_db
 from models.hcp import HCP
 from schemas.hcp import HCPCreate, HCPOut, HCPUpdate
@@ -15,32 +16,29 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
-def _paginate(query, page: int, page_size: int) -> Tuple[List[HCP], int]:
-    total = query.count()
-    items = (
-        query.order_by(HCP.last_name.asc(), HCP.first_name.asc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
-    )
-    return items, total
+def _paginate(query, page: int, page_size: int, total_mode: TotalMode) -> Tuple[List[HCP], PageCount]:
+    ordered = query.order_by(HCP.last_name.asc(), HCP.first_name.asc(), HCP.id.asc())
+    return paginate(ordered, page, page_size, total_mode)
 
 
 @router.get("", response_model=dict)
 def list_hcps(
     page: int = Query(default=1, ge=1),
     page_size: int = Query(default=25, ge=1, le=100),
+    total_mode: TotalMode = "exact",
     db: Session = Depends(get_db),
 ):
     query = db.query(HCP).filter(HCP.is_active.is_(True))
-    hcps, total = _paginate(query, page, page_size)
+    hcps, count = _paginate(query, page, page_size, total_mode)
 
     data = [HCPOut.model_validate(hcp) for hcp in hcps]
     meta = {
         "page": page,
         "page_size": page_size,
-        "total": total,
-        "total_pages": (total + page_size - 1) // page_size if total else 0,
+        "total": count.total,
+        "total_pages": None if count.total is None else (count.total + page_size - 1) // page_size,
+        "has_more": count.has_more,
+        "total_estimated": count.estimated,
     }
     return {"data": data, "meta": meta}
 
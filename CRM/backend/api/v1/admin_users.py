@@ -5,7 +5,7 @@ from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
 from core.db import get_db
-from core.security import get_current_user, require_roles
+from core.security import get_current_user, invalidate_user_cache, require_roles
 from models.crm import RepProfile, Role, Territory, User
 from schemas.user import AdminUserCreate, AdminUserOut, AdminUserUpdate, SalesRepInfo
 from services.auth import hash_password
@@ -176,5 +176,6 @@ def update_admin_user(
             db.delete(user.rep_profile)
 
     db.commit()
+    invalidate_user_cache(user.id)
     db.refresh(user)
     return _serialize_admin_user(user)
@@ -5,18 +5,30 @@ from sqlalchemy.orm import Session
 
 from core.config import settings
 from core.db import get_db
-from core.security import get_current_user
-from models.crm import User
+from core.security import CurrentUser, get_current_user
 from schemas.auth import AuthResponse, BootstrapRequest, LoginRequest
 from schemas.user import UserOut
-from services.auth import authenticate, bootstrap_admin, has_admin_user, issue_token
+from services.auth import (
+    PasswordPoolSaturated,
+    authenticate_async,
+    bootstrap_admin,
+    has_admin_user,
+    issue_token,
+)
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 
 @router.post("/login", response_model=AuthResponse)
-def login(payload: LoginRequest, db: Session = Depends(get_db)) -> AuthResponse:
-    user = authenticate(db, payload.email, payload.password)
+async def login(payload: LoginRequest, db: Session = Depends(get_db)) -> AuthResponse:
+    try:
+        user = await authenticate_async(db, payload.email, payload.password)
+    except PasswordPoolSaturated as exc:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many login attempts in progress. Please retry shortly.",
+            headers={"Retry-After": "1"},
+        ) from exc
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -51,5 +63,5 @@ def bootstrap(payload: BootstrapRequest, db: Session = Depends(get_db)) -> AuthR
 
 
 @router.get("/me", response_model=UserOut)
-def me(current_user: User = Depends(get_current_user)) -> User:
+def me(current_user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
     return current_user
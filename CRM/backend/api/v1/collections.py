@@ -5,8 +5,9 @@ from datetime import date
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, clamp_page_size, paginate
+from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, TotalMode, clamp_page_size, paginate
 from core.db import get_db
+from core.responses import model_response
 from core.security import get_current_user, require_roles
 from models.crm import Collection, Doctor, Pharmacy
 from schemas.common import PaginatedResponse
@@ -23,6 +24,7 @@ router = APIRouter(
 def list_collections(
     page: int = Query(DEFAULT_PAGE, ge=1),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    total_mode: TotalMode = "exact",
     date_from: date | None = None,
     date_to: date | None = None,
     db: Session = Depends(get_db),
@@ -34,11 +36,9 @@ def list_collections(
         query = query.filter(Collection.collection_date <= date_to)
 
     page_size = clamp_page_size(page_size)
-    items, total = paginate(query.order_by(Collection.collection_date.desc()), page, page_size)
-    total_pages = max(1, (total + page_size - 1) // page_size)
-    return PaginatedResponse(
-        data=items,
-        pagination={"page": page, "page_size": page_size, "total": total, "total_pages": total_pages},
+    items, count = paginate(query.order_by(Collection.collection_date.desc()), page, page_size, total_mode)
+    return model_response(
+        PaginatedResponse[CollectionOut](data=items, pagination=count.pagination(page, page_size))
     )
 
 
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from sqlalchemy import func, or_
+from sqlalchemy import case, func, or_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
-from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, clamp_page_size, paginate
+from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, TotalMode, clamp_page_size, paginate
 from core.db import get_db
+from core.responses import model_response
 from core.security import get_current_user, require_roles
 from models.crm import Doctor, RouteAccount
 from schemas.common import PaginatedResponse
 from schemas.crm import DoctorCreate, DoctorOut, DoctorUpdate
+from services import search as account_search
+from services.fuzzy import MAX_MATCHES, account_names
 
 router = APIRouter(
     prefix="/doctors",
@@ -22,10 +26,12 @@ router = APIRouter(
 def list_doctors(
     page: int = Query(DEFAULT_PAGE, ge=1),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    total_mode: TotalMode = "exact",
     area: str | None = None,
     city: str | None = None,
     classification: str | None = Query(None, pattern="^[ABC]$"),
     search: str | None = None,
+    fuzzy: bool = False,
     route_id: int | None = None,
     db: Session = Depends(get_db),
 ) -> PaginatedResponse[DoctorOut]:
@@ -36,7 +42,17 @@ def list_doctors(
         query = query.filter(Doctor.city.ilike(f"%{city}%"))
     if classification:
         query = query.filter(Doctor.classification == classification)
-    if search:
+    ordering = (Doctor.name.asc(),)
+    ranked = account_search.ranked_matches(account_search.DOCTORS, search) if search and not fuzzy else None
+    if search and fuzzy:
+        ids = [match.id for match in account_names.search(search, limit=MAX_MATCHES, kinds=("doctor",))]
+        query = query.filter(Doctor.id.in_(ids))
+        if ids:
+            ordering = (case({doctor_id: position for position, doctor_id in enumerate(ids)}, value=Doctor.id),)
+    elif ranked is not None:
+        query = query.join(ranked, ranked.c.id == Doctor.id)
+        ordering = (ranked.c.rank.asc(), Doctor.name.asc())
+    elif search:
         lowered = f"%{search.lower()}%"
         query = query.filter(or_(func.lower(Doctor.name).like(lowered), func.lower(Doctor.clinic).like(lowered)))
     if route_id:
@@ -47,11 +63,9 @@ def list_doctors(
         )
 
     page_size = clamp_page_size(page_size)
-    doctors, total = paginate(query.order_by(Doctor.name.asc()), page, page_size)
-    total_pages = max(1, (total + page_size - 1) // page_size)
-    return PaginatedResponse(
-        data=doctors,
-        pagination={"page": page, "page_size": page_size, "total": total, "total_pages": total_pages},
+    doctors, count = paginate(query.order_by(*ordering), page, page_size, total_mode)
+    return model_response(
+        PaginatedResponse[DoctorOut](data=doctors, pagination=count.pagination(page, page_size))
     )
 
 
@@ -66,6 +80,7 @@ def create_doctor(payload: DoctorCreate, db: Session = Depends(get_db)) -> Docto
     db.add(doctor)
     db.commit()
     db.refresh(doctor)
+    account_names.upsert("doctor", doctor.id, doctor.name)
     return doctor
 
 
@@ -91,6 +106,7 @@ def update_doctor(doctor_id: int, payload: DoctorUpdate, db: Session = Depends(g
         setattr(doctor, key, value)
     db.commit()
     db.refresh(doctor)
+    account_names.upsert("doctor", doctor.id, doctor.name)
     return doctor
 
 
@@ -105,5 +121,13 @@ def delete_doctor(doctor_id: int, db: Session = Depends(get_db)) -> Response:
     if not doctor:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found.")
     db.delete(doctor)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Doctor is referenced by other records.",
+        ) from exc
+    account_names.discard("doctor", doctor_id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
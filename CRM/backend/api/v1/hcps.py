@@ -1,14 +1,23 @@
 from __future__ import annotations
 
-from typing import Optional
+import tempfile
+from typing import Literal, Optional, Union
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import func, or_
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from sqlalchemy import Row, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from sqlalchemy.sql import Subquery
+from starlette.concurrency import run_in_threadpool
 
-from core.db import get_db
+from api.v1.utils import TotalMode, paginate_async
+from core.config import settings
+from core.db import get_async_db, get_db, iter_partitions
+from core.responses import json_response, ndjson_response
 from core.security import get_current_user, require_roles
 from models.hcp import HCP
+from services import hcp_import
+from services import search as account_search
 
 router = APIRouter(
     prefix="/hcps",
@@ -18,10 +27,29 @@ router = APIRouter(
 
 DEFAULT_PAGE = 1
 DEFAULT_PAGE_SIZE = 25
-MAX_PAGE_SIZE = 5000
+MAX_PAGE_SIZE = 500
+# Rows fetched, serialized and written per chunk of a format=ndjson listing.
+NDJSON_BATCH_ROWS = 1000
+# Uploads larger than this spill from memory to a temporary file while they arrive.
+IMPORT_SPOOL_BYTES = 8 * 1024 * 1024
 
 
-def _serialize_hcp(hcp: HCP) -> dict:
+# Columns _serialize_hcp reads; listings select just these instead of whole entities.
+_HCP_COLUMNS = (
+    HCP.id,
+    HCP.first_name,
+    HCP.last_name,
+    HCP.area,
+    HCP.specialty,
+    HCP.city,
+    HCP.phone,
+    HCP.email,
+    HCP.created_at,
+    HCP.updated_at,
+)
+
+
+def _serialize_hcp(hcp: Union[HCP, Row]) -> dict:
     name = f"{hcp.first_name} {hcp.last_name}".strip()
     return {
         "id": hcp.id,
@@ -43,11 +71,14 @@ def _apply_filters(
     query,
     *,
     search: Optional[str],
+    ranked: Optional[Subquery],
     area_tag: Optional[str],
     specialty: Optional[str],
     segment: Optional[str],
 ):
-    if search:
+    if ranked is not None:
+        query = query.join(ranked, ranked.c.id == HCP.id)
+    elif search:
         term = f"%{search.strip().lower()}%"
         query = query.filter(
             or_(
@@ -71,48 +102,64 @@ def _apply_filters(
 
 
 @router.get("", response_model=dict)
-def list_hcps(
+async def list_hcps(
     page: int = Query(DEFAULT_PAGE, ge=1),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, alias="pageSize"),
+    total_mode: TotalMode = Query("exact", alias="totalMode"),
     search: Optional[str] = None,
     area_tag: Optional[str] = Query(default=None, alias="areaTag"),
     specialty: Optional[str] = None,
     segment: Optional[str] = None,
-    db: Session = Depends(get_db),
+    output_format: Literal["json", "ndjson"] = Query("json", alias="format"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    query = db.query(HCP).filter(HCP.is_active.is_(True))
+    """
+    ``format=ndjson`` streams every matching HCP, one JSON object per line, in
+    the listing's order; paging parameters are ignored and memory use stays flat.
+    """
+    query = select(*_HCP_COLUMNS).filter(HCP.is_active.is_(True))
+    ranked = account_search.ranked_matches(account_search.HCPS, search) if search else None
     query = _apply_filters(
         query,
         search=search,
+        ranked=ranked,
         area_tag=area_tag,
         specialty=specialty,
         segment=segment,
     )
 
-    total = query.count()
-    items = (
-        query.order_by(HCP.last_name.asc(), HCP.first_name.asc())
-        .offset((page - 1) * page_size)
-        .limit(page_size)
-        .all()
+    ordering = (HCP.last_name.asc(), HCP.first_name.asc(), HCP.id.asc())
+    if ranked is not None:
+        ordering = (ranked.c.rank.asc(), *ordering)
+    if output_format == "ndjson":
+        partitions = iter_partitions(query.order_by(*ordering), NDJSON_BATCH_ROWS)
+        return ndjson_response([_serialize_hcp(item) for item in rows] for rows in partitions)
+    items, count = await paginate_async(
+        db,
+        query.order_by(*ordering),
+        page,
+        page_size,
+        total_mode,
     )
 
-    total_pages = (total + page_size - 1) // page_size if total else 0
     data = [_serialize_hcp(item) for item in items]
-    return {
+    payload = {
         "data": data,
         "meta": {
             "page": page,
             "pageSize": page_size,
-            "total": total,
-            "totalPages": total_pages,
+            "total": count.total,
+            "totalPages": None if count.total is None else (count.total + page_size - 1) // page_size,
+            "hasMore": count.has_more,
+            "totalEstimated": count.estimated,
         },
     }
+    return json_response(payload)
 
 
 @router.get("/{hcp_id}", response_model=dict)
-def get_hcp(hcp_id: int, db: Session = Depends(get_db)) -> dict:
-    hcp = db.query(HCP).filter(HCP.id == hcp_id, HCP.is_active.is_(True)).first()
+async def get_hcp(hcp_id: int, db: AsyncSession = Depends(get_async_db)) -> dict:
+    hcp = await db.scalar(select(HCP).where(HCP.id == hcp_id, HCP.is_active.is_(True)))
     if not hcp:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="HCP not found.")
     return _serialize_hcp(hcp)
@@ -131,9 +178,7 @@ def create_hcp(
     name = str(payload.get("name") or "").strip()
     if not name:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Name is required.")
-    parts = name.split()
-    first_name = parts[0]
-    last_name = " ".join(parts[1:]) if len(parts) > 1 else "-"
+    first_name, last_name = hcp_import.split_name(name)
 
     hcp = HCP(
         first_name=first_name,
@@ -151,6 +196,44 @@ def create_hcp(
     return _serialize_hcp(hcp)
 
 
+@router.post(
+    "/import",
+    response_model=dict,
+    dependencies=[Depends(require_roles("sales_manager", "admin"))],
+)
+async def import_hcp_file(
+    request: Request,
+    file_format: Optional[str] = Query(default=None, alias="format", pattern="^(csv|xlsx)$"),
+    db: Session = Depends(get_db),
+):
+    """
+    Upsert HCPs from a CSV or XLSX file sent as the request body (not a
+    multipart form). The format comes from ``format``, else the Content-Type,
+    else the file's first bytes.
+    """
+    with tempfile.SpooledTemporaryFile(max_size=IMPORT_SPOOL_BYTES) as upload:
+        received = 0
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > settings.hcp_import_max_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"Import files are limited to {settings.hcp_import_max_bytes} bytes.",
+                )
+            upload.write(chunk)
+        if not received:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="The request body is empty.")
+        upload.seek(0)
+        file_format = file_format or hcp_import.detect_format(request.headers.get("content-type"), upload.read(4))
+        upload.seek(0)
+        rows = hcp_import.read_xlsx(upload) if file_format == "xlsx" else hcp_import.read_csv(upload)
+        try:
+            report = await run_in_threadpool(hcp_import.import_hcps, db, rows)
+        except hcp_import.ImportFormatError as exc:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+    return json_response(report.as_dict())
+
+
 @router.put(
     "/{hcp_id}",
     response_model=dict,
@@ -166,9 +249,7 @@ def update_hcp(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="HCP not found.")
 
     if "name" in payload and payload.get("name"):
-        parts = str(payload["name"]).strip().split()
-        hcp.first_name = parts[0]
-        hcp.last_name = " ".join(parts[1:]) if len(parts) > 1 else "-"
+        hcp.first_name, hcp.last_name = hcp_import.split_name(str(payload["name"]))
     for key in ("specialty", "phone", "email", "clinic_address", "area", "city"):
         if key in payload:
             setattr(hcp, key, payload.get(key))
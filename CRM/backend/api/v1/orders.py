@@ -4,14 +4,16 @@ from datetime import date
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session, joinedload, selectinload
 
-from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, clamp_page_size, paginate
+from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, TotalMode, clamp_page_size, paginate
 from core.db import get_db
+from core.responses import model_response
 from core.security import get_current_user, require_roles
 from models.crm import Doctor, Order, OrderLine, Pharmacy, Product
 from schemas.common import PaginatedResponse
-from schemas.crm import OrderCreate, OrderLineOut, OrderOut
+from schemas.crm import OrderCreate, OrderLineCreate, OrderLineOut, OrderOut
 
 router = APIRouter(
     prefix="/orders",
@@ -20,21 +22,35 @@ router = APIRouter(
 )
 
 
-def _calculate_total(lines: list[OrderLine]) -> Decimal:
+def _line_rows(
+    lines: list[OrderLineCreate], prices: dict[int, Decimal | None]
+) -> tuple[list[dict], Decimal]:
+    """``order_lines`` rows (less order_id) for one insert, and the order total, in one pass over the lines."""
+    rows: list[dict] = []
     total = Decimal("0")
     for line in lines:
-        line_total = Decimal(line.price) * Decimal(line.quantity)
+        price = line.price if line.price is not None else prices[line.product_id]
+        line_total = price * line.quantity
         if line.discount:
-            discount = Decimal(str(line.discount))
-            line_total = line_total * (Decimal("1") - discount)
+            line_total *= Decimal("1") - Decimal(str(line.discount))
         total += line_total
-    return total
+        rows.append(
+            {
+                "product_id": line.product_id,
+                "quantity": line.quantity,
+                "price": price,
+                "discount": line.discount,
+                "bonus": line.bonus,
+            }
+        )
+    return rows, total
 
 
 @router.get("/", response_model=PaginatedResponse[OrderOut])
 def list_orders(
     page: int = Query(DEFAULT_PAGE, ge=1),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    total_mode: TotalMode = "exact",
     status_filter: str | None = None,
     payment_status: str | None = None,
     date_from: date | None = None,
@@ -52,11 +68,9 @@ def list_orders(
         query = query.filter(Order.order_date <= date_to)
 
     page_size = clamp_page_size(page_size)
-    orders, total = paginate(query.order_by(Order.order_date.desc()), page, page_size)
-    total_pages = max(1, (total + page_size - 1) // page_size)
-    return PaginatedResponse(
-        data=orders,
-        pagination={"page": page, "page_size": page_size, "total": total, "total_pages": total_pages},
+    orders, count = paginate(query.order_by(Order.order_date.desc()), page, page_size, total_mode)
+    return model_response(
+        PaginatedResponse[OrderOut](data=orders, pagination=count.pagination(page, page_size))
     )
 
 
@@ -72,41 +86,48 @@ def create_order(payload: OrderCreate, db: Session = Depends(get_db)) -> Order:
     if payload.pharmacy_id and not db.get(Pharmacy, payload.pharmacy_id):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Pharmacy not found.")
 
+    # One lookup for every product on the order (large pharmacy orders run to hundreds of lines).
+    product_ids = {line.product_id for line in payload.lines}
+    prices: dict[int, Decimal | None] = {}
+    if product_ids:
+        query = select(Product.id, Product.selling_price).where(Product.id.in_(product_ids))
+        prices = dict(db.execute(query).all())
+    for line in payload.lines:
+        if line.product_id not in prices:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Product {line.product_id} not found.",
+            )
+        if line.price is None and prices[line.product_id] is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Product {line.product_id} has no price; send one with the line.",
+            )
+
+    rows, total = _line_rows(payload.lines, prices)
     order = Order(
         order_date=payload.order_date,
         status=payload.status,
         payment_status=payload.payment_status,
+        total_amount=total,
         aljazeera_ref=payload.aljazeera_ref,
         doctor_id=payload.doctor_id,
         pharmacy_id=payload.pharmacy_id,
     )
     db.add(order)
     db.flush()
-
-    lines: list[OrderLine] = []
-    for line in payload.lines:
-        product = db.get(Product, line.product_id)
-        if not product:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Product {line.product_id} not found.",
-            )
-        order_line = OrderLine(
-            order_id=order.id,
-            product_id=line.product_id,
-            quantity=line.quantity,
-            price=line.price,
-            discount=line.discount,
-            bonus=line.bonus,
-        )
-        db.add(order_line)
-        lines.append(order_line)
-
-    db.flush()
-    order.total_amount = _calculate_total(lines)
+    if rows:
+        db.execute(insert(OrderLine).values(order_id=order.id), rows)
     db.commit()
-    db.refresh(order)
-    return order
+    return db.scalars(
+        select(Order)
+        .where(Order.id == order.id)
+        .options(
+            joinedload(Order.doctor),
+            joinedload(Order.pharmacy),
+            selectinload(Order.lines).joinedload(OrderLine.product),
+        )
+    ).one()
 
 
 @router.get("/{order_id}", response_model=OrderOut)
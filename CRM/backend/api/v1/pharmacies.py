@@ -4,12 +4,15 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, clamp_page_size, paginate
+from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, TotalMode, clamp_page_size, paginate
 from core.db import get_db
+from core.responses import model_response
 from core.security import get_current_user, require_roles
 from models.crm import Pharmacy
 from schemas.common import PaginatedResponse
 from schemas.crm import PharmacyCreate, PharmacyOut, PharmacyUpdate
+from services import search as account_search
+from services.fuzzy import account_names
 
 router = APIRouter(
     prefix="/pharmacies",
@@ -22,6 +25,7 @@ router = APIRouter(
 def list_pharmacies(
     page: int = Query(DEFAULT_PAGE, ge=1),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    total_mode: TotalMode = "exact",
     area: str | None = None,
     city: str | None = None,
     segment: str | None = None,
@@ -35,16 +39,19 @@ def list_pharmacies(
         query = query.filter(Pharmacy.city.ilike(f"%{city}%"))
     if segment:
         query = query.filter(Pharmacy.segment.ilike(f"%{segment}%"))
-    if search:
+    ordering = (Pharmacy.name.asc(),)
+    ranked = account_search.ranked_matches(account_search.PHARMACIES, search) if search else None
+    if ranked is not None:
+        query = query.join(ranked, ranked.c.id == Pharmacy.id)
+        ordering = (ranked.c.rank.asc(), Pharmacy.name.asc())
+    elif search:
         lowered = f"%{search.lower()}%"
         query = query.filter(func.lower(Pharmacy.name).like(lowered))
 
     page_size = clamp_page_size(page_size)
-    pharmacies, total = paginate(query.order_by(Pharmacy.name.asc()), page, page_size)
-    total_pages = max(1, (total + page_size - 1) // page_size)
-    return PaginatedResponse(
-        data=pharmacies,
-        pagination={"page": page, "page_size": page_size, "total": total, "total_pages": total_pages},
+    pharmacies, count = paginate(query.order_by(*ordering), page, page_size, total_mode)
+    return model_response(
+        PaginatedResponse[PharmacyOut](data=pharmacies, pagination=count.pagination(page, page_size))
     )
 
 
@@ -59,6 +66,7 @@ def create_pharmacy(payload: PharmacyCreate, db: Session = Depends(get_db)) -> P
     db.add(pharmacy)
     db.commit()
     db.refresh(pharmacy)
+    account_names.upsert("pharmacy", pharmacy.id, pharmacy.name)
     return pharmacy
 
 
@@ -86,4 +94,5 @@ def update_pharmacy(
         setattr(pharmacy, key, value)
     db.commit()
     db.refresh(pharmacy)
+    account_names.upsert("pharmacy", pharmacy.id, pharmacy.name)
     return pharmacy
@@ -4,12 +4,14 @@ from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, clamp_page_size, paginate
+from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, TotalMode, clamp_page_size, paginate
 from core.db import get_db
+from core.responses import model_response
 from core.security import get_current_user, require_roles
 from models.crm import Product
 from schemas.common import PaginatedResponse
 from schemas.crm import ProductCreate, ProductOut, ProductUpdate
+from services import search as account_search
 
 router = APIRouter(
     prefix="/products",
@@ -22,6 +24,7 @@ router = APIRouter(
 def list_products(
     page: int = Query(DEFAULT_PAGE, ge=1),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    total_mode: TotalMode = "exact",
     line: str | None = None,
     search: str | None = None,
     db: Session = Depends(get_db),
@@ -29,18 +32,21 @@ def list_products(
     query = db.query(Product)
     if line:
         query = query.filter(Product.line.ilike(f"%{line}%"))
-    if search:
+    ordering = (Product.name.asc(),)
+    ranked = account_search.ranked_matches(account_search.PRODUCTS, search) if search else None
+    if ranked is not None:
+        query = query.join(ranked, ranked.c.id == Product.id)
+        ordering = (ranked.c.rank.asc(), Product.name.asc())
+    elif search:
         lowered = f"%{search.lower()}%"
         query = query.filter(
             func.lower(Product.name).like(lowered) | func.lower(Product.code).like(lowered)
         )
 
     page_size = clamp_page_size(page_size)
-    products, total = paginate(query.order_by(Product.name.asc()), page, page_size)
-    total_pages = max(1, (total + page_size - 1) // page_size)
-    return PaginatedResponse(
-        data=products,
-        pagination={"page": page, "page_size": page_size, "total": total, "total_pages": total_pages},
+    products, count = paginate(query.order_by(*ordering), page, page_size, total_mode)
+    return model_response(
+        PaginatedResponse[ProductOut](data=products, pagination=count.pagination(page, page_size))
     )
 
 
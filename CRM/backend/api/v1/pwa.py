@@ -1,15 +1,22 @@
 from __future__ import annotations
 
 from datetime import date, datetime, timezone
-from typing import Optional
+from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import or_
+from sqlalchemy import and_, case, false, func, literal, or_, select, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
-from core.db import get_db
-from core.security import get_current_user
-from models.crm import Doctor, Pharmacy, User, Visit
+from api.v1.utils import PageCount, TotalMode, paginate_async
+from core.db import get_async_db, get_db, iter_partitions
+from core.responses import json_response, ndjson_response
+from core.security import CurrentUser, get_current_user
+from models.crm import Doctor, Pharmacy, Visit
+from services import accounts
+from services import search as account_search
+from services.fuzzy import MAX_MATCHES, account_names
 
 router = APIRouter(
     prefix="/pwa",
@@ -17,85 +24,252 @@ router = APIRouter(
     dependencies=[Depends(get_current_user)],
 )
 
+MAX_PAGE_SIZE = 500
+# Rows fetched, serialized and written per chunk of a format=ndjson listing.
+NDJSON_BATCH_ROWS = 1000
+
 
 def _format_address(*parts: Optional[str]) -> Optional[str]:
     cleaned = [part.strip() for part in parts if part and part.strip()]
     return ", ".join(cleaned) if cleaned else None
 
 
+def _serialize_doctor(doc) -> dict:  # noqa: ANN001
+    return {
+        "id": str(doc.id),
+        "name": doc.name,
+        "type": "doctor",
+        "area": doc.area,
+        "specialty": doc.specialty,
+        "phone": doc.phone,
+        "address": _format_address(doc.clinic, doc.area, doc.city),
+        "lastVisit": None,
+        "location": None,
+    }
+
+
+def _serialize_pharmacy(pharmacy) -> dict:  # noqa: ANN001
+    return {
+        "id": str(pharmacy.id),
+        "name": pharmacy.name,
+        "type": "pharmacy",
+        "area": pharmacy.area,
+        "specialty": None,
+        "phone": pharmacy.phone,
+        "address": _format_address(pharmacy.area, pharmacy.city),
+        "lastVisit": None,
+        "location": None,
+    }
+
+
+def _doctor_customers(
+    search: Optional[str], area: Optional[str], specialty: Optional[str], fuzzy_ids: Optional[list[int]]
+):
+    query = select(Doctor.id, Doctor.name, Doctor.area, Doctor.specialty, Doctor.phone, Doctor.clinic, Doctor.city)
+    ordering = (Doctor.name.asc(),)
+    ranked = account_search.ranked_matches(account_search.DOCTORS, search) if search and fuzzy_ids is None else None
+    if fuzzy_ids is not None:
+        query = query.filter(Doctor.id.in_(fuzzy_ids))
+    elif ranked is not None:
+        query = query.join(ranked, ranked.c.id == Doctor.id)
+        ordering = (ranked.c.rank.asc(), Doctor.name.asc())
+    elif search:
+        term = f"%{search.strip().lower()}%"
+        query = query.filter(
+            or_(
+                Doctor.name.ilike(term),
+                Doctor.specialty.ilike(term),
+                Doctor.area.ilike(term),
+                Doctor.city.ilike(term),
+            )
+        )
+    if area:
+        query = query.filter(Doctor.area.ilike(f"%{area.strip().lower()}%"))
+    if specialty:
+        query = query.filter(Doctor.specialty.ilike(f"%{specialty.strip().lower()}%"))
+    return query.order_by(*ordering)
+
+
+def _pharmacy_customers(search: Optional[str], area: Optional[str], fuzzy_ids: Optional[list[int]]):
+    query = select(Pharmacy.id, Pharmacy.name, Pharmacy.area, Pharmacy.phone, Pharmacy.city)
+    ordering = (Pharmacy.name.asc(),)
+    ranked = account_search.ranked_matches(account_search.PHARMACIES, search) if search and fuzzy_ids is None else None
+    if fuzzy_ids is not None:
+        query = query.filter(Pharmacy.id.in_(fuzzy_ids))
+    elif ranked is not None:
+        query = query.join(ranked, ranked.c.id == Pharmacy.id)
+        ordering = (ranked.c.rank.asc(), Pharmacy.name.asc())
+    elif search:
+        term = f"%{search.strip().lower()}%"
+        query = query.filter(
+            or_(
+                Pharmacy.name.ilike(term),
+                Pharmacy.area.ilike(term),
+                Pharmacy.city.ilike(term),
+            )
+        )
+    if area:
+        query = query.filter(Pharmacy.area.ilike(f"%{area.strip().lower()}%"))
+    return query.order_by(*ordering)
+
+
+def _serialize_account(row) -> dict:  # noqa: ANN001
+    # Unpacked positionally (account_index column order): much cheaper than named Row access per field.
+    kind, account_id, name, specialty, clinic, area, city, phone, last_visit, lat, lng, _ = row
+    return {
+        "id": str(account_id),
+        "name": name,
+        "type": kind,
+        "area": area,
+        "specialty": specialty,
+        "phone": phone,
+        "address": _format_address(clinic, area, city),
+        "lastVisit": last_visit.isoformat() if last_visit else None,
+        "location": {"lat": lat, "lng": lng} if lat is not None and lng is not None else None,
+    }
+
+
+def _indexed_customers(
+    kinds: list[str],
+    search: Optional[str],
+    area: Optional[str],
+    specialty: Optional[str],
+    fuzzy_rank: Optional[dict[tuple[str, int], int]],
+    sort_by: str,
+):
+    """Doctors and pharmacies as one ordered select over ``account_index``."""
+    account = accounts.ACCOUNT_INDEX.c
+    query = select(accounts.ACCOUNT_INDEX)
+    if len(kinds) < 2:
+        query = query.filter(account.kind.in_(kinds))
+    ordering = (account.name.asc(), account.kind.asc(), account.id.asc())
+    if sort_by == "lastVisit":
+        # SQLite sorts NULLs last in descending order, so never-visited accounts come after the rest.
+        ordering = (account.last_visit_date.desc(), *ordering)
+
+    sources = {"doctor": account_search.DOCTORS, "pharmacy": account_search.PHARMACIES}
+    ranked = [account_search.ranked_matches(sources[kind], search) for kind in kinds] if search and fuzzy_rank is None else []
+    if fuzzy_rank is not None:
+        ids: dict[str, list[int]] = {}
+        for kind, entry_id in fuzzy_rank:
+            ids.setdefault(kind, []).append(entry_id)
+        query = query.filter(or_(false(), *(and_(account.kind == kind, account.id.in_(ids[kind])) for kind in ids)))
+        position = case(
+            *((and_(account.kind == kind, account.id == entry_id), index) for (kind, entry_id), index in fuzzy_rank.items()),
+            else_=len(fuzzy_rank),
+        )
+        ordering = (position, *ordering)
+    elif ranked and all(subquery is not None for subquery in ranked):
+        matches = union_all(
+            *(select(literal(kind).label("kind"), sub.c.id, sub.c.rank) for kind, sub in zip(kinds, ranked))
+        ).subquery("account_search")
+        query = query.join(matches, and_(matches.c.kind == account.kind, matches.c.id == account.id))
+        ordering = (matches.c.rank.asc(), *ordering)
+    elif search:
+        term = f"%{search.strip().lower()}%"
+        query = query.filter(
+            or_(
+                account.name.ilike(term),
+                account.specialty.ilike(term),
+                account.area.ilike(term),
+                account.city.ilike(term),
+            )
+        )
+    if area:
+        query = query.filter(account.area.ilike(f"%{area.strip().lower()}%"))
+    if specialty:
+        # Like the doctor-only filter before the index: pharmacies have no specialty and stay listed.
+        query = query.filter(or_(account.kind != "doctor", account.specialty.ilike(f"%{specialty.strip().lower()}%")))
+    return query.order_by(*ordering)
+
+
+def _page_payload(data: list[dict], page: int, page_size: int, count: PageCount) -> dict:
+    return {
+        "data": data,
+        "meta": {
+            "page": page,
+            "pageSize": page_size,
+            "total": count.total,
+            "totalPages": count.total_pages(page_size),
+            "hasMore": count.has_more,
+            "totalEstimated": count.estimated,
+        },
+    }
+
+
 @router.get("/customers")
-def list_customers(
+async def list_customers(
     search: Optional[str] = None,
     type: Optional[str] = Query(default=None, alias="type"),
     area: Optional[str] = None,
     specialty: Optional[str] = None,
-    db: Session = Depends(get_db),
-) -> list[dict]:
+    fuzzy: bool = False,
+    sort_by: Literal["name", "lastVisit"] = Query("name", alias="sortBy"),
+    page: int = Query(1, ge=1),
+    page_size: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, alias="pageSize"),
+    total_mode: TotalMode = Query("exact", alias="totalMode"),
+    output_format: Literal["json", "ndjson"] = Query("json", alias="format"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Doctors and pharmacies by name (best matches first for a search, or with
+    ``fuzzy=true``; most recently visited first with ``sortBy=lastVisit``).
+
+    Returns a plain list unless ``pageSize`` is given, in which case one page
+    comes back as ``{data, meta}`` like the other listings.
+    ``format=ndjson`` writes one customer per line as rows are read, so the PWA
+    can cache the full list without either side holding all of it.
+    """
     normalized_type = (type or "").lower()
-    results: list[dict] = []
+    kinds = [kind for kind in ("doctor", "pharmacy") if normalized_type in {"", kind}]
+    # (kind, id) -> position in the similarity ranking.
+    fuzzy_rank: Optional[dict[tuple[str, int], int]] = None
+    if search and fuzzy:
+        # The first call in a process loads the index from the database.
+        matches = await run_in_threadpool(account_names.search, search, limit=MAX_MATCHES, kinds=kinds)
+        fuzzy_rank = {(match.kind, match.id): position for position, match in enumerate(matches)}
 
-    if normalized_type in {"", "doctor"}:
-        query = db.query(Doctor)
-        if search:
-            term = f"%{search.strip().lower()}%"
-            query = query.filter(
-                or_(
-                    Doctor.name.ilike(term),
-                    Doctor.specialty.ilike(term),
-                    Doctor.area.ilike(term),
-                    Doctor.city.ilike(term),
-                )
-            )
-        if area:
-            query = query.filter(Doctor.area.ilike(f"%{area.strip().lower()}%"))
-        if specialty:
-            query = query.filter(Doctor.specialty.ilike(f"%{specialty.strip().lower()}%"))
-
-        for doc in query.order_by(Doctor.name.asc()).all():
-            results.append(
-                {
-                    "id": str(doc.id),
-                    "name": doc.name,
-                    "type": "doctor",
-                    "area": doc.area,
-                    "specialty": doc.specialty,
-                    "phone": doc.phone,
-                    "address": _format_address(doc.clinic, doc.area, doc.city),
-                    "lastVisit": None,
-                    "location": None,
-                }
-            )
+    if accounts.index_available():
+        query = _indexed_customers(kinds, search, area, specialty, fuzzy_rank, sort_by)
+        if output_format == "ndjson":
+            partitions = iter_partitions(query, NDJSON_BATCH_ROWS)
+            return ndjson_response([_serialize_account(row) for row in rows] for rows in partitions)
+        if page_size is not None:
+            rows, count = await paginate_async(db, query, page, page_size, total_mode)
+            return json_response(_page_payload([_serialize_account(row) for row in rows], page, page_size, count))
+        return json_response([_serialize_account(row) for row in (await db.execute(query)).all()])
 
-    if normalized_type in {"", "pharmacy"}:
-        query = db.query(Pharmacy)
-        if search:
-            term = f"%{search.strip().lower()}%"
-            query = query.filter(
-                or_(
-                    Pharmacy.name.ilike(term),
-                    Pharmacy.area.ilike(term),
-                    Pharmacy.city.ilike(term),
-                )
-            )
-        if area:
-            query = query.filter(Pharmacy.area.ilike(f"%{area.strip().lower()}%"))
-
-        for pharmacy in query.order_by(Pharmacy.name.asc()).all():
-            results.append(
-                {
-                    "id": str(pharmacy.id),
-                    "name": pharmacy.name,
-                    "type": "pharmacy",
-                    "area": pharmacy.area,
-                    "specialty": None,
-                    "phone": pharmacy.phone,
-                    "address": _format_address(pharmacy.area, pharmacy.city),
-                    "lastVisit": None,
-                    "location": None,
-                }
-            )
+    # Without the index: doctors, then pharmacies, with no visit data.
+    def fuzzy_ids(kind: str) -> Optional[list[int]]:
+        if fuzzy_rank is None:
+            return None
+        return [entry_id for entry_kind, entry_id in fuzzy_rank if entry_kind == kind]
+
+    parts = []
+    if "doctor" in kinds:
+        parts.append((_doctor_customers(search, area, specialty, fuzzy_ids("doctor")), _serialize_doctor))
+    if "pharmacy" in kinds:
+        parts.append((_pharmacy_customers(search, area, fuzzy_ids("pharmacy")), _serialize_pharmacy))
 
-    return results
+    if output_format == "ndjson" and fuzzy_rank is None:
+        return ndjson_response(
+            [serialize(row) for row in rows]
+            for query, serialize in parts
+            for rows in iter_partitions(query, NDJSON_BATCH_ROWS)
+        )
+
+    results: list[dict] = []
+    for query, serialize in parts:
+        results.extend(serialize(row) for row in (await db.execute(query)).all())
+    if fuzzy_rank is not None:
+        results.sort(key=lambda row: fuzzy_rank.get((row["type"], int(row["id"])), len(fuzzy_rank)))
+    if output_format == "ndjson":
+        return ndjson_response(iter([results]))
+    if page_size is not None:
+        offset = (page - 1) * page_size
+        count = PageCount(len(results), len(results) > offset + page_size)
+        return json_response(_page_payload(results[offset : offset + page_size], page, page_size, count))
+    return json_response(results)
 
 
 def _map_visit_status(status: str | None) -> str:
@@ -107,14 +281,31 @@ def _map_visit_status(status: str | None) -> str:
 
 
 @router.get("/visits")
-def list_visits(
+async def list_visits(
     date_value: Optional[str] = Query(default=None, alias="date"),
     status_filter: Optional[str] = Query(default=None, alias="status"),
     customer_id: Optional[str] = Query(default=None, alias="customerId"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ) -> list[dict]:
-    query = db.query(Visit).filter(Visit.is_deleted.is_(False), Visit.rep_id == current_user.id)
+    query = (
+        select(
+            Visit.id,
+            Visit.rep_id,
+            Visit.doctor_id,
+            Visit.pharmacy_id,
+            Visit.status,
+            Visit.notes,
+            Visit.start_lat,
+            Visit.start_lng,
+            Visit.started_at,
+            Visit.visit_date,
+            func.coalesce(Doctor.name, Pharmacy.name).label("customer_name"),
+        )
+        .outerjoin(Doctor, Doctor.id == Visit.doctor_id)
+        .outerjoin(Pharmacy, Pharmacy.id == Visit.pharmacy_id)
+        .filter(Visit.is_deleted.is_(False), Visit.rep_id == current_user.id)
+    )
     if date_value:
         try:
             parsed = date.fromisoformat(date_value)
@@ -126,23 +317,18 @@ def list_visits(
             parsed_id = int(customer_id)
             query = query.filter(or_(Visit.doctor_id == parsed_id, Visit.pharmacy_id == parsed_id))
 
-    visits = query.all()
+    visits = (await db.execute(query)).all()
     results = []
     for visit in visits:
         customer_type = "doctor" if visit.doctor_id else "pharmacy"
         customer_id_value = visit.doctor_id or visit.pharmacy_id
-        customer_name = None
-        if visit.doctor:
-            customer_name = visit.doctor.name
-        elif visit.pharmacy:
-            customer_name = visit.pharmacy.name
 
         results.append(
             {
                 "id": str(visit.id),
                 "repId": str(visit.rep_id),
                 "customerId": str(customer_id_value) if customer_id_value else "",
-                "customerName": customer_name or "",
+                "customerName": visit.customer_name or "",
                 "customerType": customer_type,
                 "visitType": "follow-up",
                 "status": _map_visit_status(visit.status),
@@ -163,13 +349,13 @@ def list_visits(
         status_filter = status_filter.strip().lower()
         results = [visit for visit in results if visit.get("status") == status_filter]
 
-    return results
+    return json_response(results)
 
 
 @router.post("/visits", status_code=status.HTTP_201_CREATED)
 def create_visit(
     payload: dict,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> dict:
     customer_id = payload.get("customerId")
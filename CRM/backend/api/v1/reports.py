@@ -6,10 +6,12 @@ from datetime import date
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from sqlalchemy import func
-from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.db import get_db
+from api.v1.utils import count_rows
+from core.db import get_async_read_db
+from core.responses import json_response
 from core.security import get_current_user, require_roles
 from models.crm import Order, OrderLine, Product, RepProfile, Territory, User, Visit
 
@@ -29,8 +31,8 @@ def _parse_date(value: Optional[str]) -> Optional[date]:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid date format.") from exc
 
 
-def _visit_query(db: Session, date_from: Optional[date], date_to: Optional[date]):
-    query = db.query(Visit).filter(Visit.is_deleted.is_(False))
+def _visit_query(date_from: Optional[date], date_to: Optional[date], *columns):
+    query = select(*(columns or (Visit,))).filter(Visit.is_deleted.is_(False))
     if date_from:
         query = query.filter(Visit.visit_date >= date_from)
     if date_to:
@@ -39,52 +41,53 @@ def _visit_query(db: Session, date_from: Optional[date], date_to: Optional[date]
 
 
 @router.get("/overview")
-def reports_overview(
+async def reports_overview(
     from_date: Optional[str] = Query(default=None, alias="from"),
     to_date: Optional[str] = Query(default=None, alias="to"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> dict:
     date_from = _parse_date(from_date)
     date_to = _parse_date(to_date)
 
-    visit_query = _visit_query(db, date_from, date_to)
-    total_visits = visit_query.count()
-    successful_visits = visit_query.filter(Visit.status == "completed").count()
+    visit_query = _visit_query(date_from, date_to, Visit.id)
+    total_visits = await count_rows(db, visit_query)
+    successful_visits = await count_rows(db, visit_query.filter(Visit.status == "completed"))
 
-    orders_query = db.query(Order)
+    orders_query = select(func.count(Order.id), func.sum(Order.total_amount))
     if date_from:
         orders_query = orders_query.filter(Order.order_date >= date_from)
     if date_to:
         orders_query = orders_query.filter(Order.order_date <= date_to)
-    orders_count = orders_query.count()
-    orders_total = orders_query.with_entities(func.sum(Order.total_amount)).scalar() or 0
-
-    return {
-        "data": {
-            "totalVisits": total_visits,
-            "successfulVisits": successful_visits,
-            "ordersCount": orders_count,
-            "ordersTotal": float(orders_total),
+    orders_count, orders_total = (await db.execute(orders_query)).one()
+    orders_total = orders_total or 0
+
+    return json_response(
+        {
+            "data": {
+                "totalVisits": total_visits,
+                "successfulVisits": successful_visits,
+                "ordersCount": orders_count,
+                "ordersTotal": float(orders_total),
+            }
         }
-    }
+    )
 
 
-@router.get("/rep-performance")
-def rep_performance(
-    from_date: Optional[str] = Query(default=None, alias="from"),
-    to_date: Optional[str] = Query(default=None, alias="to"),
-    db: Session = Depends(get_db),
-) -> list[dict]:
+# Visit columns the performance reports aggregate; whole entities are not needed.
+_VISIT_METRIC_COLUMNS = (Visit.rep_id, Visit.status, Visit.doctor_id, Visit.pharmacy_id)
+
+
+async def _rep_performance_rows(from_date: Optional[str], to_date: Optional[str], db: AsyncSession) -> list[dict]:
     date_from = _parse_date(from_date)
     date_to = _parse_date(to_date)
-    visits = _visit_query(db, date_from, date_to).all()
+    visits = (await db.execute(_visit_query(date_from, date_to, *_VISIT_METRIC_COLUMNS))).all()
 
-    reps = {rep.id: rep for rep in db.query(User).all()}
+    reps = {rep.id: rep for rep in (await db.execute(select(User.id, User.name, User.email))).all()}
     profiles = {
         profile.user_id: profile
-        for profile in db.query(RepProfile).join(User).all()
+        for profile in (await db.execute(select(RepProfile.user_id, RepProfile.territory_id).join(User))).all()
     }
-    territories = {t.id: t for t in db.query(Territory).all()}
+    territories = {t.id: t for t in (await db.execute(select(Territory.id, Territory.name))).all()}
 
     metrics = {}
     for visit in visits:
@@ -142,17 +145,26 @@ def rep_performance(
     return results
 
 
+@router.get("/rep-performance")
+async def rep_performance(
+    from_date: Optional[str] = Query(default=None, alias="from"),
+    to_date: Optional[str] = Query(default=None, alias="to"),
+    db: AsyncSession = Depends(get_async_read_db),
+) -> list[dict]:
+    return json_response(await _rep_performance_rows(from_date, to_date, db))
+
+
 @router.get(
     "/rep-performance/export",
     dependencies=[Depends(require_roles("sales_manager", "admin"))],
     response_class=Response,
 )
-def rep_performance_export(
+async def rep_performance_export(
     from_date: Optional[str] = Query(default=None, alias="from"),
     to_date: Optional[str] = Query(default=None, alias="to"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> Response:
-    rows = rep_performance(from_date=from_date, to_date=to_date, db=db)
+    rows = await _rep_performance_rows(from_date, to_date, db)
     buffer = io.StringIO()
     writer = csv.DictWriter(
         buffer,
@@ -186,16 +198,16 @@ def rep_performance_export(
 
 
 @router.get("/product-performance")
-def product_performance(
+async def product_performance(
     from_date: Optional[str] = Query(default=None, alias="from"),
     to_date: Optional[str] = Query(default=None, alias="to"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> list[dict]:
     date_from = _parse_date(from_date)
     date_to = _parse_date(to_date)
 
     query = (
-        db.query(
+        select(
             Product.id,
             Product.name,
             func.sum(OrderLine.quantity),
@@ -213,7 +225,7 @@ def product_performance(
     query = query.group_by(Product.id, Product.name).order_by(Product.name.asc())
 
     results = []
-    for product_id, name, total_qty, order_count, order_sum in query.all():
+    for product_id, name, total_qty, order_count, order_sum in (await db.execute(query)).all():
         visits_count = int(order_count or 0)
         total_qty = int(total_qty or 0)
         avg_qty = round(total_qty / visits_count, 2) if visits_count else 0
@@ -227,24 +239,24 @@ def product_performance(
             }
         )
 
-    return results
+    return json_response(results)
 
 
 @router.get("/territory-performance")
-def territory_performance(
+async def territory_performance(
     from_date: Optional[str] = Query(default=None, alias="from"),
     to_date: Optional[str] = Query(default=None, alias="to"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> list[dict]:
     date_from = _parse_date(from_date)
     date_to = _parse_date(to_date)
-    visits = _visit_query(db, date_from, date_to).all()
+    visits = (await db.execute(_visit_query(date_from, date_to, *_VISIT_METRIC_COLUMNS))).all()
 
     profiles = {
         profile.user_id: profile
-        for profile in db.query(RepProfile).all()
+        for profile in (await db.execute(select(RepProfile.user_id, RepProfile.territory_id))).all()
     }
-    territories = {t.id: t for t in db.query(Territory).all()}
+    territories = {t.id: t for t in (await db.execute(select(Territory.id, Territory.name))).all()}
 
     metrics = {}
     for visit in visits:
@@ -283,4 +295,4 @@ def territory_performance(
                 "avgRating": 0,
             }
         )
-    return results
+    return json_response(results)
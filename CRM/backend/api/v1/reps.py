@@ -6,10 +6,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from sqlalchemy import func
 from sqlalchemy.orm import Session, joinedload
 
-from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, clamp_page_size, paginate
+from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, TotalMode, clamp_page_size, paginate
 from core.db import get_db
-from core.security import get_current_user, require_roles
-from models.crm import Role, Route, RouteAccount, User
+from core.responses import model_response
+from core.security import CurrentUser, get_current_user, invalidate_user_cache, require_roles
+from models.crm import Doctor, Pharmacy, Role, Route, RouteAccount, User
 from schemas.common import PaginatedResponse
 from schemas.crm import RouteCreate, RouteOut, RouteStopOut
 from schemas.user import RepCreate, RepUpdate, UserOut
@@ -145,6 +146,7 @@ def update_rep(rep_id: int, payload: RepUpdate, db: Session = Depends(get_db)) -
         rep.role_id = role.id
 
     db.commit()
+    invalidate_user_cache(rep.id)
     db.refresh(rep)
     return rep
 
@@ -159,6 +161,7 @@ def deactivate_rep(rep_id: int, db: Session = Depends(get_db)) -> Response:
     rep = _get_rep_or_404(db, rep_id)
     rep.is_active = False
     db.commit()
+    invalidate_user_cache(rep.id)
     return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
@@ -166,6 +169,7 @@ def deactivate_rep(rep_id: int, db: Session = Depends(get_db)) -> Response:
 def list_routes(
     page: int = Query(DEFAULT_PAGE, ge=1),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    total_mode: TotalMode = "exact",
     rep_id: int | None = None,
     db: Session = Depends(get_db),
 ) -> PaginatedResponse[RouteOut]:
@@ -174,11 +178,9 @@ def list_routes(
         query = query.filter(Route.rep_id == rep_id)
 
     page_size = clamp_page_size(page_size)
-    routes, total = paginate(query.order_by(Route.name.asc()), page, page_size)
-    total_pages = max(1, (total + page_size - 1) // page_size)
-    return PaginatedResponse(
-        data=routes,
-        pagination={"page": page, "page_size": page_size, "total": total, "total_pages": total_pages},
+    routes, count = paginate(query.order_by(Route.name.asc()), page, page_size, total_mode)
+    return model_response(
+        PaginatedResponse[RouteOut](data=routes, pagination=count.pagination(page, page_size))
     )
 
 
@@ -189,6 +191,13 @@ def list_routes(
     dependencies=[Depends(require_roles("sales_manager", "admin"))],
 )
 def create_route(payload: RouteCreate, db: Session = Depends(get_db)) -> Route:
+    if not db.get(User, payload.rep_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Rep not found.")
+    for account in payload.accounts:
+        if account.doctor_id and not db.get(Doctor, account.doctor_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Doctor not found.")
+        if account.pharmacy_id and not db.get(Pharmacy, account.pharmacy_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Pharmacy not found.")
     route = Route(
         name=payload.name,
         rep_id=payload.rep_id,
@@ -214,7 +223,7 @@ def create_route(payload: RouteCreate, db: Session = Depends(get_db)) -> Route:
 
 @router.get("/routes/today", response_model=list[RouteStopOut])
 def get_today_route(
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> list[RouteStopOut]:
     query = (
@@ -3,10 +3,11 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, clamp_page_size, paginate
+from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, TotalMode, clamp_page_size, paginate
 from core.db import get_db
+from core.responses import model_response
 from core.security import get_current_user, require_roles
-from models.crm import Product, StockLocation, StockMovement
+from models.crm import Product, StockLocation, StockMovement, User
 from schemas.common import PaginatedResponse
 from schemas.crm import StockLocationCreate, StockLocationOut, StockMovementCreate, StockMovementOut
 
@@ -29,6 +30,8 @@ def list_locations(db: Session = Depends(get_db)) -> list[StockLocation]:
     dependencies=[Depends(require_roles("sales_manager", "admin"))],
 )
 def create_location(payload: StockLocationCreate, db: Session = Depends(get_db)) -> StockLocation:
+    if payload.rep_id and not db.get(User, payload.rep_id):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Rep not found.")
     loc = StockLocation(**payload.model_dump())
     db.add(loc)
     db.commit()
@@ -40,6 +43,7 @@ def create_location(payload: StockLocationCreate, db: Session = Depends(get_db))
 def list_movements(
     page: int = Query(DEFAULT_PAGE, ge=1),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    total_mode: TotalMode = "exact",
     product_id: int | None = None,
     location_id: int | None = None,
     db: Session = Depends(get_db),
@@ -53,11 +57,9 @@ def list_movements(
             | (StockMovement.location_to_id == location_id)
         )
     page_size = clamp_page_size(page_size)
-    movements, total = paginate(query.order_by(StockMovement.movement_date.desc()), page, page_size)
-    total_pages = max(1, (total + page_size - 1) // page_size)
-    return PaginatedResponse(
-        data=movements,
-        pagination={"page": page, "page_size": page_size, "total": total, "total_pages": total_pages},
+    movements, count = paginate(query.order_by(StockMovement.movement_date.desc()), page, page_size, total_mode)
+    return model_response(
+        PaginatedResponse[StockMovementOut](data=movements, pagination=count.pagination(page, page_size))
     )
 
 
@@ -70,6 +72,9 @@ def list_movements(
 def create_movement(payload: StockMovementCreate, db: Session = Depends(get_db)) -> StockMovement:
     if not db.get(Product, payload.product_id):
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Product not found.")
+    for location_id in (payload.location_from_id, payload.location_to_id):
+        if location_id and not db.get(StockLocation, location_id):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Stock location not found.")
     movement = StockMovement(**payload.model_dump())
     db.add(movement)
     db.commit()
@@ -3,8 +3,9 @@ from __future__ import annotations
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
 
-from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, clamp_page_size, paginate
+from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, TotalMode, clamp_page_size, paginate
 from core.db import get_db
+from core.responses import model_response
 from core.security import get_current_user, require_roles
 from models.crm import Product, Target, User
 from schemas.common import PaginatedResponse
@@ -21,6 +22,7 @@ router = APIRouter(
 def list_targets(
     page: int = Query(DEFAULT_PAGE, ge=1),
     page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    total_mode: TotalMode = "exact",
     rep_id: int | None = None,
     period: str | None = None,
     db: Session = Depends(get_db),
@@ -32,11 +34,9 @@ def list_targets(
         query = query.filter(Target.period == period)
 
     page_size = clamp_page_size(page_size)
-    targets, total = paginate(query.order_by(Target.period.desc()), page, page_size)
-    total_pages = max(1, (total + page_size - 1) // page_size)
-    return PaginatedResponse(
-        data=targets,
-        pagination={"page": page, "page_size": page_size, "total": total, "total_pages": total_pages},
+    targets, count = paginate(query.order_by(Target.period.desc()), page, page_size, total_mode)
+    return model_response(
+        PaginatedResponse[TargetOut](data=targets, pagination=count.pagination(page, page_size))
     )
 
 
@@ -1,19 +1,157 @@
 from __future__ import annotations
 
-from typing import Iterable, Tuple
+from dataclasses import dataclass
+from typing import Literal, Optional, Tuple
 
+from sqlalchemy import Select, Table, func, select, text
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Query
 
+from core import db as core_db
+
 DEFAULT_PAGE = 1
 DEFAULT_PAGE_SIZE = 25
 MAX_PAGE_SIZE = 200
+# total_mode=estimate counts at most this many rows and reports "1000+" beyond it.
+ESTIMATE_CAP = 1000
+
+TotalMode = Literal["exact", "estimate", "none"]
+
+
+@dataclass(frozen=True)
+class PageCount:
+    """
+    How much is known about the size of a listing. ``total`` is None for
+    total_mode=none; ``estimated`` marks a capped count or a statistics figure.
+    """
+
+    total: Optional[int]
+    has_more: bool
+    estimated: bool = False
+
+    def total_pages(self, page_size: int) -> Optional[int]:
+        if self.total is None:
+            return None
+        return max(1, (self.total + page_size - 1) // page_size)
+
+    def pagination(self, page: int, page_size: int) -> dict:
+        return {
+            "page": page,
+            "page_size": page_size,
+            "total": self.total,
+            "total_pages": self.total_pages(page_size),
+            "has_more": self.has_more,
+            "total_estimated": self.estimated,
+        }
 
 
 def clamp_page_size(page_size: int) -> int:
     return min(max(page_size, 1), MAX_PAGE_SIZE)
 
 
-def paginate(query: Query, page: int, page_size: int) -> Tuple[list, int]:
-    total = query.count()
-    items = query.offset((page - 1) * page_size).limit(page_size).all()
-    return items, total
+def _single_table(stmt: Select) -> Optional[str]:
+    """Table name when ``stmt`` reads one whole table, so its statistics describe the result."""
+    froms = stmt.get_final_froms()
+    if stmt.whereclause is not None or stmt._distinct or len(froms) != 1 or not isinstance(froms[0], Table):
+        return None
+    return froms[0].name
+
+
+def _row_estimate_statements(table: str) -> list:
+    """Statements that read a table's row count from planner statistics; all must return a truthy value."""
+    params = {"table": table}
+    dialect = core_db.engine.dialect.name
+    if dialect == "sqlite":
+        # sqlite_stat1 exists only after ANALYZE; its stat column starts with the row count.
+        return [
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sqlite_stat1'"),
+            text("SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = :table").bindparams(**params),
+        ]
+    if dialect == "postgresql":
+        return [
+            text(
+                "SELECT CASE WHEN reltuples > 0 THEN CAST(reltuples AS BIGINT) END "
+                "FROM pg_class WHERE oid = to_regclass(:table)"
+            ).bindparams(**params)
+        ]
+    return []
+
+
+def _page_count(offset: int, rows: list, page_size: int) -> Tuple[list, bool, Optional[int]]:
+    """Trim the extra look-ahead row; the total is known for free on a partial, non-empty page."""
+    has_more = len(rows) > page_size
+    items = rows[:page_size]
+    known_total = offset + len(items) if items and not has_more else None
+    return items, has_more, known_total
+
+
+def _capped(counted: int, has_more: bool, stat_rows: Optional[int]) -> PageCount:
+    if counted <= ESTIMATE_CAP:
+        return PageCount(counted, has_more)
+    return PageCount(max(stat_rows or 0, ESTIMATE_CAP), has_more, estimated=True)
+
+
+def paginate(
+    query: Query, page: int, page_size: int, total_mode: TotalMode = "exact"
+) -> Tuple[list, PageCount]:
+    """
+    Fetch one page (plus one look-ahead row for ``has_more``) and count the
+    listing according to ``total_mode``: ``exact`` runs COUNT(*), ``estimate``
+    counts at most ESTIMATE_CAP + 1 rows and falls back to table statistics
+    beyond that, ``none`` skips counting.
+    """
+    offset = (page - 1) * page_size
+    items, has_more, known_total = _page_count(
+        offset, query.offset(offset).limit(page_size + 1).all(), page_size
+    )
+    if total_mode == "none":
+        return items, PageCount(None, has_more)
+    if known_total is not None:
+        return items, PageCount(known_total, has_more)
+    if total_mode == "exact":
+        return items, PageCount(query.order_by(None).count(), has_more)
+
+    counted = query.order_by(None).limit(ESTIMATE_CAP + 1).count()
+    stat_rows = None
+    table = _single_table(query.statement) if counted > ESTIMATE_CAP else None
+    if table:
+        for stmt in _row_estimate_statements(table):
+            stat_rows = query.session.scalar(stmt)
+            if not stat_rows:
+                break
+    return items, _capped(counted, has_more, stat_rows)
+
+
+async def count_rows(db: AsyncSession, stmt: Select, limit: Optional[int] = None) -> int:
+    stmt = stmt.order_by(None)
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    count_stmt = select(func.count()).select_from(stmt.subquery())
+    return int(await db.scalar(count_stmt) or 0)
+
+
+async def paginate_async(
+    db: AsyncSession, stmt: Select, page: int, page_size: int, total_mode: TotalMode = "exact"
+) -> Tuple[list, PageCount]:
+    """Async counterpart of ``paginate``; ``stmt`` may select entities or a column projection."""
+    offset = (page - 1) * page_size
+    result = await db.execute(stmt.offset(offset).limit(page_size + 1))
+    # Entity (or single column) selects yield objects; column projections yield rows.
+    rows = result.scalars().all() if len(stmt.column_descriptions) == 1 else result.all()
+    items, has_more, known_total = _page_count(offset, list(rows), page_size)
+    if total_mode == "none":
+        return items, PageCount(None, has_more)
+    if known_total is not None:
+        return items, PageCount(known_total, has_more)
+    if total_mode == "exact":
+        return items, PageCount(await count_rows(db, stmt), has_more)
+
+    counted = await count_rows(db, stmt, limit=ESTIMATE_CAP + 1)
+    stat_rows = None
+    table = _single_table(stmt) if counted > ESTIMATE_CAP else None
+    if table:
+        for estimate_stmt in _row_estimate_statements(table):
+            stat_rows = await db.scalar(estimate_stmt)
+            if not stat_rows:
+                break
+    return items, _capped(counted, has_more, stat_rows)
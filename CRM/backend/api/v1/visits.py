@@ -5,13 +5,15 @@ import csv
 import io
 
 from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
-from sqlalchemy import case, func
+from sqlalchemy import case, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session, joinedload
 
-from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, clamp_page_size, paginate
+from api.v1.utils import DEFAULT_PAGE, DEFAULT_PAGE_SIZE, TotalMode, clamp_page_size, paginate_async
 from api.v1.utils_gps import GPSValidationError, validate_accuracy, validate_max_distance
-from core.db import get_db
-from core.security import get_current_user, has_any_role, require_roles
+from core.db import get_async_db, get_async_read_db, get_db
+from core.responses import model_response
+from core.security import CurrentUser, get_current_user, has_any_role, require_roles
 from models.crm import Doctor, Pharmacy, User, Visit
 from schemas.common import PaginatedResponse
 from schemas.crm import VisitCreate, VisitEnd, VisitOut, VisitStart, VisitUpdate
@@ -56,100 +58,118 @@ def _sync_duration(visit: Visit) -> None:
         visit.duration_seconds = duration
 
 
-@router.get("/", response_model=PaginatedResponse[VisitOut])
-def list_visits(
-    page: int = Query(DEFAULT_PAGE, ge=1),
-    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
-    rep_ids: list[int] | None = Query(default=None, alias="rep_id"),
-    doctor_id: int | None = None,
-    pharmacy_id: int | None = None,
-    date_from: date | None = None,
-    date_to: date | None = None,
-    status_filter: list[str] | None = Query(default=None, alias="status"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
-) -> PaginatedResponse[VisitOut]:
-    query = (
-        db.query(Visit)
-        .options(joinedload(Visit.doctor), joinedload(Visit.pharmacy), joinedload(Visit.rep))
-        .filter(Visit.is_deleted.is_(False))
-    )
+def _visit_filters(
+    current_user: CurrentUser,
+    *,
+    rep_ids: list[int] | None,
+    doctor_id: int | None,
+    pharmacy_id: int | None,
+    date_from: date | None,
+    date_to: date | None,
+    status_filter: list[str] | None,
+) -> list:
+    conditions = [Visit.is_deleted.is_(False)]
 
     effective_rep_ids = rep_ids or []
     if has_any_role(current_user, ["medical_rep"]):
         effective_rep_ids = [current_user.id]
 
     if effective_rep_ids:
-        query = query.filter(Visit.rep_id.in_(effective_rep_ids))
+        conditions.append(Visit.rep_id.in_(effective_rep_ids))
     if doctor_id:
-        query = query.filter(Visit.doctor_id == doctor_id)
+        conditions.append(Visit.doctor_id == doctor_id)
     if pharmacy_id:
-        query = query.filter(Visit.pharmacy_id == pharmacy_id)
+        conditions.append(Visit.pharmacy_id == pharmacy_id)
     if date_from:
-        query = query.filter(Visit.visit_date >= date_from)
+        conditions.append(Visit.visit_date >= date_from)
     if date_to:
-        query = query.filter(Visit.visit_date <= date_to)
+        conditions.append(Visit.visit_date <= date_to)
     allowed_statuses = _normalize_status_filters(status_filter)
     if allowed_statuses:
-        query = query.filter(Visit.status.in_(allowed_statuses))
+        conditions.append(Visit.status.in_(allowed_statuses))
+    return conditions
+
+
+def _visit_with_relations():
+    return select(Visit).options(
+        joinedload(Visit.doctor),
+        joinedload(Visit.pharmacy),
+        joinedload(Visit.rep).joinedload(User.role),
+    )
+
+
+@router.get("/", response_model=PaginatedResponse[VisitOut])
+async def list_visits(
+    page: int = Query(DEFAULT_PAGE, ge=1),
+    page_size: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=500),
+    total_mode: TotalMode = "exact",
+    rep_ids: list[int] | None = Query(default=None, alias="rep_id"),
+    doctor_id: int | None = None,
+    pharmacy_id: int | None = None,
+    date_from: date | None = None,
+    date_to: date | None = None,
+    status_filter: list[str] | None = Query(default=None, alias="status"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> PaginatedResponse[VisitOut]:
+    conditions = _visit_filters(
+        current_user,
+        rep_ids=rep_ids,
+        doctor_id=doctor_id,
+        pharmacy_id=pharmacy_id,
+        date_from=date_from,
+        date_to=date_to,
+        status_filter=status_filter,
+    )
+    stmt = _visit_with_relations().where(*conditions)
 
     page_size = clamp_page_size(page_size)
-    visits, total = paginate(
-        query.order_by(
+    visits, count = await paginate_async(
+        db,
+        stmt.order_by(
             Visit.started_at.desc().nullslast(),
             Visit.visit_date.desc(),
             Visit.id.desc(),
         ),
         page,
         page_size,
+        total_mode,
     )
-    total_pages = max(1, (total + page_size - 1) // page_size)
-    return PaginatedResponse(
-        data=visits,
-        pagination={"page": page, "page_size": page_size, "total": total, "total_pages": total_pages},
+    return model_response(
+        PaginatedResponse[VisitOut](data=visits, pagination=count.pagination(page, page_size))
     )
 
 
 @router.get("/export", dependencies=[Depends(require_roles("sales_manager", "admin"))])
-def export_visits(
+async def export_visits(
     rep_ids: list[int] | None = Query(default=None, alias="rep_id"),
     doctor_id: int | None = None,
     pharmacy_id: int | None = None,
     date_from: date | None = None,
     date_to: date | None = None,
     status_filter: list[str] | None = Query(default=None, alias="status"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> Response:
-    query = (
-        db.query(Visit)
-        .options(joinedload(Visit.doctor), joinedload(Visit.pharmacy), joinedload(Visit.rep))
-        .filter(Visit.is_deleted.is_(False))
+    conditions = _visit_filters(
+        current_user,
+        rep_ids=rep_ids,
+        doctor_id=doctor_id,
+        pharmacy_id=pharmacy_id,
+        date_from=date_from,
+        date_to=date_to,
+        status_filter=status_filter,
     )
-
-    effective_rep_ids = rep_ids or []
-    if has_any_role(current_user, ["medical_rep"]):
-        effective_rep_ids = [current_user.id]
-
-    if effective_rep_ids:
-        query = query.filter(Visit.rep_id.in_(effective_rep_ids))
-    if doctor_id:
-        query = query.filter(Visit.doctor_id == doctor_id)
-    if pharmacy_id:
-        query = query.filter(Visit.pharmacy_id == pharmacy_id)
-    if date_from:
-        query = query.filter(Visit.visit_date >= date_from)
-    if date_to:
-        query = query.filter(Visit.visit_date <= date_to)
-    allowed_statuses = _normalize_status_filters(status_filter)
-    if allowed_statuses:
-        query = query.filter(Visit.status.in_(allowed_statuses))
-
-    visits = query.order_by(
-        Visit.started_at.desc().nullslast(),
-        Visit.visit_date.desc(),
-        Visit.id.desc(),
-    ).all()
+    result = await db.scalars(
+        _visit_with_relations()
+        .where(*conditions)
+        .order_by(
+            Visit.started_at.desc().nullslast(),
+            Visit.visit_date.desc(),
+            Visit.id.desc(),
+        )
+    )
+    visits = result.all()
 
     buffer = io.StringIO()
     writer = csv.DictWriter(
@@ -210,7 +230,7 @@ def export_visits(
 )
 def create_visit(
     payload: VisitCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Visit:
     if payload.doctor_id and not db.get(Doctor, payload.doctor_id):
@@ -231,58 +251,65 @@ def create_visit(
 
 
 @router.get("/summary")
-def visits_summary(
+async def visits_summary(
     rep_ids: list[int] | None = Query(default=None, alias="rep_id"),
     doctor_id: int | None = None,
     pharmacy_id: int | None = None,
     date_from: date | None = None,
     date_to: date | None = None,
     status_filter: list[str] | None = Query(default=None, alias="status"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_read_db),
 ) -> dict:
-    base_query = db.query(Visit).filter(Visit.is_deleted.is_(False))
-    effective_rep_ids = rep_ids or []
-    if has_any_role(current_user, ["medical_rep"]):
-        effective_rep_ids = [current_user.id]
-
-    if effective_rep_ids:
-        base_query = base_query.filter(Visit.rep_id.in_(effective_rep_ids))
-    if doctor_id:
-        base_query = base_query.filter(Visit.doctor_id == doctor_id)
-    if pharmacy_id:
-        base_query = base_query.filter(Visit.pharmacy_id == pharmacy_id)
-    if date_from:
-        base_query = base_query.filter(Visit.visit_date >= date_from)
-    if date_to:
-        base_query = base_query.filter(Visit.visit_date <= date_to)
-    allowed_statuses = _normalize_status_filters(status_filter)
-    if allowed_statuses:
-        base_query = base_query.filter(Visit.status.in_(allowed_statuses))
-
-    total_visits = base_query.count()
-    completed_visits = base_query.filter(Visit.status == "completed").count()
-    scheduled_visits = base_query.filter(Visit.status == "scheduled").count()
-    cancelled_visits = base_query.filter(Visit.status == "cancelled").count()
-    in_progress_visits = base_query.filter(Visit.status == "in_progress").count()
-
-    duration_sum, duration_count = (
-        base_query.filter(Visit.duration_seconds.isnot(None))
-        .with_entities(func.sum(Visit.duration_seconds), func.count(Visit.id))
-        .first()
+    conditions = _visit_filters(
+        current_user,
+        rep_ids=rep_ids,
+        doctor_id=doctor_id,
+        pharmacy_id=pharmacy_id,
+        date_from=date_from,
+        date_to=date_to,
+        status_filter=status_filter,
     )
+
+    def _status_count(value: str):
+        return func.coalesce(func.sum(case((Visit.status == value, 1), else_=0)), 0)
+
+    # One aggregate pass instead of a COUNT per status.
+    (
+        total_visits,
+        completed_visits,
+        scheduled_visits,
+        cancelled_visits,
+        in_progress_visits,
+        duration_sum,
+        duration_count,
+    ) = (
+        await db.execute(
+            select(
+                func.count(Visit.id),
+                _status_count("completed"),
+                _status_count("scheduled"),
+                _status_count("cancelled"),
+                _status_count("in_progress"),
+                func.sum(Visit.duration_seconds),
+                func.count(Visit.duration_seconds),
+            ).where(*conditions)
+        )
+    ).one()
     avg_duration_minutes = (
         round(float(duration_sum or 0) / 60 / max(duration_count, 1), 2) if duration_count else 0.0
     )
 
-    last_visit = (
-        base_query.order_by(
+    last_visit = await db.scalar(
+        select(Visit)
+        .where(*conditions)
+        .order_by(
             Visit.ended_at.desc().nullslast(),
             Visit.started_at.desc().nullslast(),
             Visit.visit_date.desc(),
             Visit.id.desc(),
         )
-        .first()
+        .limit(1)
     )
     last_activity = None
     if last_visit:
@@ -295,19 +322,21 @@ def visits_summary(
             )
 
     rep_rows = (
-        base_query.join(User, User.id == Visit.rep_id)
-        .with_entities(
-            Visit.rep_id,
-            User.name,
-            User.email,
-            func.count(Visit.id),
-            func.sum(case((Visit.status == "completed", 1), else_=0)),
-            func.sum(Visit.duration_seconds),
-            func.max(func.coalesce(Visit.ended_at, Visit.started_at, Visit.visit_date)),
+        await db.execute(
+            select(
+                Visit.rep_id,
+                User.name,
+                User.email,
+                func.count(Visit.id),
+                func.sum(case((Visit.status == "completed", 1), else_=0)),
+                func.sum(Visit.duration_seconds),
+                func.max(func.coalesce(Visit.ended_at, Visit.started_at, Visit.visit_date)),
+            )
+            .join(User, User.id == Visit.rep_id)
+            .where(*conditions)
+            .group_by(Visit.rep_id, User.name, User.email)
         )
-        .group_by(Visit.rep_id, User.name, User.email)
-        .all()
-    )
+    ).all()
 
     visits_by_rep = []
     for rep_id, rep_name, rep_email, total, completed_count, duration_total, last_seen in rep_rows:
@@ -391,16 +420,15 @@ def _serialize_dashboard_visit(visit: Visit) -> dict:
 
 
 @router.get("/latest")
-def latest_visits(
+async def latest_visits(
     page_size: int = Query(5, alias="pageSize", ge=1, le=50),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
 ) -> dict:
     page_size = clamp_page_size(page_size)
-    query = (
-        db.query(Visit)
-        .options(joinedload(Visit.rep), joinedload(Visit.doctor), joinedload(Visit.pharmacy))
-        .filter(Visit.is_deleted.is_(False))
+    stmt = (
+        _visit_with_relations()
+        .where(Visit.is_deleted.is_(False))
         .order_by(
             Visit.ended_at.desc().nullslast(),
             Visit.started_at.desc().nullslast(),
@@ -410,9 +438,9 @@ def latest_visits(
     )
 
     if has_any_role(current_user, ["medical_rep"]):
-        query = query.filter(Visit.rep_id == current_user.id)
+        stmt = stmt.where(Visit.rep_id == current_user.id)
 
-    visits = query.limit(page_size).all()
+    visits = (await db.scalars(stmt.limit(page_size))).all()
     data = [_serialize_dashboard_visit(visit) for visit in visits]
     return {"data": data}
 
@@ -430,8 +458,16 @@ def _get_visit(db: Session, visit_id: int) -> Visit:
 
 
 @router.get("/{visit_id:int}", response_model=VisitOut)
-def get_visit(visit_id: int, current_user: User = Depends(get_current_user), db: Session = Depends(get_db)) -> Visit:
-    visit = _get_visit(db, visit_id)
+async def get_visit(
+    visit_id: int,
+    current_user: CurrentUser = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+) -> Visit:
+    visit = await db.scalar(
+        _visit_with_relations().where(Visit.id == visit_id, Visit.is_deleted.is_(False))
+    )
+    if not visit:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Visit not found.")
     if has_any_role(current_user, ["medical_rep"]) and visit.rep_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not permitted.")
     return visit
@@ -445,7 +481,7 @@ def get_visit(visit_id: int, current_user: User = Depends(get_current_user), db:
 def update_visit(
     visit_id: int,
     payload: VisitUpdate,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Visit:
     visit = _get_visit(db, visit_id)
@@ -500,7 +536,7 @@ def update_visit(
 def start_visit(
     visit_id: int,
     payload: VisitStart,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Visit:
     visit = _get_visit(db, visit_id)
@@ -537,7 +573,7 @@ def start_visit(
 def end_visit(
     visit_id: int,
     payload: VisitEnd,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Visit:
     visit = _get_visit(db, visit_id)
@@ -582,7 +618,7 @@ def end_visit(
 )
 def delete_visit(
     visit_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: CurrentUser = Depends(get_current_user),
     db: Session = Depends(get_db),
 ) -> Response:
     visit = _get_visit(db, visit_id)
@@ -9,11 +9,60 @@ class Settings(BaseSettings):
     app_name: str = "ALQASEER CRM API"
     database_url: str = "sqlite:///./data/fastapi.db"
     prod_database_url: str | None = None
+    read_database_url: str | None = None
+    prod_read_database_url: str | None = None
     echo_sql: bool = False
+    async_db_enabled: bool = True
+    # aiosqlite measured slower end-to-end than running SQLite statements on the threadpool.
+    async_sqlite_enabled: bool = False
+    db_pool_size: int = 10
+    db_max_overflow: int = 20
+    db_pool_timeout_s: float = 30.0
+    db_pool_pre_ping: bool = True
+    db_pool_recycle_s: int = 1800
+    # "tuned" applies the pragmas below on every new SQLite connection; "off" keeps SQLite defaults.
+    sqlite_profile: str = "tuned"
+    sqlite_journal_mode: str = "WAL"
+    sqlite_synchronous: str = "NORMAL"
+    sqlite_busy_timeout_ms: int = 5000
+    sqlite_cache_size_kib: int = 65536
+    sqlite_mmap_size_bytes: int = 268435456
+    sqlite_temp_store: str = "MEMORY"
+    sqlite_foreign_keys: bool = True
+    query_instrumentation_enabled: bool = True
+    # orjson-rendered responses and single-pass serialization for list endpoints.
+    fast_json_responses: bool = True
+    # brotli (when installed) or gzip for responses of at least this many bytes.
+    compression_enabled: bool = True
+    compression_min_size: int = 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 5
+    # Weak ETag + 304 handling and per-resource Cache-Control on GET responses.
+    conditional_get_enabled: bool = True
+    # Prometheus text metrics at /metrics; with METRICS_TOKEN set, scrapes need "Authorization: Bearer <token>".
+    metrics_enabled: bool = True
+    metrics_token: str | None = None
+    # Admin-only per-request sampling profiles (X-Profile: 1 or ?profile=1), rate limited.
+    profiling_enabled: bool = True
+    profiling_interval_ms: int = 5
+    profiling_max_per_minute: int = 6
+    profiling_max_seconds: float = 30.0
+    profiling_dir: str = "data/profiles"
+    profiling_keep: int = 50
+    # Same statement issued this many times in one request is logged as a probable N+1 (0 disables).
+    n_plus_one_threshold: int = 10
     prod_echo_sql: bool | None = None
     jwt_secret: str = "development-secret"
     jwt_algorithm: str = "HS256"
     jwt_expires_minutes: int = 60
+    # Per-process cache: other workers see deactivations/role changes after at most this long.
+    auth_cache_ttl_s: float = 10.0
+    # In-memory trigram index behind fuzzy=true searches; other workers' renames show up after this long.
+    fuzzy_index_ttl_s: float = 600.0
+    # Largest CSV/XLSX body POST /hcps/import accepts.
+    hcp_import_max_bytes: int = 100 * 1024 * 1024
+    password_hash_workers: int = 4
+    password_hash_max_pending: int = 64
     debug: bool = False
     app_version: str = "1.0.0"
     seed_default_users: bool | None = None
@@ -21,6 +70,14 @@ class Settings(BaseSettings):
     gps_max_distance_m: float = Field(default=100.0, validation_alias="GPS_MAX_DISTANCE_M")
     gps_min_accuracy_m: float = Field(default=80.0, validation_alias="GPS_MIN_ACCURACY_M")
     geofence_radius_m: float = Field(default=120.0, validation_alias="GEOFENCE_RADIUS_M")
+    ledger_audit_queue_size: int = 10000
+    ledger_audit_batch_size: int = 200
+    ledger_audit_flush_interval_s: float = 2.0
+    ledger_audit_max_attempts: int = 5
+    # Apply pending migrations during startup; turn off to run scripts/migrate.py separately.
+    migrations_on_startup: bool = True
+    # Rows per backfill transaction; each batch holds the write lock only briefly.
+    migration_batch_size: int = 1000
 
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -48,6 +105,8 @@ class Settings(BaseSettings):
         if env == "production":
             if self.prod_database_url:
                 object.__setattr__(self, "database_url", self.prod_database_url)
+            if self.prod_read_database_url:
+                object.__setattr__(self, "read_database_url", self.prod_read_database_url)
             if self.prod_echo_sql is not None:
                 object.__setattr__(self, "echo_sql", self.prod_echo_sql)
             if self.seed_default_users is None:
@@ -1,16 +1,27 @@
 from __future__ import annotations
 
+import asyncio
+import contextlib
+import importlib.util
 import logging
 from pathlib import Path
 import tempfile
-from typing import Generator
+import time
+import weakref
+from typing import Any, AsyncGenerator, Generator, Iterator, Optional, Sequence, Union
 
-from sqlalchemy import create_engine, text
-from sqlalchemy.engine import Engine
+from fastapi import Depends
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.engine import URL, Engine, Result, Row, make_url
 from sqlalchemy.exc import OperationalError
-from sqlalchemy.orm import DeclarativeBase, sessionmaker
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import DeclarativeBase, Session, sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from starlette.concurrency import run_in_threadpool
 
 from core.config import settings
+from core.metrics import pool_checkout_wait, pool_connections, registry
+from services.normalization import normalize_text
 
 logger = logging.getLogger(__name__)
 
@@ -19,8 +30,176 @@ class Base(DeclarativeBase):
     """Base class for SQLAlchemy models."""
 
 
-def _create_engine(url: str) -> Engine:
+SQLITE_REPORTED_PRAGMAS = (
+    "journal_mode",
+    "synchronous",
+    "busy_timeout",
+    "cache_size",
+    "mmap_size",
+    "temp_store",
+    "foreign_keys",
+)
+
+
+def _is_sqlite_memory(url: URL) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+def sqlite_pragmas(url: URL) -> list[tuple[str, object]]:
+    """Pragmas applied to each new SQLite connection for the configured profile."""
+    if url.get_backend_name() != "sqlite" or settings.sqlite_profile.lower() == "off":
+        return []
+    pragmas: list[tuple[str, object]] = []
+    if not _is_sqlite_memory(url):
+        # journal_mode must come first: WAL lets readers proceed while a writer commits.
+        pragmas += [
+            ("journal_mode", settings.sqlite_journal_mode),
+            ("synchronous", settings.sqlite_synchronous),
+            ("mmap_size", settings.sqlite_mmap_size_bytes),
+        ]
+    pragmas += [
+        ("busy_timeout", settings.sqlite_busy_timeout_ms),
+        # Negative cache_size is in KiB rather than pages.
+        ("cache_size", -abs(settings.sqlite_cache_size_kib)),
+        ("temp_store", settings.sqlite_temp_store),
+        ("foreign_keys", "ON" if settings.sqlite_foreign_keys else "OFF"),
+    ]
+    return pragmas
+
+
+def apply_sqlite_profile(target: Engine) -> None:
+    """Register a connect hook applying :func:`sqlite_pragmas` to ``target``."""
+    pragmas = sqlite_pragmas(target.url)
+    if not pragmas:
+        return
+
+    @event.listens_for(target, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, _connection_record) -> None:  # noqa: ANN001
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas:
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+
+def register_sqlite_functions(dbapi_connection) -> None:  # noqa: ANN001
+    """Python functions SQL may call: ``crm_fold`` is ``normalize_text`` (search triggers and queries)."""
+    dbapi_connection.create_function("crm_fold", 1, normalize_text, deterministic=True)
+
+
+def apply_sqlite_functions(target: Engine) -> None:
+    if target.url.get_backend_name() != "sqlite":
+        return
+
+    @event.listens_for(target, "connect")
+    def _register_functions(dbapi_connection, _connection_record) -> None:  # noqa: ANN001
+        register_sqlite_functions(dbapi_connection)
+
+
+def sqlite_pragma_report(target: Engine) -> dict[str, object]:
+    """Read back the effective pragma values from a live connection."""
+    if target.url.get_backend_name() != "sqlite":
+        return {}
+    with target.connect() as conn:
+        return {name: conn.exec_driver_sql(f"PRAGMA {name}").scalar() for name in SQLITE_REPORTED_PRAGMAS}
+
+
+def sqlite_foreign_key_violations(target: Engine) -> dict[str, int]:
+    """Count rows per table whose foreign keys point at missing parents."""
+    if target.url.get_backend_name() != "sqlite":
+        return {}
+    counts: dict[str, int] = {}
+    with target.connect() as conn:
+        for table, *_ in conn.exec_driver_sql("PRAGMA foreign_key_check"):
+            counts[table] = counts.get(table, 0) + 1
+    return counts
+
+
+def apply_read_only(target: Engine) -> None:
+    """Make every connection of a replica engine refuse writes."""
+    backend = target.url.get_backend_name()
+    if backend == "sqlite":
+        statement = "PRAGMA query_only=ON"
+    elif backend == "postgresql":
+        statement = "SET SESSION CHARACTERISTICS AS TRANSACTION READ ONLY"
+    else:
+        return
+
+    @event.listens_for(target, "connect")
+    def _set_read_only(dbapi_connection, _connection_record) -> None:  # noqa: ANN001
+        cursor = dbapi_connection.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+        if backend == "postgresql":
+            # psycopg/asyncpg open an implicit transaction for SET; end it so the pool sees a clean connection.
+            dbapi_connection.commit()
+
+
+class _CheckoutTimer:
+    """Reports how long each checkout waited for a connection, labelled by pool name."""
+
+    def _do_get(self):  # noqa: ANN202
+        started = time.perf_counter()
+        try:
+            return super()._do_get()  # type: ignore[misc]
+        finally:
+            pool_checkout_wait.observe(self.logging_name or "default", value=time.perf_counter() - started)  # type: ignore[attr-defined]
+
+
+class TimedQueuePool(_CheckoutTimer, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_CheckoutTimer, AsyncAdaptedQueuePool):
+    pass
+
+
+def _pool_kwargs(url: URL, *, name: str = "primary", is_async: bool = False) -> dict:
+    if _is_sqlite_memory(url):
+        # In-memory SQLite uses a singleton/static pool that takes no sizing arguments.
+        return {}
+    kwargs = {
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout_s,
+        "pool_logging_name": name,
+    }
+    if settings.metrics_enabled:
+        kwargs["poolclass"] = TimedAsyncAdaptedQueuePool if is_async else TimedQueuePool
+    if url.get_backend_name() != "sqlite":
+        # Server connections can be dropped by the network or the server; a local file cannot.
+        kwargs["pool_pre_ping"] = settings.db_pool_pre_ping
+        kwargs["pool_recycle"] = settings.db_pool_recycle_s
+    return kwargs
+
+
+def _build_engine(url: str, connect_args: dict, *, read_only: bool = False) -> Engine:
+    new_engine = create_engine(
+        url,
+        echo=settings.echo_sql,
+        connect_args=connect_args,
+        **_pool_kwargs(make_url(url), name="read" if read_only else "primary"),
+    )
+    apply_sqlite_profile(new_engine)
+    apply_sqlite_functions(new_engine)
+    if read_only:
+        apply_read_only(new_engine)
+    return new_engine
+
+
+def normalize_database_url(url: str) -> str:
+    # Hosted providers often hand out postgres:// DSNs, which SQLAlchemy does not accept.
+    if url.startswith("postgres://"):
+        return "postgresql+psycopg://" + url[len("postgres://") :]
+    return url
+
+
+def _create_engine(url: str, *, allow_fallback: bool = True, read_only: bool = False) -> Engine:
     connect_args = {}
+    url = normalize_database_url(url)
     normalized_url = url
 
     if url.startswith("sqlite"):
@@ -36,7 +215,7 @@ def _create_engine(url: str) -> Engine:
                 db_path.parent.mkdir(parents=True, exist_ok=True)
             except OSError as exc:
                 msg = str(exc).lower()
-                if "read-only" in msg or "readonly" in msg or "permission" in msg:
+                if allow_fallback and ("read-only" in msg or "readonly" in msg or "permission" in msg):
                     logger.error(
                         "Primary DB path unavailable (%s): %s. Falling back to temp SQLite.",
                         db_path,
@@ -46,14 +225,14 @@ def _create_engine(url: str) -> Engine:
                 raise
             normalized_url = f"sqlite:///{db_path.as_posix()}"
 
-    engine = create_engine(normalized_url, echo=settings.echo_sql, connect_args=connect_args)
+    engine = _build_engine(normalized_url, connect_args, read_only=read_only)
 
     try:
         with engine.connect() as conn:
             conn.execute(text("SELECT 1"))
     except OperationalError as exc:
         msg = str(exc).lower()
-        if "disk i/o error" in msg or "readonly" in msg:
+        if allow_fallback and ("disk i/o error" in msg or "readonly" in msg):
             logger.error(
                 "Primary DB path unavailable (%s): %s. Falling back to temp SQLite.",
                 normalized_url,
@@ -70,23 +249,137 @@ def build_fallback_engine() -> Engine:
     fallback_path = Path(tempfile.gettempdir()) / "crm_fastapi_fallback.sqlite"
     fallback_path.parent.mkdir(parents=True, exist_ok=True)
     fallback_url = f"sqlite:///{fallback_path.as_posix()}"
-    engine = create_engine(
-        fallback_url,
-        echo=settings.echo_sql,
-        connect_args={"check_same_thread": False},
-    )
+    engine = _build_engine(fallback_url, {"check_same_thread": False})
     logger.warning("Using fallback SQLite DB at %s", fallback_url)
     return engine
 
 
+def _driver_available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def async_url_for(url: URL) -> Optional[URL]:
+    """
+    Map a sync SQLAlchemy URL onto an installed async driver.
+
+    SQLite uses aiosqlite; PostgreSQL prefers asyncpg and falls back to
+    psycopg (v3), whose dialect is async-capable under the same name.
+    Returns None when no async driver is installed.
+    """
+    backend = url.get_backend_name()
+    if backend == "sqlite":
+        return url.set(drivername="sqlite+aiosqlite") if _driver_available("aiosqlite") else None
+    if backend == "postgresql":
+        if url.get_driver_name() == "psycopg" and _driver_available("psycopg"):
+            return url
+        if _driver_available("asyncpg"):
+            return url.set(drivername="postgresql+asyncpg")
+        if _driver_available("psycopg"):
+            return url.set(drivername="postgresql+psycopg")
+    return None
+
+
+def _create_async_engine(sync_engine: Engine, name: str = "async") -> Optional[AsyncEngine]:
+    """
+    Async twin of ``sync_engine`` pointing at the same (already resolved)
+    database, or None to serve async routes through :class:`ThreadedSession`.
+    """
+    if not settings.async_db_enabled:
+        return None
+    if sync_engine.url.get_backend_name() == "sqlite":
+        if _is_sqlite_memory(sync_engine.url):
+            # A second engine would open its own, empty, in-memory database.
+            return None
+        if not settings.async_sqlite_enabled:
+            return None
+    url = async_url_for(sync_engine.url)
+    if url is None:
+        logger.warning(
+            "No async driver installed for %s; async routes fall back to the threadpool.",
+            sync_engine.url.get_backend_name(),
+        )
+        return None
+    connect_args = {"check_same_thread": False} if url.get_backend_name() == "sqlite" else {}
+    new_engine = create_async_engine(
+        url, echo=settings.echo_sql, connect_args=connect_args, **_pool_kwargs(url, name=name, is_async=True)
+    )
+    apply_sqlite_profile(new_engine.sync_engine)
+    apply_sqlite_functions(new_engine.sync_engine)
+    return new_engine
+
+
+def _create_read_engine(primary: Engine) -> Engine:
+    """Engine for READ_DATABASE_URL, or the primary engine when no replica is configured."""
+    if not settings.read_database_url:
+        return primary
+    try:
+        return _create_engine(settings.read_database_url, allow_fallback=False, read_only=True)
+    except (OperationalError, OSError) as exc:
+        logger.error("Read replica unavailable (%s); reads use the primary database.", exc)
+        return primary
+
+
 def swap_engine(new_engine: Engine) -> None:
-    global engine, SessionLocal
+    global engine, async_engine, SessionLocal
+    shares_reads = read_engine is engine
     engine = new_engine
     SessionLocal.configure(bind=new_engine)
+    async_engine = _create_async_engine(new_engine)
+    AsyncSessionLocal.configure(bind=async_engine)
+    if shares_reads:
+        swap_read_engine(new_engine)
+
+
+def swap_read_engine(new_engine: Engine) -> None:
+    """Point report/export reads at ``new_engine`` (the primary engine to disable routing)."""
+    global read_engine, async_read_engine
+    read_engine = new_engine
+    ReadSessionLocal.configure(bind=new_engine)
+    async_read_engine = _create_async_read_engine(new_engine)
+    AsyncReadSessionLocal.configure(bind=async_read_engine)
+
+
+def _create_async_read_engine(target: Engine) -> Optional[AsyncEngine]:
+    if target is engine:
+        return async_engine
+    replica = _create_async_engine(target, name="async_read")
+    if replica is not None:
+        apply_read_only(replica.sync_engine)
+    return replica
 
 
 engine = _create_engine(settings.database_url)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = _create_async_engine(engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+read_engine = _create_read_engine(engine)
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+async_read_engine = _create_async_read_engine(read_engine)
+AsyncReadSessionLocal = async_sessionmaker(bind=async_read_engine, autoflush=False, expire_on_commit=False)
+
+
+def _pool_stats():  # noqa: ANN202
+    pools = {}
+    for candidate in (engine, read_engine, async_engine, async_read_engine):
+        if candidate is None:
+            continue
+        pool = candidate.pool
+        if isinstance(pool, QueuePool):
+            pools.setdefault(id(pool), pool)
+    values = []
+    for pool in pools.values():
+        name = pool.logging_name or "default"
+        values += [
+            ((name, "size"), pool.size()),
+            ((name, "checked_out"), pool.checkedout()),
+            ((name, "checked_in"), pool.checkedin()),
+            ((name, "overflow"), max(pool.overflow(), 0)),
+        ]
+    yield pool_connections, values
+
+
+registry.add_collector(_pool_stats)
 
 
 def get_db() -> Generator:
@@ -95,3 +388,97 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+def iter_partitions(statement: Any, size: int = 1000) -> Iterator[Sequence[Row]]:
+    """
+    Rows of ``statement`` in lists of at most ``size``, fetched as they are
+    consumed (server-side cursor where the driver has one). Uses a session of
+    its own, so a streaming response can keep reading after the request's
+    session is gone; the session closes when the iterator is exhausted or closed.
+    """
+    with SessionLocal() as session:
+        result = session.execute(statement.execution_options(yield_per=size))
+        yield from result.partitions()
+
+
+class ThreadedSession:
+    """
+    Read-only AsyncSession stand-in backed by the sync engine.
+
+    Used when the async engine is disabled, no async driver is installed, or
+    the database is SQLite. Each statement runs as a single threadpool hop and
+    its rows are buffered before returning, so callers can use the usual
+    ``await db.scalars(...)``.
+    """
+
+    def __init__(self, session: Session) -> None:
+        self._session = session
+
+    def _execute_buffered(self, statement: Any, params: Optional[dict]) -> Result:
+        return self._session.execute(statement, params).freeze()()
+
+    async def execute(self, statement: Any, params: Optional[dict] = None) -> Result:
+        return await run_in_threadpool(self._execute_buffered, statement, params)
+
+    async def scalars(self, statement: Any, params: Optional[dict] = None):
+        return (await self.execute(statement, params)).scalars()
+
+    async def scalar(self, statement: Any, params: Optional[dict] = None) -> Any:
+        return (await self.execute(statement, params)).scalar()
+
+    async def close(self) -> None:
+        await run_in_threadpool(self._session.close)
+
+
+_THREADED_SLOTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict]" = weakref.WeakKeyDictionary()
+
+
+def _threaded_session_slots(sync_factory: sessionmaker) -> Union[asyncio.Semaphore, contextlib.nullcontext]:
+    """Per event loop and engine semaphore sized to the engine's QueuePool capacity."""
+    bind = sync_factory.kw["bind"]
+    if not isinstance(bind.pool, QueuePool):
+        return contextlib.nullcontext()
+    slots = _THREADED_SLOTS.setdefault(asyncio.get_running_loop(), {})
+    semaphore = slots.get(id(bind))
+    if semaphore is None:
+        capacity = settings.db_pool_size + max(settings.db_max_overflow, 0)
+        semaphore = slots[id(bind)] = asyncio.Semaphore(max(capacity, 1))
+    return semaphore
+
+
+async def _async_session(
+    target: Optional[AsyncEngine],
+    async_factory: async_sessionmaker,
+    sync_factory: sessionmaker,
+) -> AsyncGenerator[Union[AsyncSession, ThreadedSession], None]:
+    if target is None:
+        # A ThreadedSession keeps its pooled connection between threadpool hops.
+        # Without a cap, requests holding every connection can end up queued
+        # for threads that are themselves blocked waiting for a connection.
+        async with _threaded_session_slots(sync_factory):
+            db = ThreadedSession(sync_factory())
+            try:
+                yield db
+            finally:
+                await db.close()
+        return
+    async with async_factory() as db:
+        yield db
+
+
+async def get_async_db() -> AsyncGenerator[Union[AsyncSession, ThreadedSession], None]:
+    async for db in _async_session(async_engine, AsyncSessionLocal, SessionLocal):
+        yield db
+
+
+async def get_async_read_db(
+    primary: Union[AsyncSession, ThreadedSession] = Depends(get_async_db),
+) -> AsyncGenerator[Union[AsyncSession, ThreadedSession], None]:
+    """Session on the read replica (or the primary when none is configured); never write through it."""
+    if read_engine is engine:
+        # Share the request's primary session rather than holding a second pooled connection.
+        yield primary
+        return
+    async for db in _async_session(async_read_engine, AsyncReadSessionLocal, ReadSessionLocal):
+        yield db
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Rarely changing reference data may be reused by the browser for a while;
+# everything else must be revalidated, which the ETag makes cheap.
+CACHE_POLICIES: tuple[tuple[str, str], ...] = (
+    ("/api/v1/territories", "private, max-age=3600"),
+    ("/api/v1/products", "private, max-age=300"),
+    ("/api/v1/reps", "private, max-age=120"),
+    ("/api/v1/sales-reps", "private, max-age=120"),
+)
+DEFAULT_CACHE_POLICY = "private, no-cache"
+
+
+def cache_policy(path: str) -> str:
+    for prefix, policy in CACHE_POLICIES:
+        if path == prefix or path.startswith(prefix + "/"):
+            return policy
+    return DEFAULT_CACHE_POLICY
+
+
+def weak_etag(body: bytes) -> str:
+    return f'W/"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison (RFC 9110 13.1.2): opaque tags match regardless of W/ prefixes."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    wanted = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == wanted for candidate in if_none_match.split(","))
+
+
+class ConditionalGetMiddleware:
+    """
+    Weak ETags and Cache-Control for successful GET/HEAD responses, with
+    ``304 Not Modified`` when If-None-Match matches. The body is still
+    produced (the tag is a hash of it), but nothing is sent back. Streamed
+    responses are passed through untouched.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "HEAD"):
+            await self.app(scope, receive, send)
+            return
+
+        if_none_match = Headers(scope=scope).get("if-none-match")
+        policy = cache_policy(scope["path"])
+        start: Optional[Message] = None
+        passthrough = False
+
+        async def send_with_etag(message: Message) -> None:
+            nonlocal start, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] != 200 or "etag" in headers:
+                    passthrough = True
+                    await send(message)
+                else:
+                    start = message
+                return
+            if message["type"] != "http.response.body" or start is None:
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            headers = MutableHeaders(raw=start["headers"])
+            headers.setdefault("cache-control", policy)
+            if message.get("more_body", False):
+                passthrough = True
+                await send(start)
+                await send(message)
+                return
+
+            etag = weak_etag(body)
+            headers["etag"] = etag
+            if etag_matches(if_none_match, etag):
+                not_modified = MutableHeaders()
+                for name in ("etag", "cache-control", "vary"):
+                    if name in headers:
+                        not_modified[name] = headers[name]
+                await send({"type": "http.response.start", "status": 304, "headers": not_modified.raw})
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await send(start)
+            await send(message)
+
+        await self.app(scope, receive, send_with_etag)
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import logging
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Iterator, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+_START_KEY = "crm_query_started"
+
+
+@dataclass
+class QueryStats:
+    """Statements issued while handling one request (or one ``capture_queries`` block)."""
+
+    count: int = 0
+    total_ms: float = 0.0
+    slowest_ms: float = 0.0
+    slowest_sql: str = ""
+    shapes: Counter = field(default_factory=Counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def record(self, statement: str, elapsed_ms: float, *, executemany: bool = False) -> None:
+        shape = _WHITESPACE.sub(" ", statement).strip()
+        with self._lock:
+            self.count += 1
+            self.total_ms += elapsed_ms
+            # An executemany is already a batch (bulk imports send one per batch); not an N+1.
+            if not executemany:
+                self.shapes[shape] += 1
+            if elapsed_ms > self.slowest_ms:
+                self.slowest_ms = elapsed_ms
+                self.slowest_sql = shape
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """Statement shapes issued at least ``threshold`` times (likely N+1 loads)."""
+        with self._lock:
+            return [(shape, hits) for shape, hits in self.shapes.most_common() if hits >= threshold]
+
+    def server_timing(self) -> str:
+        return f'db;dur={self.total_ms:.1f};desc="{self.count} queries", db-slowest;dur={self.slowest_ms:.1f}'
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar("crm_query_stats", default=None)
+
+
+def _before_cursor_execute(conn, _cursor, _statement, _parameters, _context, _executemany) -> None:  # noqa: ANN001
+    if _current_stats.get() is not None:
+        conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, _cursor, statement, _parameters, _context, executemany) -> None:  # noqa: ANN001
+    stats = _current_stats.get()
+    started = conn.info.get(_START_KEY)
+    if stats is None or not started:
+        return
+    stats.record(statement, (time.perf_counter() - started.pop()) * 1000, executemany=executemany)
+
+
+def install_query_hooks() -> None:
+    """Time every statement on every engine (primary, replica, async, ledger files)."""
+    if not event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """
+    Collect the statements issued in the current context. Threadpool hops
+    (run_in_threadpool, sync routes) copy the context, so they count too.
+    """
+    install_query_hooks()
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def report_repeated_queries(stats: QueryStats, label: str, threshold: int) -> None:
+    for shape, hits in stats.repeated(threshold):
+        logger.warning("Possible N+1 in %s: %s x %s", label, hits, shape[:300])
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Count statements per HTTP request and expose them as a ``Server-Timing``
+    header (``db`` total and ``db-slowest``); repeated statement shapes at or
+    above ``N_PLUS_ONE_THRESHOLD`` are logged as probable N+1 queries.
+    """
+
+    def __init__(self, app: ASGIApp, threshold: Optional[int] = None) -> None:
+        self.app = app
+        self.threshold = threshold if threshold is not None else settings.n_plus_one_threshold
+        install_query_hooks()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _current_stats.set(stats)
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start" and stats.count:
+                MutableHeaders(scope=message).append("Server-Timing", stats.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current_stats.reset(token)
+            if self.threshold > 0:
+                report_repeated_queries(stats, f"{scope['method']} {scope['path']}", self.threshold)
@@ -0,0 +1,279 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+from types import CodeType, FrameType
+from typing import Optional
+
+import anyio.to_thread
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from core.config import settings
+from core.security import has_any_role, user_from_token
+
+try:  # Worker threads are attributed through the contextvars.Context they run in.
+    from anyio._backends._asyncio import WorkerThread
+
+    _WORKER_RUN_CODE: Optional[CodeType] = WorkerThread.run.__code__
+except (ImportError, AttributeError):  # pragma: no cover - depends on anyio internals
+    _WORKER_RUN_CODE = None
+
+logger = logging.getLogger(__name__)
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+PROFILE_ID = re.compile(r"^[0-9]{8}T[0-9]{6}-[0-9a-f]{8}$")
+_TRUE = {"1", "true", "yes", "on"}
+
+_active_profile: ContextVar[Optional["RequestProfile"]] = ContextVar("crm_active_profile", default=None)
+
+
+def profiles_dir() -> Path:
+    path = Path(settings.profiling_dir)
+    return path if path.is_absolute() else BACKEND_DIR / path
+
+
+class RequestProfile:
+    """Folded stacks (``frame;frame;frame count``) sampled while one request runs."""
+
+    def __init__(self, profile_id: str, loop: asyncio.AbstractEventLoop, task: Optional[asyncio.Task]) -> None:
+        self.id = profile_id
+        self.loop = loop
+        self.task = task
+        self.loop_thread = threading.get_ident()
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.truncated = False
+        self._labels: dict[CodeType, str] = {}
+
+    def _label(self, code: CodeType) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            label = self._labels[code] = f"{code.co_name} ({Path(code.co_filename).name}:{code.co_firstlineno})"
+        return label
+
+    def _fold(self, leaf: FrameType, root: str, stop: Optional[CodeType]) -> str:
+        frames: list[str] = []
+        frame: Optional[FrameType] = leaf
+        while frame is not None and frame.f_code is not stop:
+            frames.append(self._label(frame.f_code))
+            frame = frame.f_back
+        frames.append(root)
+        return ";".join(reversed(frames))
+
+    def _runs_this_request(self, frame: FrameType) -> bool:
+        while frame is not None:
+            if frame.f_code is _WORKER_RUN_CODE:
+                context = frame.f_locals.get("context")
+                return context is not None and context.get(_active_profile) is self
+            frame = frame.f_back
+        return False
+
+    def sample(self, sampler_thread: int) -> None:
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == sampler_thread:
+                continue
+            if thread_id == self.loop_thread:
+                if asyncio.current_task(self.loop) is self.task:
+                    self.stacks[self._fold(frame, "event-loop", None)] += 1
+            elif _WORKER_RUN_CODE is not None and self._runs_this_request(frame):
+                self.stacks[self._fold(frame, "threadpool", _WORKER_RUN_CODE)] += 1
+        self.samples += 1
+
+    def folded(self) -> str:
+        return "".join(f"{stack} {count}\n" for stack, count in self.stacks.most_common())
+
+
+class _Sampler(threading.Thread):
+    def __init__(self, profile: RequestProfile, interval_s: float, max_seconds: float) -> None:
+        super().__init__(name="request-profiler", daemon=True)
+        self.profile = profile
+        self.interval_s = interval_s
+        self.max_seconds = max_seconds
+        self.stopped = threading.Event()
+
+    def run(self) -> None:
+        deadline = time.monotonic() + self.max_seconds
+        while not self.stopped.wait(self.interval_s):
+            if time.monotonic() > deadline:
+                self.profile.truncated = True
+                return
+            self.profile.sample(threading.get_ident())
+
+
+class ProfileGate:
+    """At most ``per_minute`` profiles in any 60 s window, and one at a time."""
+
+    def __init__(self, per_minute: int) -> None:
+        self.per_minute = per_minute
+        self._started: deque[float] = deque()
+        self._running = False
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        now = time.monotonic()
+        with self._lock:
+            while self._started and now - self._started[0] > 60:
+                self._started.popleft()
+            if self._running or len(self._started) >= self.per_minute:
+                return False
+            self._running = True
+            self._started.append(now)
+            return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._running = False
+
+
+profile_gate = ProfileGate(settings.profiling_max_per_minute)
+
+
+def list_profiles(limit: int = 50) -> list[dict]:
+    directory = profiles_dir()
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for meta_path in sorted(directory.glob("*.json"), reverse=True)[:limit]:
+        try:
+            profiles.append(json.loads(meta_path.read_text(encoding="utf-8")))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id: str) -> Optional[Path]:
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = profiles_dir() / f"{profile_id}.folded"
+    return path if path.is_file() else None
+
+
+def _store(profile: RequestProfile, meta: dict) -> None:
+    directory = profiles_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    (directory / f"{profile.id}.folded").write_text(profile.folded(), encoding="utf-8")
+    (directory / f"{profile.id}.json").write_text(json.dumps(meta), encoding="utf-8")
+    for stale in sorted(directory.glob("*.json"), reverse=True)[max(settings.profiling_keep, 1) :]:
+        stale.unlink(missing_ok=True)
+        stale.with_suffix(".folded").unlink(missing_ok=True)
+
+
+def _requested(scope: Scope, headers: Headers) -> bool:
+    if headers.get("x-profile", "").strip().lower() in _TRUE:
+        return True
+    if b"profile" not in scope.get("query_string", b""):
+        return False
+    return QueryParams(scope["query_string"]).get("profile", "").strip().lower() in _TRUE
+
+
+def _bearer_token(headers: Headers) -> Optional[str]:
+    auth_header = headers.get("authorization") or ""
+    if auth_header.lower().startswith("bearer "):
+        return auth_header.split(" ", 1)[1].strip()
+    return headers.get("x-auth-token")
+
+
+class ProfilingMiddleware:
+    """
+    Sampling profile of single requests, on demand.
+
+    An admin sends ``X-Profile: 1`` (or ``?profile=1``); the request runs as
+    usual while a background thread samples its stacks every
+    ``PROFILING_INTERVAL_MS``, on the event loop and on threadpool workers
+    running in the request's context. The folded stacks land in
+    ``PROFILING_DIR`` (``flamegraph.pl``/speedscope input) and the response
+    carries ``X-Profile-Id``. Requests without the flag are not touched;
+    flagged requests beyond the rate limit run unprofiled with
+    ``X-Profile: skipped``.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        if not _requested(scope, headers):
+            await self.app(scope, receive, send)
+            return
+
+        token = _bearer_token(headers)
+        user = await user_from_token(token) if token else None
+        if user is None or not has_any_role(user, ("admin",)):
+            await self.app(scope, receive, send)
+            return
+        # get_current_user reuses this instead of resolving the token again.
+        scope.setdefault("state", {})["current_user"] = user
+
+        if not profile_gate.try_acquire():
+            await self.app(scope, receive, self._tagged(send, "X-Profile", "skipped"))
+            return
+
+        profile_id = f"{datetime.now(timezone.utc):%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}"
+        profile = RequestProfile(profile_id, asyncio.get_running_loop(), asyncio.current_task())
+        status_code = 500
+
+        async def send_with_id(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                MutableHeaders(scope=message)["X-Profile-Id"] = profile_id
+            await send(message)
+
+        sampler = _Sampler(
+            profile,
+            interval_s=max(settings.profiling_interval_ms, 1) / 1000,
+            max_seconds=settings.profiling_max_seconds,
+        )
+        token_var = _active_profile.set(profile)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stopped.set()
+            duration_ms = (time.perf_counter() - started) * 1000
+            _active_profile.reset(token_var)
+            await anyio.to_thread.run_sync(sampler.join)
+            profile_gate.release()
+            meta = {
+                "id": profile_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "query": scope.get("query_string", b"").decode("latin-1"),
+                "status": status_code,
+                "durationMs": round(duration_ms, 1),
+                "samples": profile.samples,
+                "intervalMs": settings.profiling_interval_ms,
+                "truncated": profile.truncated,
+                "userId": user.id,
+                "createdAt": datetime.now(timezone.utc).isoformat(),
+            }
+            try:
+                await anyio.to_thread.run_sync(_store, profile, meta)
+            except OSError as exc:
+                logger.warning("Could not store profile %s: %s", profile_id, exc)
+            else:
+                logger.info("Profiled %s %s in %.1f ms as %s", scope["method"], scope["path"], duration_ms, profile_id)
+
+    @staticmethod
+    def _tagged(send: Send, name: str, value: str) -> Send:
+        async def send_tagged(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message)[name] = value
+            await send(message)
+
+        return send_tagged
@@ -0,0 +1,79 @@
+from __future__ import annotations
+
+import json
+from decimal import Decimal
+from typing import Any, Iterable, Iterator
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from pydantic import BaseModel
+
+from core.config import settings
+
+try:  # Optional: without orjson responses fall back to jsonable_encoder + json.
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _orjson_default(value: Any) -> Any:
+    if isinstance(value, Decimal):
+        # Same rule as jsonable_encoder: whole numbers stay ints.
+        return int(value) if value.as_tuple().exponent >= 0 else float(value)
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered by orjson when it is installed (dates, datetimes and UUIDs natively)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(jsonable_encoder(content))
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_response(content: Any) -> Any:
+    """
+    Return route output that is already in its final shape (dicts of plain
+    values) without FastAPI's response_model validation and jsonable_encoder
+    pass. With FAST_JSON_RESPONSES=false the content goes through FastAPI as usual.
+    """
+    if not settings.fast_json_responses:
+        return content
+    return FastJSONResponse(content)
+
+
+def model_response(model: BaseModel) -> Any:
+    """
+    Serialize a validated response model once, in pydantic-core. Returned as
+    a model, FastAPI would dump it to a dict, validate it again and then encode it.
+    """
+    if not settings.fast_json_responses:
+        return model
+    return Response(model.model_dump_json(by_alias=True), media_type="application/json")
+
+
+def ndjson_lines(items: Iterable[Any]) -> bytes:
+    """One compact JSON document per item, each ending in a newline."""
+    if orjson is None:
+        return b"".join(
+            json.dumps(jsonable_encoder(item), ensure_ascii=False, separators=(",", ":")).encode() + b"\n"
+            for item in items
+        )
+    return b"".join(
+        orjson.dumps(item, default=_orjson_default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE)
+        for item in items
+    )
+
+
+def ndjson_response(batches: Iterator[Iterable[Any]]) -> StreamingResponse:
+    """
+    Stream ``batches`` of items as newline-delimited JSON, one chunk per batch.
+    A plain iterator is advanced in the threadpool, so batches may come
+    straight from a blocking database cursor (see ``core.db.iter_partitions``).
+    """
+    return StreamingResponse(map(ndjson_lines, batches), media_type=NDJSON_MEDIA_TYPE)
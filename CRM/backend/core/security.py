@@ -1,19 +1,111 @@
 from __future__ import annotations
 
 import logging
+import threading
+import time
+from dataclasses import dataclass
 from typing import Iterable, Optional
 
 import jwt
 from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import joinedload
 
 from core.config import settings
-from core.db import get_db
+from core.db import get_async_db
+from core.metrics import observe_cache
 from models.crm import User
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass(frozen=True)
+class RoleSnapshot:
+    id: int
+    slug: str
+    name: str
+    description: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class CurrentUser:
+    """Detached, read-only view of the authenticated user safe to share across requests."""
+
+    id: int
+    name: str
+    email: str
+    is_active: bool
+    role_id: int
+    role: Optional[RoleSnapshot]
+
+    @classmethod
+    def from_user(cls, user: User) -> "CurrentUser":
+        role = None
+        if user.role is not None:
+            role = RoleSnapshot(
+                id=user.role.id,
+                slug=user.role.slug,
+                name=user.role.name,
+                description=user.role.description,
+            )
+        return cls(
+            id=user.id,
+            name=user.name,
+            email=user.email,
+            is_active=bool(user.is_active),
+            role_id=user.role_id,
+            role=role,
+        )
+
+
+class UserCache:
+    """Process-wide TTL cache of user_id -> CurrentUser (active flag and role included)."""
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[int, tuple[float, CurrentUser]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[CurrentUser]:
+        entry = self._entries.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            self.hits += 1
+            observe_cache("auth_user", True)
+            return entry[1]
+        self.misses += 1
+        observe_cache("auth_user", False)
+        return None
+
+    def set(self, user: CurrentUser) -> None:
+        if self.ttl_seconds <= 0:
+            return
+        with self._lock:
+            self._entries[user.id] = (time.monotonic() + self.ttl_seconds, user)
+
+    def invalidate(self, user_id: Optional[int] = None) -> None:
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(int(user_id), None)
+
+
+user_cache = UserCache(settings.auth_cache_ttl_s)
+
+
+def invalidate_user_cache(user_id: Optional[int] = None) -> None:
+    """
+    Drop cached auth state for one user (or everyone) after admin changes.
+
+    Only the current process is affected; with several uvicorn workers the
+    others keep their entry until AUTH_CACHE_TTL_S expires.
+    """
+    user_cache.invalidate(user_id)
+
 http_bearer = HTTPBearer(auto_error=False)
 
 ROLE_ALIASES = {
@@ -29,7 +121,7 @@ def canonicalize_role(role: Optional[str]) -> Optional[str]:
     return ROLE_ALIASES.get(role, role)
 
 
-def has_any_role(user: User, roles: Iterable[str]) -> bool:
+def has_any_role(user: User | CurrentUser, roles: Iterable[str]) -> bool:
     normalized = [canonicalize_role(r) for r in roles if r]
     user_role = canonicalize_role(user.role.slug if user.role else None)
     return bool(user_role and normalized and user_role in normalized)
@@ -68,11 +160,39 @@ def decode_token(token: str) -> dict:
     return payload
 
 
+async def _load_current_user(db: AsyncSession, user_id: int) -> Optional[CurrentUser]:
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+    user = await db.scalar(select(User).options(joinedload(User.role)).where(User.id == user_id))
+    if not user:
+        return None
+    snapshot = CurrentUser.from_user(user)
+    user_cache.set(snapshot)
+    return snapshot
+
+
+async def user_from_token(token: str) -> Optional[CurrentUser]:
+    """Resolve a bearer token outside dependency injection (middleware); None if invalid or inactive."""
+    try:
+        user_id = int(decode_token(token).get("sub"))
+    except (HTTPException, TypeError, ValueError):
+        return None
+    user = None
+    async for db in get_async_db():
+        user = await _load_current_user(db, user_id)
+    return user if user and user.is_active else None
+
+
 async def get_current_user(
     request: Request,
     credentials: HTTPAuthorizationCredentials | None = Depends(http_bearer),
-    db: Session = Depends(get_db),
-) -> User:
+    db: AsyncSession = Depends(get_async_db),
+) -> CurrentUser:
+    memo = getattr(request.state, "current_user", None)
+    if memo is not None:
+        return memo
+
     token = _extract_token(request, credentials)
     if not token:
         raise HTTPException(
@@ -88,23 +208,27 @@ async def get_current_user(
             detail="Invalid authentication token.",
         )
 
-    user = (
-        db.query(User)
-        .options(joinedload(User.role))
-        .filter(User.id == int(user_id), User.is_active.is_(True))
-        .first()
-    )
-    if not user:
+    try:
+        resolved_id = int(user_id)
+    except (TypeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication token.",
+        ) from exc
+
+    user = await _load_current_user(db, resolved_id)
+    if not user or not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid authentication token.",
         )
 
+    request.state.current_user = user
     return user
 
 
 def require_roles(*roles: str):
-    async def dependency(user: User = Depends(get_current_user)) -> User:
+    async def dependency(user: CurrentUser = Depends(get_current_user)) -> CurrentUser:
         if roles and not has_any_role(user, roles):
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Insufficient permissions."
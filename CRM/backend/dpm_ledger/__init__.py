@@ -1,3 +1,3 @@
-from dpm_ledger import analyzer, config, models_raw, router, services  # noqa: F401
+from dpm_ledger import analyzer, audit, config, links, mapping, models_raw, router, services  # noqa: F401
 
-__all__ = ["analyzer", "config", "models_raw", "router", "services"]
+__all__ = ["analyzer", "audit", "config", "links", "mapping", "models_raw", "router", "services"]
@@ -1,44 +1,208 @@
 from __future__ import annotations
 
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List
-
-from sqlalchemy import create_engine, inspect, text
+from typing import Dict, Iterable, List, Optional
 
+from core.metrics import observe_cache
 from dpm_ledger.config import DEFAULT_DB_DIR
 
+logger = logging.getLogger(__name__)
+
 REPORT_PATH = Path(__file__).resolve().parents[1] / "docs" / "dpm_ledger_schema_report.md"
+CACHE_FILENAME = ".ledger_analysis_cache.json"
+# Rows sampled per index when ANALYZE runs on a scratch copy; keeps it bounded on huge files.
+ANALYSIS_LIMIT = 1000
+
+
+def _connect_readonly(path: Path) -> sqlite3.Connection:
+    return sqlite3.connect(f"file:{path.as_posix()}?mode=ro", uri=True)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _stat1_counts(conn: sqlite3.Connection) -> Dict[str, int]:
+    """Row counts recorded by a previous ANALYZE, keyed by lower-cased table name."""
+    try:
+        rows = conn.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()
+    except sqlite3.Error:
+        return {}
+    counts: Dict[str, int] = {}
+    for tbl, _idx, stat in rows:
+        if not tbl or not stat:
+            continue
+        try:
+            value = int(str(stat).split()[0])
+        except ValueError:
+            continue
+        key = tbl.lower()
+        counts[key] = max(counts.get(key, 0), value)
+    return counts
 
 
-def _approx_row_count(engine, table_name: str) -> int:
+def _analyze_copy_counts(path: Path) -> Dict[str, int]:
+    """Run a bounded ANALYZE on a scratch copy so the source file is never written."""
+    with tempfile.TemporaryDirectory(prefix="ledger_analyze_") as tmp:
+        scratch = Path(tmp) / path.name
+        shutil.copyfile(path, scratch)
+        conn = sqlite3.connect(scratch)
+        try:
+            conn.execute(f"PRAGMA analysis_limit={ANALYSIS_LIMIT}")
+            conn.execute("ANALYZE")
+            return _stat1_counts(conn)
+        finally:
+            conn.close()
+
+
+def _max_rowid(conn: sqlite3.Connection, table_name: str) -> int:
+    # max(rowid) walks the right edge of the b-tree, so it is O(log n) even on huge tables.
     try:
-        with engine.connect() as conn:
-            result = conn.execute(text(f"SELECT COUNT(*) FROM \"{table_name}\""))
-            return int(result.scalar() or 0)
-    except Exception:
+        value = conn.execute(f"SELECT max(rowid) FROM {_quote(table_name)}").fetchone()[0]
+        return int(value or 0)
+    except sqlite3.Error:
         return -1
 
 
-def analyze_sqlite(path: Path) -> Dict:
-    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
-    inspector = inspect(engine)
-    tables: List[Dict] = []
-    for table_name in inspector.get_table_names():
-        columns = [
-            f"{col['name']} ({col.get('type')})"
-            for col in inspector.get_columns(table_name)
+def analyze_sqlite(path: Path, analyze_copy: bool = False) -> Dict:
+    """
+    Describe tables, columns and approximate row counts of one ledger file.
+
+    Counts come from sqlite_stat1 when present, optionally from ANALYZE on a
+    scratch copy, and otherwise from max(rowid). No full table scans are run.
+    """
+    path = Path(path)
+    conn = _connect_readonly(path)
+    try:
+        table_names = [
+            row[0]
+            for row in conn.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'table' "
+                "AND name NOT LIKE 'sqlite_%' ORDER BY name"
+            )
         ]
-        tables.append(
-            {
-                "name": table_name,
-                "columns": columns,
-                "row_count": _approx_row_count(engine, table_name),
-            }
-        )
-    return {"path": path, "tables": tables}
+        counts = _stat1_counts(conn)
+        count_source = "sqlite_stat1"
+        if not counts and analyze_copy and table_names:
+            counts = _analyze_copy_counts(path)
+            count_source = "analyze_copy"
+
+        tables: List[Dict] = []
+        for table_name in table_names:
+            columns = [
+                {"name": row[1], "type": row[2] or ""}
+                for row in conn.execute(f"PRAGMA table_info({_quote(table_name)})")
+            ]
+            if table_name.lower() in counts:
+                row_count = counts[table_name.lower()]
+                source = count_source
+            else:
+                row_count = _max_rowid(conn, table_name)
+                source = "max_rowid" if row_count >= 0 else "unknown"
+            tables.append(
+                {
+                    "name": table_name,
+                    "columns": columns,
+                    "row_count": row_count,
+                    "row_count_source": source,
+                }
+            )
+    finally:
+        conn.close()
+    return {"path": str(path), "tables": tables}
+
+
+def _cache_path(directory: Path) -> Path:
+    return directory / CACHE_FILENAME
+
+
+def file_signature(path: Path) -> Dict[str, int]:
+    """Change detector shared by the analysis cache and the column cache in services."""
+    stat = Path(path).stat()
+    return {"mtime_ns": stat.st_mtime_ns, "size": stat.st_size}
 
 
-def generate_report(directory: Path = DEFAULT_DB_DIR, output_path: Path = REPORT_PATH) -> Path:
+def _load_cache(cache_path: Path) -> Dict[str, Dict]:
+    try:
+        return json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(cache_path: Path, cache: Dict[str, Dict]) -> None:
+    try:
+        cache_path.write_text(json.dumps(cache), encoding="utf-8")
+    except OSError as exc:
+        logger.warning("Could not write ledger analysis cache %s: %s", cache_path, exc)
+
+
+def get_cached_analysis(path: Path) -> Optional[Dict]:
+    """Return the cached analysis for ``path`` if the file has not changed since."""
+    path = Path(path)
+    if not path.exists():
+        return None
+    entry = _load_cache(_cache_path(path.parent)).get(str(path))
+    hit = bool(entry) and entry.get("signature") == file_signature(path)
+    observe_cache("ledger_analysis", hit)
+    return entry["analysis"] if hit else None
+
+
+def analyze_files(
+    paths: Iterable[Path],
+    *,
+    analyze_copy: bool = False,
+    max_workers: Optional[int] = None,
+) -> Dict[str, Dict]:
+    """
+    Analyze ledger files in parallel, reusing cached results for unchanged files.
+
+    Results are cached per directory keyed by file path, mtime and size.
+    """
+    paths = [Path(p) for p in paths]
+    results: Dict[str, Dict] = {}
+    caches: Dict[Path, Dict[str, Dict]] = {}
+    stale: List[Path] = []
+
+    for path in paths:
+        cache = caches.setdefault(path.parent, _load_cache(_cache_path(path.parent)))
+        entry = cache.get(str(path))
+        if entry and entry.get("signature") == file_signature(path):
+            observe_cache("ledger_analysis", True)
+            results[str(path)] = entry["analysis"]
+        else:
+            observe_cache("ledger_analysis", False)
+            stale.append(path)
+
+    if len(stale) == 1:
+        fresh = [analyze_sqlite(stale[0], analyze_copy)]
+    elif stale:
+        workers = max_workers or min(len(stale), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            fresh = list(pool.map(analyze_sqlite, stale, [analyze_copy] * len(stale)))
+    else:
+        fresh = []
+
+    for path, analysis in zip(stale, fresh):
+        results[str(path)] = analysis
+        caches[path.parent][str(path)] = {"signature": file_signature(path), "analysis": analysis}
+    for directory in {path.parent for path in stale}:
+        _save_cache(_cache_path(directory), caches[directory])
+
+    return results
+
+
+def generate_report(
+    directory: Path = DEFAULT_DB_DIR,
+    output_path: Path = REPORT_PATH,
+    analyze_copy: bool = False,
+) -> Path:
     directory.mkdir(parents=True, exist_ok=True)
     sqlite_files = sorted(directory.glob("ledger_*_*.sqlite"))
     sections: List[str] = []
@@ -47,18 +211,19 @@ def generate_report(directory: Path = DEFAULT_DB_DIR, output_path: Path = REPORT
         sections.append("## No ledger SQLite files found\n")
         sections.append(f"Searched in `{directory}` and found none.\n")
     else:
+        analyses = analyze_files(sqlite_files, analyze_copy=analyze_copy)
         for db_file in sqlite_files:
-            analysis = analyze_sqlite(db_file)
+            analysis = analyses[str(db_file)]
             sections.append(f"## {db_file.name}\n")
             if not analysis["tables"]:
                 sections.append("_No tables discovered._\n")
                 continue
             for table in analysis["tables"]:
                 sections.append(f"### {table['name']}\n")
-                columns = ", ".join(table["columns"]) or "No columns"
+                columns = ", ".join(f"{col['name']} ({col['type']})" for col in table["columns"])
                 row_count = table["row_count"]
-                row_label = "unknown" if row_count < 0 else str(row_count)
-                sections.append(f"- Columns: {columns}\n")
+                row_label = "unknown" if row_count < 0 else f"{row_count} ({table['row_count_source']})"
+                sections.append(f"- Columns: {columns or 'No columns'}\n")
                 sections.append(f"- Approx rows: {row_label}\n")
             sections.append("\n")
 
@@ -69,4 +234,6 @@ def generate_report(directory: Path = DEFAULT_DB_DIR, output_path: Path = REPORT
 
 
 if __name__ == "__main__":
-    generate_report()
+    import sys
+
+    generate_report(analyze_copy="--analyze-copy" in sys.argv[1:])
@@ -0,0 +1,192 @@
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from datetime import datetime, timezone
+from typing import Callable, Optional
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from core.config import settings
+from core.metrics import queue_depth, registry
+from models.ai import LedgerAuditLog
+
+logger = logging.getLogger(__name__)
+
+
+def _default_session_factory() -> Session:
+    # Resolved lazily so swap_engine() fallbacks are honoured.
+    from core import db as core_db
+
+    return core_db.SessionLocal()
+
+
+class LedgerAuditQueue:
+    """
+    In-process buffer for ledger audit entries.
+
+    Request handlers only enqueue; a background thread writes the entries in
+    batches so ledger reads never wait on a write transaction. The queue is
+    bounded: once full, new entries are dropped and counted instead of growing
+    memory without limit.
+
+    A batch that fails to write is held back and retried first on the next
+    flush, with the writer backing off exponentially in between. After
+    ``max_attempts`` failures the batch is discarded and counted in
+    ``dropped``, as is anything still unwritten when the queue stops.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        max_attempts: int = 5,
+        max_backoff: float = 60.0,
+        session_factory: Callable[[], Session] = _default_session_factory,
+    ) -> None:
+        self._queue: queue.Queue[dict] = queue.Queue(maxsize=max(max_size, 1))
+        self._batch_size = max(batch_size, 1)
+        self._flush_interval = max(flush_interval, 0.05)
+        self._max_attempts = max(max_attempts, 1)
+        self._max_backoff = max(max_backoff, self._flush_interval)
+        self._session_factory = session_factory
+        self._stop_event = threading.Event()
+        self._flush_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+        self._failed_batch: list[dict] = []
+        self._failed_attempts = 0
+        self.dropped = 0
+        self.written = 0
+
+    def enqueue(
+        self,
+        *,
+        user_id: Optional[int],
+        action: str,
+        target_type: str,
+        target_id: str,
+        meta: Optional[dict] = None,
+    ) -> bool:
+        entry = {
+            "user_id": user_id,
+            "action": action,
+            "target_type": target_type,
+            "target_id": str(target_id),
+            "meta": meta or {},
+            "created_at": datetime.now(timezone.utc),
+        }
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            if self.dropped == 1 or self.dropped % 1000 == 0:
+                logger.warning("Ledger audit queue full; dropped %s entries so far.", self.dropped)
+            return False
+        return True
+
+    def pending(self) -> int:
+        return self._queue.qsize() + len(self._failed_batch)
+
+    def _drop(self, count: int, reason: str) -> None:
+        self.dropped += count
+        logger.error("Dropped %s ledger audit entries (%s); %s dropped so far.", count, reason, self.dropped)
+
+    def _drain(self) -> list[dict]:
+        batch: list[dict] = []
+        while len(batch) < self._batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def flush(self) -> int:
+        """Write everything currently queued. Returns the number of rows written."""
+        total = 0
+        with self._flush_lock:
+            while True:
+                batch = self._failed_batch or self._drain()
+                if not batch:
+                    break
+                try:
+                    with self._session_factory() as session:
+                        session.execute(insert(LedgerAuditLog), batch)
+                        session.commit()
+                except (DataError, IntegrityError):
+                    # The rows themselves are invalid; retrying cannot succeed.
+                    logger.exception("Ledger audit batch rejected by the database.")
+                    self._failed_batch = []
+                    self._failed_attempts = 0
+                    self._drop(len(batch), "rejected")
+                    continue
+                except Exception:  # noqa: BLE001
+                    self._failed_attempts += 1
+                    if self._failed_attempts >= self._max_attempts:
+                        logger.exception("Ledger audit batch failed %s times; giving up.", self._failed_attempts)
+                        self._failed_batch = []
+                        self._failed_attempts = 0
+                        self._drop(len(batch), "write failed")
+                    else:
+                        logger.warning(
+                            "Failed to write %s ledger audit entries (attempt %s/%s); will retry.",
+                            len(batch),
+                            self._failed_attempts,
+                            self._max_attempts,
+                            exc_info=True,
+                        )
+                        self._failed_batch = batch
+                    # The database is unhealthy; leave the rest queued until the next attempt.
+                    break
+                self._failed_batch = []
+                self._failed_attempts = 0
+                total += len(batch)
+        self.written += total
+        return total
+
+    def _next_wait(self) -> float:
+        if not self._failed_attempts:
+            return self._flush_interval
+        return min(self._flush_interval * 2**self._failed_attempts, self._max_backoff)
+
+    def _run(self) -> None:
+        while not self._stop_event.is_set():
+            self._stop_event.wait(self._next_wait())
+            if self.pending():
+                self.flush()
+
+    def start(self) -> None:
+        if self._worker and self._worker.is_alive():
+            return
+        self._stop_event.clear()
+        self._worker = threading.Thread(target=self._run, name="ledger-audit-writer", daemon=True)
+        self._worker.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Stop the background writer and flush whatever is still queued."""
+        self._stop_event.set()
+        if self._worker:
+            self._worker.join(timeout=timeout)
+            self._worker = None
+        self.flush()
+        unwritten = self.pending()
+        if unwritten:
+            with self._flush_lock:
+                while self._drain():
+                    pass
+                self._failed_batch = []
+                self._failed_attempts = 0
+            self._drop(unwritten, "unwritten at shutdown")
+
+
+audit_queue = LedgerAuditQueue(
+    max_size=settings.ledger_audit_queue_size,
+    batch_size=settings.ledger_audit_batch_size,
+    flush_interval=settings.ledger_audit_flush_interval_s,
+    max_attempts=settings.ledger_audit_max_attempts,
+)
+registry.add_collector(lambda: [(queue_depth, [(("ledger_audit",), audit_queue.pending())])])
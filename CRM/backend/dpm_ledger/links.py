@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import select
+
+from models.ledger import LedgerPharmacyLink
+
+# Links only change on rebuilds; other worker processes pick those up after this TTL.
+LINK_INDEX_TTL_SECONDS = 300.0
+
+
+class PharmacyLinkIndex:
+    """In-memory legacy_id <-> CRM pharmacy id maps loaded from ledger_pharmacy_links."""
+
+    def __init__(self, ttl_seconds: float = LINK_INDEX_TTL_SECONDS) -> None:
+        self._ttl = ttl_seconds
+        self._by_legacy: Dict[str, int] = {}
+        self._by_pharmacy: Dict[int, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def _load(self) -> None:
+        from core import db as core_db
+
+        with core_db.SessionLocal() as session:
+            rows = session.execute(
+                select(LedgerPharmacyLink.legacy_id, LedgerPharmacyLink.pharmacy_id)
+            ).all()
+        self._by_legacy = {legacy_id: pharmacy_id for legacy_id, pharmacy_id in rows}
+        self._by_pharmacy = {pharmacy_id: legacy_id for legacy_id, pharmacy_id in rows}
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is not None and time.monotonic() - loaded_at < self._ttl:
+            return
+        with self._lock:
+            if self._loaded_at is None or time.monotonic() - self._loaded_at >= self._ttl:
+                self._load()
+
+    def pharmacy_id_for(self, legacy_id: str) -> Optional[int]:
+        self._ensure_loaded()
+        return self._by_legacy.get(str(legacy_id))
+
+    def legacy_id_for(self, pharmacy_id: int) -> Optional[str]:
+        self._ensure_loaded()
+        return self._by_pharmacy.get(int(pharmacy_id))
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+
+link_index = PharmacyLinkIndex()
@@ -0,0 +1,264 @@
+from __future__ import annotations
+
+import argparse
+import logging
+from collections import defaultdict
+from dataclasses import dataclass
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from dpm_ledger import services
+from dpm_ledger.links import link_index
+from models.crm import Pharmacy
+from models.ledger import LedgerPharmacyLink
+from services.normalization import name_key, normalize_text
+
+logger = logging.getLogger(__name__)
+
+NAME_CANDIDATES = [
+    "name",
+    "pharmacy_name",
+    "customer_name",
+    "account_name",
+    "accname",
+    "client_name",
+    "name_ar",
+    "arabic_name",
+    "title",
+]
+CITY_CANDIDATES = ["city", "city_name", "town"]
+FUZZY_THRESHOLD = 0.88
+# Blocks bigger than this (a very common first token, a whole city with no
+# area) are not fuzzy-compared; exact name matches are still found.
+MAX_BLOCK_SIZE = 500
+
+
+@dataclass(frozen=True)
+class LedgerCustomer:
+    legacy_id: str
+    name: str
+    city: Optional[str] = None
+    area: Optional[str] = None
+
+
+@dataclass(frozen=True)
+class LinkMatch:
+    legacy_id: str
+    pharmacy_id: int
+    ledger_name: str
+    score: float
+
+    @property
+    def method(self) -> str:
+        return "exact" if self.score >= 1.0 else "fuzzy"
+
+
+def load_ledger_customers(year: Optional[str] = None) -> List[LedgerCustomer]:
+    """Read customer accounts from every ledger file of ``year``."""
+    ctx = services._load_year(year)
+    customers: Dict[str, LedgerCustomer] = {}
+    for ledger_tables in ctx.tables.values():
+        table = ledger_tables.pharmacies
+        if table is None:
+            continue
+        account_col = services._choose_column(table, services.ACCOUNT_CANDIDATES)
+        name_col = services._choose_column(table, NAME_CANDIDATES)
+        if account_col is None or name_col is None:
+            logger.warning("Ledger table %s has no account/name columns; skipping.", table.name)
+            continue
+        city_col = services._choose_column(table, CITY_CANDIDATES)
+        area_col = services._choose_column(table, services.AREA_CANDIDATES)
+        columns = [col for col in (account_col, name_col, city_col, area_col) if col is not None]
+
+        with table.metadata.bind.connect() as conn:
+            for row in conn.execute(select(*columns)):
+                mapping = row._mapping
+                legacy_id = mapping[account_col.name]
+                name = mapping[name_col.name]
+                if legacy_id is None or not name:
+                    continue
+                customers.setdefault(
+                    str(legacy_id),
+                    LedgerCustomer(
+                        legacy_id=str(legacy_id),
+                        name=str(name),
+                        city=mapping[city_col.name] if city_col is not None else None,
+                        area=mapping[area_col.name] if area_col is not None else None,
+                    ),
+                )
+    return list(customers.values())
+
+
+def _blocking_keys(name: str, city: Optional[str], area: Optional[str]) -> List[tuple]:
+    city_key = normalize_text(city)
+    area_key = normalize_text(area)
+    keys: List[tuple] = []
+    if city_key or area_key:
+        keys.append(("city_area", city_key, area_key))
+    tokens = name_key(name).split()
+    if tokens:
+        keys.append(("token", tokens[0]))
+    return keys
+
+
+def _cities_conflict(left: str, right: str) -> bool:
+    return bool(left and right and left != right)
+
+
+def match_customers(
+    customers: Iterable[LedgerCustomer],
+    pharmacies: Sequence[tuple],
+    threshold: float = FUZZY_THRESHOLD,
+) -> List[LinkMatch]:
+    """
+    Link ledger customers to CRM pharmacies one-to-one.
+
+    Candidates are only compared inside blocks that share normalized city and
+    area, or the first name token, so the work stays close to linear instead
+    of comparing every ledger account with every pharmacy. Records missing a
+    city or area only get the name block. A pair whose cities are both known
+    and differ is never linked.
+    ``pharmacies`` rows are ``(id, name, city, area)``.
+    """
+    blocks: Dict[tuple, List[tuple]] = defaultdict(list)
+    exact: Dict[str, List[tuple]] = defaultdict(list)
+    for pharmacy_id, name, city, area in pharmacies:
+        key = name_key(name)
+        if not key:
+            continue
+        entry = (pharmacy_id, key, normalize_text(city))
+        exact[key].append(entry)
+        for block in _blocking_keys(name, city, area):
+            blocks[block].append(entry)
+
+    scored: List[LinkMatch] = []
+    for customer in customers:
+        customer_key = name_key(customer.name)
+        if not customer_key:
+            continue
+        customer_city = normalize_text(customer.city)
+        seen: set[int] = set()
+        best: Dict[int, float] = {}
+        candidate_lists = [exact.get(customer_key, ())]
+        for block in _blocking_keys(customer.name, customer.city, customer.area):
+            members = blocks.get(block, ())
+            if len(members) <= MAX_BLOCK_SIZE:
+                candidate_lists.append(members)
+        for members in candidate_lists:
+            for pharmacy_id, pharmacy_key, pharmacy_city in members:
+                if pharmacy_id in seen:
+                    continue
+                seen.add(pharmacy_id)
+                if _cities_conflict(customer_city, pharmacy_city):
+                    continue
+                if pharmacy_key == customer_key:
+                    score = 1.0
+                else:
+                    score = SequenceMatcher(None, customer_key, pharmacy_key).ratio()
+                if score >= threshold:
+                    best[pharmacy_id] = score
+        for pharmacy_id, score in best.items():
+            scored.append(LinkMatch(customer.legacy_id, pharmacy_id, customer.name, score))
+
+    scored.sort(key=lambda match: (-match.score, match.legacy_id, match.pharmacy_id))
+    linked_legacy: set[str] = set()
+    linked_pharmacies: set[int] = set()
+    matches: List[LinkMatch] = []
+    for match in scored:
+        if match.legacy_id in linked_legacy or match.pharmacy_id in linked_pharmacies:
+            continue
+        linked_legacy.add(match.legacy_id)
+        linked_pharmacies.add(match.pharmacy_id)
+        matches.append(match)
+    return matches
+
+
+def rebuild_links(
+    db: Session,
+    *,
+    year: Optional[str] = None,
+    customers: Optional[Iterable[LedgerCustomer]] = None,
+    threshold: float = FUZZY_THRESHOLD,
+) -> dict:
+    """
+    Recompute all automatic links in one transaction. Manual links are kept and
+    their legacy ids / pharmacies are excluded from matching.
+
+    Raises ValueError, before anything is deleted, when no ledger customers
+    could be loaded (missing ledger files or tables).
+    """
+    if customers is None:
+        customers = load_ledger_customers(year)
+    customers = list(customers)
+    if not customers:
+        raise ValueError("No ledger customers were loaded; existing links were left unchanged.")
+    manual = db.execute(
+        select(LedgerPharmacyLink.legacy_id, LedgerPharmacyLink.pharmacy_id).where(
+            LedgerPharmacyLink.match_method == "manual"
+        )
+    ).all()
+    manual_legacy = {legacy_id for legacy_id, _ in manual}
+    manual_pharmacies = {pharmacy_id for _, pharmacy_id in manual}
+
+    candidates = [customer for customer in customers if customer.legacy_id not in manual_legacy]
+    pharmacies = [
+        row
+        for row in db.execute(select(Pharmacy.id, Pharmacy.name, Pharmacy.city, Pharmacy.area)).all()
+        if row[0] not in manual_pharmacies
+    ]
+    matches = match_customers(candidates, pharmacies, threshold)
+
+    db.query(LedgerPharmacyLink).filter(LedgerPharmacyLink.match_method != "manual").delete(
+        synchronize_session=False
+    )
+    if matches:
+        db.execute(
+            insert(LedgerPharmacyLink),
+            [
+                {
+                    "legacy_id": match.legacy_id,
+                    "pharmacy_id": match.pharmacy_id,
+                    "ledger_name": match.ledger_name[:255],
+                    "match_method": match.method,
+                    "match_score": round(match.score, 4),
+                }
+                for match in matches
+            ],
+        )
+    db.commit()
+    link_index.invalidate()
+
+    stats = {
+        "customers": len(candidates),
+        "pharmacies": len(pharmacies),
+        "linked": len(matches),
+        "exact": sum(1 for match in matches if match.method == "exact"),
+        "fuzzy": sum(1 for match in matches if match.method == "fuzzy"),
+        "manual": len(manual),
+    }
+    logger.info("Rebuilt ledger pharmacy links: %s", stats)
+    return stats
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Rebuild ledger customer -> CRM pharmacy links.")
+    parser.add_argument("--year", default=None, help="Ledger year (defaults to DPM_LEDGER_ACTIVE_YEAR).")
+    parser.add_argument("--threshold", type=float, default=FUZZY_THRESHOLD)
+    args = parser.parse_args(argv)
+
+    import models  # noqa: F401
+    from core.db import SessionLocal
+
+    with SessionLocal() as session:
+        try:
+            stats = rebuild_links(session, year=args.year, threshold=args.threshold)
+        except ValueError as exc:
+            parser.exit(1, f"{exc}\n")
+    print(stats)
+
+
+if __name__ == "__main__":
+    main()
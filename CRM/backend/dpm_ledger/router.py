@@ -3,22 +3,25 @@ from __future__ import annotations
 from datetime import date
 from typing import Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
 
 from core.db import get_db
-from core.security import require_roles
-from dpm_ledger import services
-from models.ai import LedgerAuditLog
-from models.crm import User
-from schemas.dpm_ledger import AreaSummary, PharmacyStatement, PharmacySummary
+from core.security import CurrentUser, require_roles
+from dpm_ledger import mapping, services
+from dpm_ledger.audit import audit_queue
+from schemas.dpm_ledger import (
+    AreaSummary,
+    PharmacyLinkRebuildResult,
+    PharmacyStatement,
+    PharmacySummary,
+)
 
 router = APIRouter()
 
 
 def _log_audit(
-    db: Session,
-    user: User,
+    user: CurrentUser,
     action: str,
     target_type: str,
     target_id: str,
@@ -28,15 +31,13 @@ def _log_audit(
     if user and user.id is not None:
         resolved_user_id = int(user.id)
 
-    entry = LedgerAuditLog(
+    audit_queue.enqueue(
         user_id=resolved_user_id,
         action=action,
         target_type=target_type,
         target_id=str(target_id),
-        meta=meta or {},
+        meta=meta,
     )
-    db.add(entry)
-    db.commit()
 
 
 @router.get(
@@ -48,11 +49,10 @@ def pharmacy_summary(
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     year: Optional[str] = None,
-    user: User = Depends(require_roles("admin", "sales_manager")),
-    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(require_roles("admin", "sales_manager")),
 ):
     summary = services.get_pharmacy_account_summary(legacy_id, date_from, date_to, year)
-    _log_audit(db, user, "view_statement", "pharmacy", legacy_id, meta={"mode": "summary"})
+    _log_audit(user, "view_statement", "pharmacy", legacy_id, meta={"mode": "summary"})
     return summary
 
 
@@ -65,14 +65,56 @@ def pharmacy_statement(
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     year: Optional[str] = None,
-    user: User = Depends(require_roles("admin", "sales_manager")),
-    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(require_roles("admin", "sales_manager")),
 ):
     statement = services.get_pharmacy_detailed_statement(legacy_id, date_from, date_to, year)
-    _log_audit(db, user, "view_statement", "pharmacy", legacy_id, meta={"mode": "statement"})
+    _log_audit(user, "view_statement", "pharmacy", legacy_id, meta={"mode": "statement"})
     return statement
 
 
+@router.get(
+    "/crm-pharmacies/{pharmacy_id}/summary",
+    response_model=PharmacySummary,
+)
+def crm_pharmacy_summary(
+    pharmacy_id: int,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    year: Optional[str] = None,
+    user: CurrentUser = Depends(require_roles("admin", "sales_manager")),
+):
+    legacy_id = services.resolve_legacy_id(pharmacy_id)
+    if legacy_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Pharmacy is not linked to a ledger account.",
+        )
+    summary = services.get_pharmacy_account_summary(legacy_id, date_from, date_to, year)
+    _log_audit(
+        user,
+        "view_statement",
+        "pharmacy",
+        legacy_id,
+        meta={"mode": "summary", "crm_pharmacy_id": pharmacy_id},
+    )
+    return summary
+
+
+@router.post(
+    "/pharmacy-links/rebuild",
+    response_model=PharmacyLinkRebuildResult,
+)
+def rebuild_pharmacy_links(
+    year: Optional[str] = None,
+    user: CurrentUser = Depends(require_roles("admin")),
+    db: Session = Depends(get_db),
+):
+    try:
+        return mapping.rebuild_links(db, year=year)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(exc)) from exc
+
+
 @router.get(
     "/areas/{area_id}/summary",
     response_model=AreaSummary,
@@ -82,9 +124,8 @@ def area_summary(
     date_from: Optional[date] = None,
     date_to: Optional[date] = None,
     year: Optional[str] = None,
-    user: User = Depends(require_roles("admin", "sales_manager")),
-    db: Session = Depends(get_db),
+    user: CurrentUser = Depends(require_roles("admin", "sales_manager")),
 ):
     summary = services.get_area_summary(area_id, date_from, date_to, year)
-    _log_audit(db, user, "view_statement", "area", area_id, meta={"mode": "area_summary"})
+    _log_audit(user, "view_statement", "area", area_id, meta={"mode": "area_summary"})
     return summary
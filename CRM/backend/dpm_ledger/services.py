@@ -8,7 +8,10 @@ from typing import Any, Dict, List, Optional, Sequence
 
 from sqlalchemy import and_, select
 
-from dpm_ledger.config import DEFAULT_ACTIVE_YEAR, get_ledger_engine
+from core.metrics import observe_cache
+from dpm_ledger.analyzer import file_signature, get_cached_analysis
+from dpm_ledger.config import DEFAULT_ACTIVE_YEAR, get_ledger_engine, resolve_db_path
+from dpm_ledger.links import link_index
 from dpm_ledger.models_raw import LedgerTables, load_ledger_tables
 
 logger = logging.getLogger(__name__)
@@ -26,6 +29,18 @@ ACCOUNT_CANDIDATES = [
     "client_id",
 ]
 REFERENCE_CANDIDATES = ["number", "no", "reference", "doc_no", "invoice_no", "serial"]
+AREA_CANDIDATES = ["area", "area_id", "territoryid", "territory"]
+COLUMN_CANDIDATE_SETS = (
+    AMOUNT_CANDIDATES,
+    DATE_CANDIDATES,
+    ACCOUNT_CANDIDATES,
+    REFERENCE_CANDIDATES,
+    AREA_CANDIDATES,
+)
+
+# (db path, lower-cased table name, candidates) -> resolved column name or None.
+_COLUMN_CACHE: Dict[tuple, Optional[str]] = {}
+_PRIMED_SIGNATURES: Dict[str, Dict[str, int]] = {}
 
 
 def _normalize_date(value: Any) -> Optional[date]:
@@ -52,10 +67,8 @@ def _decimal(value: Any) -> Decimal:
         return Decimal("0")
 
 
-def _choose_column(table, candidates: Sequence[str]):
-    if table is None:
-        return None
-    normalized = {col.name.replace("_", "").lower(): col for col in table.c}
+def _match_column_name(column_names: Sequence[str], candidates: Sequence[str]) -> Optional[str]:
+    normalized = {name.replace("_", "").lower(): name for name in column_names}
     for candidate in candidates:
         key = candidate.replace("_", "").lower()
         if key in normalized:
@@ -63,6 +76,56 @@ def _choose_column(table, candidates: Sequence[str]):
     return None
 
 
+def _table_db_path(table) -> str:
+    bind = getattr(table.metadata, "bind", None)
+    return str(bind.url.database) if bind is not None else ""
+
+
+def prime_column_cache(db_path: str, analysis: dict) -> None:
+    """Pre-resolve candidate columns for every table described by an analyzer result."""
+    for table in analysis.get("tables", []):
+        column_names = [col["name"] for col in table["columns"]]
+        for candidates in COLUMN_CANDIDATE_SETS:
+            key = (db_path, table["name"].lower(), tuple(candidates))
+            _COLUMN_CACHE[key] = _match_column_name(column_names, candidates)
+
+
+def _forget_columns(db_path: str) -> None:
+    for key in [key for key in _COLUMN_CACHE if key[0] == db_path]:
+        del _COLUMN_CACHE[key]
+
+
+def _prime_from_analysis(db_path) -> None:
+    try:
+        signature = file_signature(db_path)
+    except OSError:
+        return
+    path_key = str(db_path)
+    if _PRIMED_SIGNATURES.get(path_key) == signature:
+        return
+    # The file changed (or was never primed): resolutions from an older schema are void.
+    _forget_columns(path_key)
+    analysis = get_cached_analysis(db_path)
+    if analysis:
+        prime_column_cache(path_key, analysis)
+    _PRIMED_SIGNATURES[path_key] = signature
+
+
+def _choose_column(table, candidates: Sequence[str]):
+    if table is None:
+        return None
+    key = (_table_db_path(table), table.name.lower(), tuple(candidates))
+    name = _COLUMN_CACHE.get(key)
+    observe_cache("ledger_columns", name is not None and name in table.c)
+    if name is None or name not in table.c:
+        # Primed entries come from a stored analysis; the reflected table is authoritative.
+        name = _match_column_name([col.name for col in table.c], candidates)
+        _COLUMN_CACHE[key] = name
+    if name is None:
+        return None
+    return table.c[name]
+
+
 def _fetch_events(
     table,
     legacy_id: str,
@@ -102,10 +165,10 @@ def _fetch_events(
     with engine.begin() as conn:
         for row in conn.execute(stmt):
             mapping = row._mapping
-            event_date = _normalize_date(mapping.get(date_col.name) if date_col else None) if mapping else None
-            amount_value = mapping.get(amount_col.name) if amount_col else None
+            event_date = _normalize_date(mapping.get(date_col.name) if date_col is not None else None) if mapping else None
+            amount_value = mapping.get(amount_col.name) if amount_col is not None else None
             amount = _decimal(amount_value)
-            reference = mapping.get(reference_col.name) if reference_col else None
+            reference = mapping.get(reference_col.name) if reference_col is not None else None
             events.append(
                 {
                     "event_type": event_type,
@@ -144,6 +207,7 @@ def _load_year(year: Optional[str] = None) -> LedgerYearContext:
             warnings.append(str(exc))
             logger.warning("%s", exc)
             continue
+        _prime_from_analysis(resolve_db_path(target_year, kind))
         engines[kind] = engine
         tables[kind] = load_ledger_tables(engine)
 
@@ -238,6 +302,7 @@ def get_pharmacy_detailed_statement(
     summary = _summarize_events(events)
     return {
         "pharmacy_legacy_id": legacy_id,
+        "crm_pharmacy_id": link_index.pharmacy_id_for(legacy_id),
         "year": ctx.year,
         "events": events,
         "summary": summary,
@@ -255,18 +320,27 @@ def get_pharmacy_account_summary(
     summary = statement["summary"]
     return {
         "pharmacy_legacy_id": legacy_id,
+        "crm_pharmacy_id": statement["crm_pharmacy_id"],
         "year": statement["year"],
         "totals": summary,
         "warnings": statement["warnings"],
     }
 
 
+def resolve_crm_pharmacy_id(legacy_id: str) -> Optional[int]:
+    return link_index.pharmacy_id_for(legacy_id)
+
+
+def resolve_legacy_id(pharmacy_id: int) -> Optional[str]:
+    return link_index.legacy_id_for(pharmacy_id)
+
+
 def _find_area_pharmacies(ledger_tables: LedgerTables, area_id: str) -> list[str]:
     if not ledger_tables.pharmacies:
         return []
-    area_col = _choose_column(ledger_tables.pharmacies, ["area", "area_id", "territoryid", "territory"])
+    area_col = _choose_column(ledger_tables.pharmacies, AREA_CANDIDATES)
     account_col = _choose_column(ledger_tables.pharmacies, ACCOUNT_CANDIDATES)
-    if not area_col or not account_col:
+    if area_col is None or account_col is None:
         return []
 
     stmt = select(account_col).where(area_col == area_id)
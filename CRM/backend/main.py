@@ -1,16 +1,36 @@
 import logging
 import os
+import secrets
 from contextlib import asynccontextmanager
 from pathlib import Path
 
-from fastapi import FastAPI
+from fastapi import FastAPI, HTTPException, Request, Response, status
 from fastapi.openapi.utils import get_openapi
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.exc import OperationalError
+from fastapi.responses import JSONResponse
+from sqlalchemy.exc import IntegrityError, OperationalError
 
 from api import api_router
+from core import db as core_db
 from core.config import settings
-from core.db import Base, SessionLocal, build_fallback_engine, engine, swap_engine
+from core.compression import CompressionMiddleware
+from core.http_cache import ConditionalGetMiddleware
+from core.instrumentation import QueryInstrumentationMiddleware
+from core.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, registry as metrics_registry
+from core.profiling import ProfilingMiddleware
+from core.responses import FastJSONResponse
+from core.db import (
+    Base,
+    SessionLocal,
+    build_fallback_engine,
+    sqlite_foreign_key_violations,
+    sqlite_pragma_report,
+    swap_engine,
+)
+from dpm_ledger.audit import audit_queue
+from migrations import MIGRATIONS, apply_migrations
+from services.auth import password_pool
+from services.bootstrap import bootstrap_is_current, record_bootstrap
 from services.seed_data import seed_reference_data
 
 logger = logging.getLogger(__name__)
@@ -34,17 +54,25 @@ tags_metadata = [
 ]
 
 
-def init_database() -> None:
+def init_database(force: bool = False) -> None:
     """
-    Import models and create tables if they do not exist.
-    SQLAlchemy uses the imported metadata to build the schema.
+    Import models, create missing tables, apply pending migrations and seed
+    reference data.
+
+    When schema_meta says the schema, migrations and seed inputs are unchanged
+    since the last full run, startup skips all of that (one small query instead).
+    ``force`` (``python main.py --init-db``) always takes the full path.
     """
     import models  # noqa: F401
 
-    db_url = str(engine.url)
+    if not force and bootstrap_is_current(core_db.engine):
+        logger.info("Schema and seed data current at %s; skipping create_all and seeding.", core_db.engine.url)
+        return
+
+    db_url = str(core_db.engine.url)
     logger.info("Initializing database at %s", db_url)
     try:
-        Base.metadata.create_all(bind=engine)
+        Base.metadata.create_all(bind=core_db.engine)
     except OperationalError as exc:
         if "disk i/o error" in str(exc).lower():
             fallback_engine = build_fallback_engine()
@@ -58,8 +86,19 @@ def init_database() -> None:
             )
         else:
             raise
+    pragmas = sqlite_pragma_report(core_db.engine)
+    if pragmas:
+        logger.info("SQLite pragmas in effect: %s", pragmas)
+        if pragmas.get("foreign_keys"):
+            # Rows written before enforcement was enabled are not rejected retroactively.
+            dangling = sqlite_foreign_key_violations(core_db.engine)
+            if dangling:
+                logger.warning("Rows with dangling foreign keys (fix before relying on them): %s", dangling)
+    if settings.migrations_on_startup:
+        apply_migrations(core_db.engine, MIGRATIONS)
     with SessionLocal() as session:
         seed_reference_data(session)
+        record_bootstrap(session)
     logger.info("Database schema ensured and seeded.")
 
 
@@ -67,16 +106,40 @@ def init_database() -> None:
 async def lifespan(_: FastAPI):
     """Initialize database and seed reference data once on startup."""
     init_database()
-    yield
-
-
-app = FastAPI(title=settings.app_name, openapi_tags=tags_metadata, lifespan=lifespan)
+    audit_queue.start()
+    try:
+        yield
+    finally:
+        audit_queue.stop()
+        password_pool.shutdown()
+        if core_db.async_engine is not None:
+            await core_db.async_engine.dispose()
+
+
+app = FastAPI(
+    title=settings.app_name,
+    openapi_tags=tags_metadata,
+    lifespan=lifespan,
+    default_response_class=FastJSONResponse if settings.fast_json_responses else JSONResponse,
+)
 
 allowed_origins = [
     "http://localhost:5173",
     "http://127.0.0.1:5173",
 ]
 
+# Added innermost first: CORS -> profiling -> metrics -> compression -> conditional GET -> query instrumentation -> routes.
+if settings.query_instrumentation_enabled:
+    app.add_middleware(QueryInstrumentationMiddleware)
+if settings.conditional_get_enabled:
+    app.add_middleware(ConditionalGetMiddleware)
+if settings.compression_enabled:
+    app.add_middleware(CompressionMiddleware)
+if settings.metrics_enabled:
+    app.add_middleware(MetricsMiddleware)
+if settings.profiling_enabled:
+    app.add_middleware(ProfilingMiddleware)
+
 # Single CORS middleware to allow the SPA to call all API routes, including preflight.
 app.add_middleware(
     CORSMiddleware,
@@ -87,6 +150,16 @@ app.add_middleware(
 )
 
 
+@app.exception_handler(IntegrityError)
+async def integrity_error_handler(request: Request, exc: IntegrityError) -> JSONResponse:
+    # Safety net for writes that reach a constraint without a friendlier check in the route.
+    logger.warning("Integrity error on %s %s: %s", request.method, request.url.path, exc.orig)
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT,
+        content={"detail": "Request conflicts with existing data or references a missing record."},
+    )
+
+
 @app.get("/", tags=["default"])
 async def read_root() -> dict:
     return {"message": "Welcome to ALQASEER CRM API"}
@@ -97,6 +170,16 @@ async def read_status() -> dict:
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+async def read_metrics(request: Request) -> Response:
+    if not settings.metrics_enabled:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    supplied = request.headers.get("authorization", "")
+    if settings.metrics_token and not secrets.compare_digest(supplied, f"Bearer {settings.metrics_token}"):
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid metrics token.")
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
 def custom_openapi():
     if app.openapi_schema:
         return app.openapi_schema
@@ -131,8 +214,8 @@ if __name__ == "__main__":
     import sys
     import uvicorn
 
-    if len(sys.argv) > 1 and sys.argv[1] == "init-db":
-        init_database()
+    if len(sys.argv) > 1 and sys.argv[1] in ("init-db", "--init-db"):
+        init_database(force=True)
         print("Database initialized.")
         sys.exit(0)
 
@@ -0,0 +1,9 @@
+from migrations.runner import (  # noqa: F401
+    Backfill,
+    Migration,
+    apply_migrations,
+    migration_plan,
+    pending_migrations,
+    run_backfill,
+)
+from migrations.versions import LATEST_VERSION, MIGRATIONS  # noqa: F401
@@ -0,0 +1,201 @@
+from __future__ import annotations
+
+import contextlib
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Iterator, Optional, Sequence
+
+from sqlalchemy import MetaData, Table, bindparam, func, inspect, select, text, update
+from sqlalchemy.engine import Connection, Engine, Row
+from sqlalchemy.exc import IntegrityError
+
+from core.config import settings
+from models.meta import SchemaMigration
+
+logger = logging.getLogger(__name__)
+
+Progress = Callable[[str], None]
+
+
+@dataclass(frozen=True)
+class Backfill:
+    """
+    Rewrite rows of ``table`` in key order, one short transaction per batch.
+
+    ``where`` selects rows that still need the change, so an interrupted
+    backfill resumes where it stopped. ``transform`` gets a row with the key
+    and ``columns`` and returns the values to write (empty dict skips it).
+    """
+
+    table: str
+    columns: tuple[str, ...]
+    where: str
+    transform: Callable[[Row], dict]
+    key: str = "id"
+
+
+@dataclass(frozen=True)
+class Migration:
+    """
+    One versioned step. ``upgrade`` runs in a single transaction and must be
+    idempotent: fresh databases already have the final schema from create_all,
+    and a migration interrupted during its backfill runs ``upgrade`` again.
+    """
+
+    version: int
+    name: str
+    description: str = ""
+    upgrade: Optional[Callable[[Connection], None]] = None
+    backfill: Optional[Backfill] = None
+
+
+def validate_migrations(migrations: Sequence[Migration]) -> list[Migration]:
+    versions = [migration.version for migration in migrations]
+    if any(version <= 0 for version in versions) or versions != sorted(set(versions)):
+        raise ValueError(f"Migration versions must be positive and strictly increasing: {versions}")
+    return list(migrations)
+
+
+def has_table(conn: Connection, table: str) -> bool:
+    return inspect(conn).has_table(table)
+
+
+def has_column(conn: Connection, table: str, column: str) -> bool:
+    return has_table(conn, table) and any(col["name"] == column for col in inspect(conn).get_columns(table))
+
+
+@contextlib.contextmanager
+def _transaction(engine: Engine) -> Iterator[Connection]:
+    with engine.connect() as conn:
+        if conn.dialect.name == "sqlite":
+            # pysqlite leaves DDL outside any transaction unless one is opened explicitly.
+            conn.exec_driver_sql("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.rollback()
+            raise
+        conn.commit()
+
+
+def applied_versions(engine: Engine) -> set[int]:
+    with engine.connect() as conn:
+        if not has_table(conn, SchemaMigration.__tablename__):
+            return set()
+        return set(conn.execute(select(SchemaMigration.__table__.c.version)).scalars())
+
+
+def pending_migrations(engine: Engine, migrations: Sequence[Migration]) -> list[Migration]:
+    applied = applied_versions(engine)
+    return [migration for migration in migrations if migration.version not in applied]
+
+
+def backfill_remaining(engine: Engine, backfill: Backfill) -> int:
+    with engine.connect() as conn:
+        if not has_table(conn, backfill.table):
+            return 0
+        return conn.execute(text(f"SELECT COUNT(*) FROM {backfill.table} WHERE {backfill.where}")).scalar_one()
+
+
+def migration_plan(engine: Engine, migrations: Sequence[Migration]) -> list[dict]:
+    """What ``apply_migrations`` would do, without changing anything."""
+    plan = []
+    for migration in pending_migrations(engine, migrations):
+        plan.append(
+            {
+                "version": migration.version,
+                "name": migration.name,
+                "description": migration.description,
+                "schema_step": migration.upgrade is not None,
+                "backfill_table": migration.backfill.table if migration.backfill else None,
+                "backfill_rows": backfill_remaining(engine, migration.backfill) if migration.backfill else 0,
+            }
+        )
+    return plan
+
+
+def run_backfill(
+    engine: Engine,
+    backfill: Backfill,
+    *,
+    batch_size: Optional[int] = None,
+    progress: Optional[Progress] = None,
+    label: str = "",
+) -> int:
+    """Apply ``backfill`` in keyset-ordered batches; returns the number of rows updated."""
+    batch_size = batch_size or settings.migration_batch_size
+    report = progress or logger.info
+    total = backfill_remaining(engine, backfill)
+    if not total:
+        return 0
+    with engine.connect() as conn:
+        table = Table(backfill.table, MetaData(), autoload_with=conn)
+    key = table.c[backfill.key]
+    selector = (
+        select(key, *(table.c[name] for name in backfill.columns))
+        .where(text(backfill.where))
+        .order_by(key)
+        .limit(batch_size)
+    )
+
+    last_key = None
+    seen = updated = 0
+    while True:
+        with _transaction(engine) as conn:
+            stmt = selector if last_key is None else selector.where(key > last_key)
+            rows = conn.execute(stmt).all()
+            if not rows:
+                break
+            grouped: dict[tuple[str, ...], list[dict]] = {}
+            for row in rows:
+                values = backfill.transform(row)
+                if values:
+                    grouped.setdefault(tuple(sorted(values)), []).append({**values, "_key": row[0]})
+            for names, params in grouped.items():
+                stmt = update(table).where(key == bindparam("_key")).values({name: bindparam(name) for name in names})
+                conn.execute(stmt, params)
+                updated += len(params)
+        last_key = rows[-1][0]
+        seen += len(rows)
+        report(f"{label or backfill.table}: {min(seen, total)}/{total} rows")
+    return updated
+
+
+def apply_migrations(
+    engine: Engine,
+    migrations: Sequence[Migration],
+    *,
+    batch_size: Optional[int] = None,
+    progress: Optional[Progress] = None,
+) -> list[int]:
+    """
+    Apply pending migrations in version order and return the versions applied.
+    A migration without a backfill is recorded in the same transaction as its
+    schema step; with a backfill it is recorded once every batch has committed.
+    """
+    report = progress or logger.info
+    SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+    versions_table = SchemaMigration.__table__
+    applied: list[int] = []
+    for migration in pending_migrations(engine, migrations):
+        label = f"{migration.version:04d} {migration.name}"
+        started = time.perf_counter()
+        report(f"Applying {label}")
+        try:
+            with _transaction(engine) as conn:
+                if migration.upgrade is not None:
+                    migration.upgrade(conn)
+                if migration.backfill is None:
+                    conn.execute(versions_table.insert().values(version=migration.version, name=migration.name))
+            if migration.backfill is not None:
+                run_backfill(engine, migration.backfill, batch_size=batch_size, progress=report, label=label)
+                with _transaction(engine) as conn:
+                    conn.execute(versions_table.insert().values(version=migration.version, name=migration.name))
+        except IntegrityError:
+            # Another process recorded it first; its schema step has already committed.
+            logger.info("Migration %s was applied concurrently.", label)
+            continue
+        applied.append(migration.version)
+        report(f"Applied {label} in {(time.perf_counter() - started) * 1000:.0f} ms")
+    return applied
@@ -0,0 +1,19 @@
+from migrations.runner import validate_migrations
+from migrations.versions import (
+    v0001_visits_is_deleted,
+    v0002_visit_indexes,
+    v0003_visit_durations,
+    v0004_search_index,
+    v0005_account_index,
+)
+
+MIGRATIONS = validate_migrations(
+    [
+        v0001_visits_is_deleted.migration,
+        v0002_visit_indexes.migration,
+        v0003_visit_durations.migration,
+        v0004_search_index.migration,
+        v0005_account_index.migration,
+    ]
+)
+LATEST_VERSION = MIGRATIONS[-1].version
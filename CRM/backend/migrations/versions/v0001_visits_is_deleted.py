@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrations.runner import Migration, has_column, has_table
+
+
+def upgrade(conn: Connection) -> None:
+    if not has_table(conn, "visits") or has_column(conn, "visits", "is_deleted"):
+        return
+    default = "0" if conn.dialect.name == "sqlite" else "false"
+    conn.execute(text(f"ALTER TABLE visits ADD COLUMN is_deleted BOOLEAN NOT NULL DEFAULT {default}"))
+
+
+migration = Migration(
+    version=1,
+    name="visits_is_deleted",
+    description="Add visits.is_deleted (soft delete flag).",
+    upgrade=upgrade,
+)
@@ -0,0 +1,29 @@
+from __future__ import annotations
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from migrations.runner import Migration, has_table
+
+# Mirrors the Index() declarations on models.crm.Visit; create_all only adds
+# indexes when it creates the table, so existing databases get them here.
+INDEXES = {
+    "ix_visits_rep_id_visit_date": "rep_id, visit_date",
+    "ix_visits_doctor_id": "doctor_id",
+    "ix_visits_pharmacy_id": "pharmacy_id",
+}
+
+
+def upgrade(conn: Connection) -> None:
+    if not has_table(conn, "visits"):
+        return
+    for name, columns in INDEXES.items():
+        conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON visits ({columns})"))
+
+
+migration = Migration(
+    version=2,
+    name="visit_indexes",
+    description="Index visits by rep/date and by customer for list, report and last-visit queries.",
+    upgrade=upgrade,
+)
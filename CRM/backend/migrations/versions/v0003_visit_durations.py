@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from sqlalchemy.engine import Row
+
+from migrations.runner import Backfill, Migration
+
+
+def _duration(row: Row) -> dict:
+    started_at, ended_at = row.started_at, row.ended_at
+    if started_at.tzinfo is None and ended_at.tzinfo:
+        started_at = started_at.replace(tzinfo=ended_at.tzinfo)
+    if ended_at.tzinfo is None and started_at.tzinfo:
+        ended_at = ended_at.replace(tzinfo=started_at.tzinfo)
+    return {"duration_seconds": max(int((ended_at - started_at).total_seconds()), 0)}
+
+
+migration = Migration(
+    version=3,
+    name="visit_durations",
+    description="Fill visits.duration_seconds for visits with start and end times but no duration.",
+    backfill=Backfill(
+        table="visits",
+        columns=("started_at", "ended_at"),
+        where="duration_seconds IS NULL AND started_at IS NOT NULL AND ended_at IS NOT NULL",
+        transform=_duration,
+    ),
+)
@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+from sqlalchemy.engine import Connection
+
+from migrations.runner import Migration, has_table
+from services.search import INDEXES, install_index
+
+
+def upgrade(conn: Connection) -> None:
+    # FTS5 is SQLite-only; other backends keep LIKE searches.
+    if conn.dialect.name != "sqlite":
+        return
+    for index in INDEXES:
+        if has_table(conn, index.table):
+            install_index(conn, index)
+
+
+migration = Migration(
+    version=4,
+    name="search_index",
+    description="FTS5 search tables (with sync triggers) for doctors, pharmacies, HCPs and products.",
+    upgrade=upgrade,
+)
@@ -0,0 +1,22 @@
+from __future__ import annotations
+
+from sqlalchemy.engine import Connection
+
+from migrations.runner import Migration, has_table
+from services.accounts import SOURCES, install_account_index
+
+
+def upgrade(conn: Connection) -> None:
+    # The maintenance triggers are SQLite-only; other backends keep the per-table customer queries.
+    if conn.dialect.name != "sqlite":
+        return
+    if all(has_table(conn, table) for table in ("visits", *(source.table for source in SOURCES))):
+        install_account_index(conn)
+
+
+migration = Migration(
+    version=5,
+    name="account_index",
+    description="account_index table (with sync triggers) of doctors and pharmacies with their last visit.",
+    upgrade=upgrade,
+)
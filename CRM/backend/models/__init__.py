@@ -25,3 +25,5 @@ from models.crm import (  # noqa: F401
     Visit,
 )
 from models.hcp import HCP  # noqa: F401
+from models.ledger import LedgerPharmacyLink  # noqa: F401
+from models.meta import SchemaMeta, SchemaMigration  # noqa: F401
@@ -12,12 +12,15 @@ from sqlalchemy import (
     Enum,
     Float,
     ForeignKey,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     UniqueConstraint,
+    false,
     func,
+    true,
 )
 from sqlalchemy.orm import relationship
 
@@ -42,7 +45,7 @@ class User(Base):
     name = Column(String(100), nullable=False)
     email = Column(String(255), nullable=False, unique=True, index=True)
     password_hash = Column(String(255), nullable=False)
-    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true())
     role_id = Column(Integer, ForeignKey("roles.id"), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
@@ -217,7 +220,7 @@ class Visit(Base):
     end_lng = Column(Float, nullable=True)
     end_accuracy = Column(Float, nullable=True)
     duration_seconds = Column(Integer, nullable=True)
-    is_deleted = Column(Boolean, nullable=False, default=False, server_default="0")
+    is_deleted = Column(Boolean, nullable=False, default=False, server_default=false())
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
@@ -229,6 +232,9 @@ class Visit(Base):
             "(pharmacy_id IS NOT NULL AND doctor_id IS NULL)",
             name="ck_visit_account_link",
         ),
+        Index("ix_visits_rep_id_visit_date", "rep_id", "visit_date"),
+        Index("ix_visits_doctor_id", "doctor_id"),
+        Index("ix_visits_pharmacy_id", "pharmacy_id"),
     )
 
     rep = relationship(User)
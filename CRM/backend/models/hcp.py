@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from sqlalchemy import Boolean, Column, DateTime, Integer, String, func
+from sqlalchemy import Boolean, Column, DateTime, Integer, String, func, true
 
 from core.db import Base
 
@@ -17,7 +17,7 @@ class HCP(Base):
     clinic_address = Column(String(255), nullable=True)
     area = Column(String(100), nullable=True)
     city = Column(String(100), nullable=True)
-    is_active = Column(Boolean, nullable=False, default=True, server_default="1")
+    is_active = Column(Boolean, nullable=False, default=True, server_default=true())
     created_at = Column(
         DateTime(timezone=True), nullable=False, server_default=func.now()
     )
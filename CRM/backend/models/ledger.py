@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+from sqlalchemy import (
+    CheckConstraint,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Integer,
+    String,
+    func,
+)
+
+from core.db import Base
+
+
+class LedgerPharmacyLink(Base):
+    __tablename__ = "ledger_pharmacy_links"
+
+    id = Column(Integer, primary_key=True)
+    legacy_id = Column(String(100), nullable=False, unique=True, index=True)
+    pharmacy_id = Column(Integer, ForeignKey("pharmacies.id"), nullable=False, unique=True, index=True)
+    ledger_name = Column(String(255), nullable=True)
+    match_method = Column(String(20), nullable=False, default="exact", server_default="exact")
+    match_score = Column(Float, nullable=False, default=1.0)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+    __table_args__ = (
+        CheckConstraint(
+            "match_method in ('exact', 'fuzzy', 'manual')",
+            name="ck_ledger_pharmacy_link_method",
+        ),
+    )
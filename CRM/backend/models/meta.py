@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+from sqlalchemy import Column, DateTime, Integer, String, Text, func
+
+from core.db import Base
+
+
+class SchemaMeta(Base):
+    """Small key/value table for bootstrap bookkeeping (seed fingerprints and similar)."""
+
+    __tablename__ = "schema_meta"
+
+    key = Column(String(100), primary_key=True)
+    value = Column(Text, nullable=False)
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
+    )
+
+
+class SchemaMigration(Base):
+    """One row per applied migration (see ``core.migrations``)."""
+
+    __tablename__ = "schema_migrations"
+
+    version = Column(Integer, primary_key=True, autoincrement=False)
+    name = Column(String(150), nullable=False)
+    applied_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
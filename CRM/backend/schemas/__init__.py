@@ -2,6 +2,7 @@ from schemas.dpm_ledger import (  # noqa: F401
     AreaSummary,
     LedgerEvent,
     LedgerTotals,
+    PharmacyLinkRebuildResult,
     PharmacyStatement,
     PharmacySummary,
 )
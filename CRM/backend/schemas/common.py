@@ -10,8 +10,11 @@ T = TypeVar("T")
 class Pagination(BaseModel):
     page: int = Field(1, ge=1)
     page_size: int = Field(25, ge=1, le=500)
-    total: int
-    total_pages: int
+    # None with total_mode=none; has_more is always set from a look-ahead row.
+    total: Optional[int] = None
+    total_pages: Optional[int] = None
+    has_more: bool = False
+    total_estimated: bool = False
 
 
 class PaginatedResponse(BaseModel, Generic[T]):
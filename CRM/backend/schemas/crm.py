@@ -305,7 +305,8 @@ class OrderLineBase(BaseModel):
 
 
 class OrderLineCreate(OrderLineBase):
-    ...
+    # Omitted: the product's selling_price.
+    price: Optional[Decimal] = Field(None, ge=0)
 
 
 class OrderLineOut(OrderLineBase):
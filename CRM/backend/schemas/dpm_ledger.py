@@ -26,6 +26,7 @@ class LedgerTotals(BaseModel):
 
 class PharmacyStatement(BaseModel):
     pharmacy_legacy_id: str
+    crm_pharmacy_id: Optional[int] = None
     year: str
     events: List[LedgerEvent]
     summary: LedgerTotals
@@ -34,6 +35,7 @@ class PharmacyStatement(BaseModel):
 
 class PharmacySummary(BaseModel):
     pharmacy_legacy_id: str
+    crm_pharmacy_id: Optional[int] = None
     year: str
     totals: LedgerTotals
     warnings: List[str] = Field(default_factory=list)
@@ -45,3 +47,12 @@ class AreaSummary(BaseModel):
     pharmacies: List[PharmacySummary]
     totals: LedgerTotals
     warnings: List[str] = Field(default_factory=list)
+
+
+class PharmacyLinkRebuildResult(BaseModel):
+    customers: int
+    pharmacies: int
+    linked: int
+    exact: int
+    fuzzy: int
+    manual: int
@@ -35,6 +35,7 @@ class HCPUpdate(BaseModel):
 
 class HCPOut(HCPBase):
     id: int
+    email: Optional[str] = None  # validated on input; see UserOut.email
     is_active: bool
     created_at: datetime
     updated_at: datetime
@@ -36,7 +36,9 @@ class UserUpdate(BaseModel):
 class UserOut(BaseModel):
     id: int
     name: str
-    email: EmailStr
+    # Output only: addresses were validated on the way in, and EmailStr costs
+    # an email_validator/IDNA pass for every nested rep in large listings.
+    email: str
     is_active: bool
     role: RoleOut
 
@@ -87,7 +89,7 @@ class AdminUserUpdate(BaseModel):
 class AdminUserOut(BaseModel):
     id: int
     name: str
-    email: EmailStr
+    email: str
     isActive: bool
     role: RoleOut
     salesRep: Optional[SalesRepInfo] = None
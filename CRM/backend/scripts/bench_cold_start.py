@@ -0,0 +1,85 @@
+"""
+Cold-start benchmark for ``init_database``.
+
+Each run is a fresh interpreter (as on a serverless cold start) against the
+same scratch SQLite database:
+
+* ``first``  – empty database: create_all, seeding, schema_meta written.
+* ``warm``   – schema_meta matches: DDL and seeding are skipped.
+* ``forced`` – ``init_database(force=True)``, i.e. what every boot used to do.
+
+    python scripts/bench_cold_start.py --runs 5
+
+Prints JSON with the median ``init_database`` time and whole-process time
+(imports included) for each mode.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+_CHILD = """
+import time
+import main
+started = time.perf_counter()
+main.init_database(force={force})
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def _run(db_url: str, force: bool) -> tuple[float, float]:
+    env = {**os.environ, "DATABASE_URL": db_url, "PYTHONPATH": str(BACKEND_DIR)}
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, "-c", _CHILD.format(force=force)],
+        cwd=BACKEND_DIR,
+        env=env,
+        check=True,
+        capture_output=True,
+        text=True,
+    )
+    process_ms = (time.perf_counter() - started) * 1000
+    return float(out.stdout.strip().splitlines()[-1]), process_ms
+
+
+def _summary(samples: list[tuple[float, float]]) -> dict:
+    return {
+        "runs": len(samples),
+        "init_ms": round(statistics.median(s[0] for s in samples), 1),
+        "process_ms": round(statistics.median(s[1] for s in samples), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Runs per mode (median reported).")
+    args = parser.parse_args()
+
+    results: dict[str, dict] = {}
+    first: list[tuple[float, float]] = []
+    for _ in range(args.runs):
+        with tempfile.TemporaryDirectory() as tmp:
+            first.append(_run(f"sqlite:///{Path(tmp, 'cold.db').as_posix()}", force=False))
+    results["first"] = _summary(first)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_url = f"sqlite:///{Path(tmp, 'cold.db').as_posix()}"
+        _run(db_url, force=False)
+        results["warm"] = _summary([_run(db_url, force=False) for _ in range(args.runs)])
+        results["forced"] = _summary([_run(db_url, force=True) for _ in range(args.runs)])
+
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Concurrency benchmark for the hot read endpoints.
+
+Fires GET requests from N concurrent clients for a fixed duration and prints
+throughput and latency percentiles as JSON. Run it once on a build before a
+change and once after to compare:
+
+    python scripts/bench_concurrency.py --serve --clients 200 --duration 20
+
+``--serve`` starts uvicorn on a scratch SQLite database from the current
+checkout; ``--asgi`` drives the app in-process through httpx's ASGI transport
+(no sockets, so a load generator on the same small box does not steal the
+server's CPU); otherwise the script targets API_BASE_URL.
+
+With ``--serve`` the server's own CPU time is sampled from /proc and reported
+as ``server_cpu_ms_per_request``; ``server_capacity_rps`` is the throughput
+one core would sustain for the server alone. Pin server and load generator to
+different cores with ``--server-cpus 0 --client-cpus 1-3`` when the box has
+them; on a single core compare the CPU figures rather than raw throughput.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+API_BASE_URL = os.getenv("API_BASE_URL", "http://127.0.0.1:8000/api/v1").rstrip("/")
+EMAIL = os.getenv("BENCH_EMAIL", "admin@example.com")
+PASSWORD = os.getenv("BENCH_PASSWORD", "Admin12345!")
+
+ENDPOINTS = [
+    "/visits/?page=1&page_size=25",
+    "/visits/summary",
+    "/visits/latest",
+    "/pwa/customers",
+    "/pwa/visits",
+    "/reports/overview",
+    "/hcps?page=1&pageSize=25",
+]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _client_loop(
+    client: httpx.AsyncClient,
+    headers: dict[str, str],
+    deadline: float,
+    offset: int,
+    latencies: list[float],
+    by_path: dict[str, list[float]],
+    errors: list[int],
+) -> None:
+    index = offset
+    while time.perf_counter() < deadline:
+        path = ENDPOINTS[index % len(ENDPOINTS)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            response = await client.get(path, headers=headers)
+        except httpx.HTTPError:
+            errors.append(0)
+            continue
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        latencies.append(elapsed_ms)
+        by_path.setdefault(path, []).append(elapsed_ms)
+        if response.status_code >= 400:
+            errors.append(response.status_code)
+
+
+async def run(
+    base_url: str,
+    clients: int,
+    duration: float,
+    transport: httpx.AsyncBaseTransport | None = None,
+    cpu_probe: Optional[Callable[[], float]] = None,
+) -> dict:
+    # One single-connection client per simulated user: a shared pool's bookkeeping
+    # grows with the number of waiting requests and would skew client CPU.
+    limits = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+    async with contextlib.AsyncExitStack() as stack:
+        sessions = [
+            await stack.enter_async_context(
+                httpx.AsyncClient(base_url=base_url, timeout=30.0, limits=limits, transport=transport)
+            )
+            for _ in range(clients)
+        ]
+        login = await sessions[0].post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        login.raise_for_status()
+        headers = {"Authorization": f"Bearer {login.json()['token']}"}
+
+        latencies: list[float] = []
+        by_path: dict[str, list[float]] = {}
+        errors: list[int] = []
+        cpu_started = cpu_probe() if cpu_probe else 0.0
+        client_cpu_started = time.process_time()
+        started = time.perf_counter()
+        deadline = started + duration
+        await asyncio.gather(
+            *(
+                _client_loop(session, headers, deadline, i, latencies, by_path, errors)
+                for i, session in enumerate(sessions)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        client_cpu_s = time.process_time() - client_cpu_started
+        server_cpu_s = cpu_probe() - cpu_started if cpu_probe else None
+
+    result = {
+        "clients": clients,
+        "duration_s": round(elapsed, 2),
+        "requests": len(latencies),
+        "errors": len(errors),
+        "throughput_rps": round(len(latencies) / elapsed, 1),
+        "latency_ms": {
+            "p50": round(_percentile(latencies, 50), 1),
+            "p95": round(_percentile(latencies, 95), 1),
+            "p99": round(_percentile(latencies, 99), 1),
+            "mean": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+        },
+        "p50_ms_by_endpoint": {
+            path: round(_percentile(values, 50), 1) for path, values in sorted(by_path.items())
+        },
+    }
+    if latencies:
+        result["client_cpu_ms_per_request"] = round(client_cpu_s * 1000 / len(latencies), 2)
+    if server_cpu_s is not None and latencies:
+        per_request_ms = server_cpu_s * 1000 / len(latencies)
+        result["server_cpu_s"] = round(server_cpu_s, 2)
+        result["server_cpu_ms_per_request"] = round(per_request_ms, 2)
+        result["server_capacity_rps"] = round(1000 / per_request_ms, 1) if per_request_ms else None
+    return result
+
+
+def _parse_cpus(spec: Optional[str]) -> Optional[set[int]]:
+    if not spec:
+        return None
+    cpus: set[int] = set()
+    for part in spec.split(","):
+        low, _, high = part.partition("-")
+        cpus.update(range(int(low), int(high or low) + 1))
+    return cpus
+
+
+def _process_cpu_seconds(pid: int) -> float:
+    """utime + stime of ``pid`` (Linux only)."""
+    fields = Path(f"/proc/{pid}/stat").read_text().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def _scratch_database_url(name: str) -> str:
+    db_path = Path(tempfile.gettempdir()) / f"crm_bench_{name}.db"
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+    return f"sqlite:///{db_path.as_posix()}"
+
+
+def _asgi_transport() -> httpx.ASGITransport:
+    os.environ["DATABASE_URL"] = _scratch_database_url("asgi")
+    sys.path.insert(0, str(BACKEND_DIR))
+    from main import app, init_database
+
+    init_database()
+    return httpx.ASGITransport(app=app, raise_app_exceptions=False)
+
+
+def _start_server(port: int, cpus: Optional[set[int]] = None) -> subprocess.Popen:
+    env = {**os.environ, "DATABASE_URL": _scratch_database_url(str(port))}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+        preexec_fn=(lambda: os.sched_setaffinity(0, cpus)) if cpus else None,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/status", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 30s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--serve", action="store_true", help="start a local uvicorn on a scratch database")
+    parser.add_argument("--asgi", action="store_true", help="drive the app in-process without sockets")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--server-cpus", help="CPU list for the --serve uvicorn process, e.g. 0")
+    parser.add_argument("--client-cpus", help="CPU list for the load generator, e.g. 1-3")
+    args = parser.parse_args()
+
+    client_cpus = _parse_cpus(args.client_cpus)
+    if client_cpus:
+        os.sched_setaffinity(0, client_cpus)
+
+    server = None
+    transport = None
+    cpu_probe = None
+    base_url = API_BASE_URL
+    if args.asgi:
+        transport = _asgi_transport()
+        base_url = "http://bench/api/v1"
+    elif args.serve:
+        server = _start_server(args.port, _parse_cpus(args.server_cpus))
+        base_url = f"http://127.0.0.1:{args.port}/api/v1"
+        if Path(f"/proc/{server.pid}/stat").exists():
+            cpu_probe = lambda: _process_cpu_seconds(server.pid)  # noqa: E731
+    try:
+        result = asyncio.run(run(base_url, args.clients, args.duration, transport, cpu_probe))
+    finally:
+        if server:
+            server.terminate()
+            server.wait(timeout=10)
+    print(json.dumps(result, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
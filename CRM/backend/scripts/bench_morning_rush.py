@@ -0,0 +1,278 @@
+"""
+Morning-rush load test: every rep opening the PWA at once.
+
+Each simulated rep logs in, loads ``/routes/today``, ``/pwa/customers`` and
+today's ``/pwa/visits``, then works through the first ``--stops`` route stops:
+create the visit, start it, wait, end it. Reps arrive spread over ``--ramp``
+seconds and pause ``--think`` seconds (jittered) between steps, as people
+tapping through the app do.
+
+    python scripts/bench_morning_rush.py --reps 50 --ramp 10 --think 0.5
+    python scripts/bench_morning_rush.py --reps 200 --workers 4 --output bench/rush.json
+
+By default the script starts uvicorn (``--workers``) on a scratch copy of a
+synthetic dataset from ``services.synthetic_data``; the dataset is generated
+once under ``--data-dir`` with at least ``--reps`` reps and reused. With
+``--base-url`` it targets a running server instead, which must already hold
+the synthetic reps.
+
+The JSON report has, per step and overall, the request count, throughput,
+p50/p95/p99 latency and errors by status code. For a local server it also
+counts SQLite lock errors ("database is locked") in the server log, which
+show up as 500s on the write steps when writers contend.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import dataclasses
+import json
+import os
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_DATA_DIR = BACKEND_DIR / "data" / "bench"
+STEPS = ("login", "routes_today", "pwa_customers", "pwa_visits", "visit_create", "visit_start", "visit_end")
+LOCK_MARKERS = ("database is locked", "database table is locked")
+# Start and end fixes a few metres apart with good accuracy, so GPS checks pass.
+GPS = {"lat": 31.9539, "lng": 35.9106, "accuracy": 12.0}
+
+
+@dataclasses.dataclass
+class StepStats:
+    latencies_ms: list[float] = dataclasses.field(default_factory=list)
+    errors: Counter = dataclasses.field(default_factory=Counter)
+
+    def record(self, elapsed_ms: float, status: Optional[int]) -> None:
+        self.latencies_ms.append(elapsed_ms)
+        if status is None or status >= 400:
+            # Transport failures (timeouts, resets) count under "transport".
+            self.errors["transport" if status is None else str(status)] += 1
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Rep:
+    def __init__(self, client: httpx.AsyncClient, email: str, password: str, stats: dict[str, StepStats]) -> None:
+        self.client = client
+        self.email = email
+        self.password = password
+        self.stats = stats
+
+    async def _call(self, step: str, method: str, path: str, **kwargs) -> Optional[httpx.Response]:
+        started = time.perf_counter()
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError:
+            self.stats[step].record((time.perf_counter() - started) * 1000, None)
+            return None
+        self.stats[step].record((time.perf_counter() - started) * 1000, response.status_code)
+        return response if response.status_code < 400 else None
+
+    async def morning(self, think: float, stops: int, rng: random.Random) -> None:
+        async def pause() -> None:
+            if think > 0:
+                await asyncio.sleep(rng.uniform(0.5, 1.5) * think)
+
+        login = await self._call("login", "POST", "/auth/login", json={"email": self.email, "password": self.password})
+        if login is None:
+            return
+        body = login.json()
+        rep_id = body["user"]["id"]
+        self.client.headers["Authorization"] = f"Bearer {body['token']}"
+
+        route = await self._call("routes_today", "GET", "/routes/today")
+        await self._call("pwa_customers", "GET", "/pwa/customers")
+        await self._call("pwa_visits", "GET", "/pwa/visits", params={"date": date.today().isoformat()})
+        if route is None:
+            return
+        for stop in route.json()[:stops]:
+            await pause()
+            customer_type = stop.get("customerType") or stop.get("customer_type")
+            customer_id = stop.get("customerId") or stop.get("customer_id")
+            payload = {"visit_date": date.today().isoformat(), "rep_id": rep_id, f"{customer_type}_id": customer_id}
+            created = await self._call("visit_create", "POST", "/visits/", json=payload)
+            if created is None:
+                continue
+            visit_id = created.json()["id"]
+            if await self._call("visit_start", "POST", f"/visits/{visit_id}/start", json=GPS) is None:
+                continue
+            await pause()
+            await self._call("visit_end", "POST", f"/visits/{visit_id}/end", json=GPS)
+
+
+async def run(base_url: str, accounts: list[tuple[str, str]], ramp: float, think: float, stops: int, seed: int) -> dict:
+    stats = {step: StepStats() for step in STEPS}
+    rng = random.Random(seed)
+    limits = httpx.Limits(max_connections=1, max_keepalive_connections=1)
+
+    async def arrive(index: int, email: str, password: str) -> None:
+        await asyncio.sleep(ramp * index / max(len(accounts), 1))
+        async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits) as client:
+            await Rep(client, email, password, stats).morning(think, stops, random.Random(rng.random()))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(arrive(index, email, password) for index, (email, password) in enumerate(accounts)))
+    elapsed = time.perf_counter() - started
+
+    def summary(latencies: list[float], errors: Counter) -> dict:
+        return {
+            "requests": len(latencies),
+            "throughput_rps": round(len(latencies) / elapsed, 2),
+            "latency_ms": {
+                "p50": round(_percentile(latencies, 50), 1),
+                "p95": round(_percentile(latencies, 95), 1),
+                "p99": round(_percentile(latencies, 99), 1),
+                "mean": round(statistics.fmean(latencies), 1) if latencies else 0.0,
+            },
+            "errors": sum(errors.values()),
+            "error_rate": round(sum(errors.values()) / len(latencies), 4) if latencies else 0.0,
+            "errors_by_status": dict(errors),
+        }
+
+    everything = [latency for step in stats.values() for latency in step.latencies_ms]
+    all_errors = sum((step.errors for step in stats.values()), Counter())
+    return {
+        "reps": len(accounts),
+        "ramp_s": ramp,
+        "think_s": think,
+        "stops": stops,
+        "duration_s": round(elapsed, 2),
+        "overall": summary(everything, all_errors),
+        "steps": {name: summary(step.latencies_ms, step.errors) for name, step in stats.items()},
+    }
+
+
+def _synthetic_accounts(reps: int) -> list[tuple[str, str]]:
+    sys.path.insert(0, str(BACKEND_DIR))
+    from services.synthetic_data import SYNTHETIC_EMAIL_DOMAIN, SYNTHETIC_PASSWORD
+
+    return [(f"rep{index:05d}@{SYNTHETIC_EMAIL_DOMAIN}", SYNTHETIC_PASSWORD) for index in range(1, reps + 1)]
+
+
+def _prepare_dataset(scale_name: str, reps: int, seed: int, data_dir: Path) -> Path:
+    """Generate (once) a dataset with at least ``reps`` reps; returns its database file."""
+    dataset_dir = (data_dir / f"rush-{scale_name}-{reps}reps-seed{seed}").resolve()
+    db_path = dataset_dir / "crm.db"
+    if (dataset_dir / "dataset.json").exists():
+        return db_path
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path.as_posix()}"
+    sys.path.insert(0, str(BACKEND_DIR))
+    from core import db as core_db
+    from main import init_database
+    from services.synthetic_data import SCALES, generate
+
+    init_database()
+    scale = dataclasses.replace(SCALES[scale_name], reps=max(reps, SCALES[scale_name].reps))
+    counts = generate(core_db.engine, scale, seed=seed)
+    with core_db.engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+        conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)")
+    core_db.engine.dispose()
+    (dataset_dir / "dataset.json").write_text(json.dumps({"scale": scale_name, "rows": counts}), encoding="utf-8")
+    return db_path
+
+
+def _scratch_copy(db_path: Path) -> Path:
+    scratch = Path(tempfile.gettempdir()) / "crm_bench_rush.db"
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        Path(f"{scratch}{suffix}").unlink(missing_ok=True)
+    shutil.copyfile(db_path, scratch)
+    return scratch
+
+
+def _start_server(port: int, workers: int, db_path: Path, log_file) -> subprocess.Popen:  # noqa: ANN001
+    env = {**os.environ, "DATABASE_URL": f"sqlite:///{db_path.as_posix()}"}
+    process = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(port), "--workers", str(workers), "--log-level", "warning",
+        ],
+        cwd=BACKEND_DIR,
+        env=env,
+        stdout=log_file,
+        stderr=subprocess.STDOUT,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/status", timeout=1).status_code == 200:
+                return process
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError("uvicorn did not start within 60s")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--reps", type=int, default=50)
+    parser.add_argument("--ramp", type=float, default=10.0, help="Seconds over which reps arrive.")
+    parser.add_argument("--think", type=float, default=0.5, help="Mean pause between steps, in seconds.")
+    parser.add_argument("--stops", type=int, default=3, help="Visits each rep starts and ends.")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes.")
+    parser.add_argument("--scale", default="10k", help="Synthetic dataset scale: 10k, 100k or 1m.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--base-url", help="Target a running server, e.g. http://127.0.0.1:8000/api/v1.")
+    parser.add_argument("--output", type=Path)
+    args = parser.parse_args()
+
+    server = None
+    log_path = None
+    base_url = (args.base_url or "").rstrip("/")
+    with contextlib.ExitStack() as stack:
+        if not base_url:
+            scratch = _scratch_copy(_prepare_dataset(args.scale, args.reps, args.seed, args.data_dir))
+            log_path = scratch.with_suffix(".log")
+            log_file = stack.enter_context(open(log_path, "w", encoding="utf-8"))
+            server = _start_server(args.port, args.workers, scratch, log_file)
+            base_url = f"http://127.0.0.1:{args.port}/api/v1"
+        # After the dataset: importing the app's modules binds DATABASE_URL.
+        accounts = _synthetic_accounts(args.reps)
+        try:
+            result = asyncio.run(run(base_url, accounts, args.ramp, args.think, args.stops, args.seed))
+        finally:
+            if server:
+                server.terminate()
+                server.wait(timeout=30)
+
+    result["workers"] = args.workers if log_path else None
+    if log_path:
+        log = log_path.read_text(encoding="utf-8", errors="replace")
+        result["sqlite_lock_errors"] = sum(log.count(marker) for marker in LOCK_MARKERS)
+        result["server_log"] = str(log_path)
+
+    rendered = json.dumps(result, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(rendered + "\n", encoding="utf-8")
+    print(rendered)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,244 @@
+"""
+Scale benchmark: the key endpoints against synthetic datasets.
+
+Each scale (visits rows: 10k, 100k, 1m) gets its own SQLite database and
+ledger files under ``--data-dir``, generated once by
+``services.synthetic_data`` (deterministic for a given ``--seed``) and reused
+by later runs. Every scale runs in a fresh interpreter with the app served
+in-process (httpx ASGITransport, no sockets), so numbers reflect the
+application, not the network.
+
+    python scripts/bench_scale.py --scales 10k,100k --repeat 20 --output bench/scale.json
+    python scripts/bench_scale.py --scales 10k --compare bench/scale.json
+
+For each endpoint the JSON records p50/p95 latency in ms, the number of SQL
+statements (from Server-Timing), the response size and the peak memory
+traced while serving one request; per scale it records the row counts,
+generation time and the process's max RSS. ``--compare`` prints the p95
+ratio against an earlier run and exits non-zero when one grows past
+``--fail-ratio``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import resource
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_DATA_DIR = BACKEND_DIR / "data" / "bench"
+ADMIN = ("admin@example.com", "Admin12345!")
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+def _endpoints(anchor, ledger_account: str) -> list[tuple[str, str, str]]:
+    """(name, role, path) for the endpoints dashboards and the PWA hit most."""
+    quarter = f"from={anchor - timedelta(days=90)}&to={anchor}"
+    return [
+        ("visits_list", "admin", "/api/v1/visits/?page=1&page_size=50"),
+        ("visits_list_deep", "admin", "/api/v1/visits/?page=200&page_size=50&total_mode=estimate"),
+        ("visits_summary", "admin", f"/api/v1/visits/summary?date_from={anchor - timedelta(days=90)}&date_to={anchor}"),
+        ("reports_overview", "admin", f"/api/v1/reports/overview?{quarter}"),
+        ("rep_performance", "admin", f"/api/v1/reports/rep-performance?{quarter}"),
+        ("product_performance", "admin", f"/api/v1/reports/product-performance?{quarter}"),
+        ("doctors_list", "admin", "/api/v1/doctors/?page=1&page_size=50"),
+        ("pharmacies_list", "admin", "/api/v1/pharmacies/?page=1&page_size=50"),
+        ("orders_list", "admin", "/api/v1/orders/?page=1&page_size=50"),
+        ("stock_movements", "admin", "/api/v1/stock/movements?page=1&page_size=50"),
+        ("collections_list", "admin", "/api/v1/collections/?page=1&page_size=50"),
+        ("ledger_summary", "admin", f"/api/admin/dpm-ledger/pharmacies/{ledger_account}/summary"),
+        ("routes_today", "rep", "/api/v1/routes/today"),
+        ("pwa_customers", "rep", "/api/v1/pwa/customers"),
+        ("pwa_visits", "rep", "/api/v1/pwa/visits"),
+    ]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _prepare(scale_name: str, seed: int) -> dict:
+    """Generate the dataset unless the marker from an earlier run is present."""
+    from core import db as core_db
+    from main import init_database
+    from services.synthetic_data import DEFAULT_ANCHOR, SCALES, generate
+
+    init_database()
+    marker = Path(os.environ["BENCH_DATASET_DIR"]) / "dataset.json"
+    if marker.exists():
+        return json.loads(marker.read_text(encoding="utf-8"))
+
+    def progress(table: str, done: int, total: int) -> None:
+        print(f"  {table}: {done}/{total}", file=sys.stderr)
+
+    started = time.perf_counter()
+    counts = generate(
+        core_db.engine,
+        SCALES[scale_name],
+        seed=seed,
+        ledger_dir=Path(os.environ["DPM_LEDGER_DB_DIR"]),
+        progress=progress,
+    )
+    generate_seconds = time.perf_counter() - started
+    with core_db.engine.begin() as conn:
+        conn.exec_driver_sql("ANALYZE")
+    dataset = {
+        "scale": scale_name,
+        "seed": seed,
+        "anchor": DEFAULT_ANCHOR.isoformat(),
+        "rows": counts,
+        "generate_seconds": round(generate_seconds, 1),
+    }
+    marker.write_text(json.dumps(dataset, indent=2), encoding="utf-8")
+    return dataset
+
+
+async def _measure(repeat: int, only: Optional[set[str]]) -> dict:
+    import httpx
+
+    from main import app
+    from services.synthetic_data import DEFAULT_ANCHOR, SYNTHETIC_EMAIL_DOMAIN, SYNTHETIC_PASSWORD, legacy_account_id
+
+    results: dict[str, dict] = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=600) as client:
+        headers = {}
+        for role, (email, password) in {
+            "admin": ADMIN,
+            "rep": (f"rep00001@{SYNTHETIC_EMAIL_DOMAIN}", SYNTHETIC_PASSWORD),
+        }.items():
+            login = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+            login.raise_for_status()
+            headers[role] = {"Authorization": f"Bearer {login.json()['token']}", "Accept-Encoding": "identity"}
+
+        for name, role, path in _endpoints(DEFAULT_ANCHOR, legacy_account_id(0)):
+            if only and name not in only:
+                continue
+            response = await client.get(path, headers=headers[role])
+            if response.status_code != 200:
+                results[name] = {"path": path, "status": response.status_code}
+                continue
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                await client.get(path, headers=headers[role])
+                timings.append((time.perf_counter() - started) * 1000)
+            tracemalloc.start()
+            await client.get(path, headers=headers[role])
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            match = _QUERIES.search(response.headers.get("server-timing", ""))
+            results[name] = {
+                "path": path,
+                "status": response.status_code,
+                "p50_ms": round(statistics.median(timings), 2),
+                "p95_ms": round(_percentile(timings, 95), 2),
+                "queries": int(match.group(1)) if match else None,
+                "bytes": len(response.content),
+                "peak_kib": round(peak / 1024, 1),
+            }
+    return results
+
+
+def _child(scale_name: str, seed: int, repeat: int, only: Optional[set[str]]) -> None:
+    sys.path.insert(0, str(BACKEND_DIR))
+    dataset = _prepare(scale_name, seed)
+    endpoints = asyncio.run(_measure(repeat, only))
+    max_rss_kib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    print(json.dumps({**dataset, "max_rss_mib": round(max_rss_kib / 1024, 1), "endpoints": endpoints}))
+
+
+def _run_scale(scale_name: str, args: argparse.Namespace) -> dict:
+    dataset_dir = (args.data_dir / f"{scale_name}-seed{args.seed}").resolve()
+    dataset_dir.mkdir(parents=True, exist_ok=True)
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{(dataset_dir / 'crm.db').as_posix()}",
+        "DPM_LEDGER_DB_DIR": str(dataset_dir / "ledger"),
+        "DPM_LEDGER_ACTIVE_YEAR": "2024",
+        "BENCH_DATASET_DIR": str(dataset_dir),
+        "QUERY_INSTRUMENTATION_ENABLED": "true",
+        "PYTHONPATH": str(BACKEND_DIR),
+    }
+    command = [sys.executable, __file__, "--child", scale_name, "--seed", str(args.seed), "--repeat", str(args.repeat)]
+    if args.only:
+        command += ["--only", args.only]
+    output = subprocess.run(command, env=env, cwd=BACKEND_DIR, check=True, stdout=subprocess.PIPE, text=True)
+    return json.loads(output.stdout.strip().splitlines()[-1])
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR, check=True, capture_output=True, text=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _compare(current: dict, baseline: dict, fail_ratio: float) -> bool:
+    regressed = False
+    for scale_name, run in current["scales"].items():
+        before = baseline.get("scales", {}).get(scale_name)
+        if not before:
+            continue
+        print(f"{scale_name} (p95 ms, {baseline.get('commit')} -> {current.get('commit')})")
+        for name, result in run["endpoints"].items():
+            old = before["endpoints"].get(name, {})
+            if "p95_ms" not in result or "p95_ms" not in old:
+                continue
+            ratio = result["p95_ms"] / old["p95_ms"] if old["p95_ms"] else float("inf")
+            flag = "  REGRESSION" if ratio > fail_ratio else ""
+            regressed = regressed or bool(flag)
+            print(f"  {name:22} {old['p95_ms']:9.2f} -> {result['p95_ms']:9.2f}  x{ratio:.2f}  queries {old.get('queries')} -> {result.get('queries')}{flag}")
+    return regressed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default="10k", help="Comma-separated: 10k,100k,1m.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--only", help="Comma-separated endpoint names.")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR)
+    parser.add_argument("--output", type=Path)
+    parser.add_argument("--compare", type=Path, help="Earlier --output file to compare p95 against.")
+    parser.add_argument("--fail-ratio", type=float, default=1.25)
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    only = set(args.only.split(",")) if args.only else None
+
+    if args.child:
+        _child(args.child, args.seed, args.repeat, only)
+        return 0
+
+    report = {"commit": _git_commit(), "repeat": args.repeat, "scales": {}}
+    for scale_name in [name.strip().lower() for name in args.scales.split(",") if name.strip()]:
+        print(f"Running {scale_name}...", file=sys.stderr)
+        report["scales"][scale_name] = _run_scale(scale_name, args)
+
+    rendered = json.dumps(report, indent=2)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(rendered + "\n", encoding="utf-8")
+    if args.compare:
+        return 1 if _compare(report, json.loads(args.compare.read_text(encoding="utf-8")), args.fail_ratio) else 0
+    print(rendered)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+"""
+Serialization benchmark for the large list endpoints.
+
+Seeds a scratch SQLite database with ``--rows`` HCPs, doctors and visits, then
+times each endpoint through the in-process ASGI app (httpx ASGITransport, no
+sockets) with FAST_JSON_RESPONSES
+on and off (each mode in a fresh interpreter, since the default response class
+is chosen at import). Both modes share the column projections; the difference
+is FastAPI's response_model validation + jsonable_encoder + json versus one
+pydantic-core dump or orjson.
+
+    python scripts/bench_serialization.py --rows 1000 --repeat 20
+
+Prints JSON with the median milliseconds per 1,000 rows for each endpoint and
+mode, plus the encode-only cost of the HCP payload.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+
+
+def _seed(rows: int) -> None:
+    from core.db import SessionLocal
+    from models.crm import Doctor, User, Visit
+    from models.hcp import HCP
+
+    with SessionLocal() as session:
+        rep_id = session.query(User.id).filter(User.email == "rep@example.com").scalar()
+        session.add_all(
+            HCP(first_name=f"First{i}", last_name=f"Last{i:05d}", specialty="GP", area="Area", city="Amman")
+            for i in range(rows)
+        )
+        doctors = [Doctor(name=f"Dr. Bench {i:05d}", specialty="GP", area="Area", city="Amman") for i in range(rows)]
+        session.add_all(doctors)
+        session.flush()
+        started = datetime(2024, 5, 1, 9, 0)
+        session.add_all(
+            Visit(
+                visit_date=date(2024, 5, 1) + timedelta(days=i % 30),
+                rep_id=rep_id,
+                doctor_id=doctors[i].id,
+                status="completed",
+                started_at=started,
+                ended_at=started + timedelta(minutes=15),
+                duration_seconds=900,
+                start_lat=31.95,
+                start_lng=35.91,
+                notes="Bench visit",
+            )
+            for i in range(rows)
+        )
+        session.commit()
+
+
+async def _measure(rows: int, repeat: int) -> dict:
+    import httpx
+
+    from main import app
+
+    page = min(rows, 500)
+    pages = max(1, rows // page)
+    endpoints = {
+        "v1_hcps": ("admin", [f"/api/v1/hcps?pageSize={page}&page={p}" for p in range(1, pages + 1)]),
+        "v1_visits": ("admin", [f"/api/v1/visits/?page_size={page}&page={p}" for p in range(1, pages + 1)]),
+        "pwa_visits": ("rep", ["/api/v1/pwa/visits"]),
+        "pwa_customers": ("rep", ["/api/v1/pwa/customers?type=doctor"]),
+    }
+    results: dict = {}
+    async with app.router.lifespan_context(app), httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench"
+    ) as client:
+        _seed(rows)
+        headers = {}
+        for role, email, password in (("admin", "admin@example.com", "Admin12345!"), ("rep", "rep@example.com", "Rep12345!")):
+            resp = await client.post("/api/v1/auth/login", json={"email": email, "password": password})
+            headers[role] = {"Authorization": f"Bearer {resp.json()['token']}"}
+        for name, (role, paths) in endpoints.items():
+            samples = []
+            for _ in range(repeat + 1):
+                started = time.perf_counter()
+                fetched = 0
+                for path in paths:
+                    resp = await client.get(path, headers=headers[role])
+                    resp.raise_for_status()
+                    body = resp.json()
+                    fetched += len(body["data"] if isinstance(body, dict) else body)
+                samples.append((time.perf_counter() - started) * 1000 * 1000 / max(fetched, 1))
+            results[name] = round(statistics.median(samples[1:]), 2)
+        body = (await client.get(endpoints["v1_hcps"][1][0], headers=headers["admin"])).json()
+
+    from fastapi.encoders import jsonable_encoder
+
+    from core.responses import FastJSONResponse
+
+    encoders = {"jsonable_encoder+json": lambda: json.dumps(jsonable_encoder(body)), "orjson": lambda: FastJSONResponse(body)}
+    for label, encode in encoders.items():
+        started = time.perf_counter()
+        for _ in range(repeat):
+            encode()
+        per_row_ms = (time.perf_counter() - started) * 1000 / repeat / len(body["data"])
+        results[f"encode_only_hcps[{label}]"] = round(per_row_ms * 1000, 2)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        sys.path.insert(0, str(BACKEND_DIR))
+        print(json.dumps(asyncio.run(_measure(args.rows, args.repeat))))
+        return
+
+    report: dict = {"rows": args.rows, "unit": "ms per 1000 rows (median)"}
+    for mode in ("false", "true"):
+        with tempfile.TemporaryDirectory() as tmp:
+            env = {
+                **os.environ,
+                "DATABASE_URL": f"sqlite:///{Path(tmp, 'bench.db').as_posix()}",
+                "FAST_JSON_RESPONSES": mode,
+                "QUERY_INSTRUMENTATION_ENABLED": "false",
+            }
+            out = subprocess.run(
+                [sys.executable, __file__, "--child", "--rows", str(args.rows), "--repeat", str(args.repeat)],
+                cwd=BACKEND_DIR,
+                env=env,
+                check=True,
+                capture_output=True,
+                text=True,
+            )
+        report["fast" if mode == "true" else "default"] = json.loads(out.stdout.strip().splitlines()[-1])
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
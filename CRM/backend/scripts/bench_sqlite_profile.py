@@ -0,0 +1,142 @@
+"""
+Mixed read/write benchmark for the SQLite connection profile.
+
+Each profile runs in a fresh subprocess (settings are read at import time)
+against its own scratch database, with reader and writer threads sharing the
+application engine for a fixed duration:
+
+    python scripts/bench_sqlite_profile.py --readers 8 --writers 2 --duration 10
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+PROFILES = ("off", "tuned")
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def _worker(args: argparse.Namespace) -> dict:
+    sys.path.insert(0, str(BACKEND_DIR))
+    from sqlalchemy import text
+
+    from core.db import engine, sqlite_pragma_report
+
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE IF NOT EXISTS bench_events ("
+                "id INTEGER PRIMARY KEY, rep_id INTEGER NOT NULL, payload TEXT NOT NULL, "
+                "created_at REAL NOT NULL)"
+            )
+        )
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_bench_events_rep ON bench_events (rep_id)"))
+        conn.execute(
+            text("INSERT INTO bench_events (rep_id, payload, created_at) VALUES (:r, :p, :t)"),
+            [{"r": i % 50, "p": "x" * 200, "t": time.time()} for i in range(args.seed_rows)],
+        )
+
+    deadline = time.perf_counter() + args.duration
+    stats = {"read": [], "write": [], "errors": 0}
+    lock = threading.Lock()
+
+    def reader(offset: int) -> None:
+        rep_id = offset
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with engine.connect() as conn:
+                    conn.execute(
+                        text(
+                            "SELECT count(*), max(created_at) FROM bench_events WHERE rep_id = :r"
+                        ),
+                        {"r": rep_id % 50},
+                    ).all()
+            except Exception:  # noqa: BLE001
+                with lock:
+                    stats["errors"] += 1
+                continue
+            with lock:
+                stats["read"].append((time.perf_counter() - started) * 1000)
+            rep_id += 1
+
+    def writer(offset: int) -> None:
+        while time.perf_counter() < deadline:
+            started = time.perf_counter()
+            try:
+                with engine.begin() as conn:
+                    conn.execute(
+                        text("INSERT INTO bench_events (rep_id, payload, created_at) VALUES (:r, :p, :t)"),
+                        {"r": offset % 50, "p": "y" * 200, "t": time.time()},
+                    )
+            except Exception:  # noqa: BLE001
+                with lock:
+                    stats["errors"] += 1
+                continue
+            with lock:
+                stats["write"].append((time.perf_counter() - started) * 1000)
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(args.readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    return {
+        "pragmas": sqlite_pragma_report(engine),
+        "reads_per_s": round(len(stats["read"]) / args.duration, 1),
+        "writes_per_s": round(len(stats["write"]) / args.duration, 1),
+        "read_p95_ms": round(_percentile(stats["read"], 95), 2),
+        "write_p95_ms": round(_percentile(stats["write"], 95), 2),
+        "errors": stats["errors"],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--seed-rows", type=int, default=20000)
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(_worker(args)))
+        return 0
+
+    results = {}
+    for profile in PROFILES:
+        db_path = Path(tempfile.gettempdir()) / f"crm_sqlite_profile_{profile}.db"
+        for suffix in ("", "-wal", "-shm", "-journal"):
+            Path(f"{db_path}{suffix}").unlink(missing_ok=True)
+        env = {
+            **os.environ,
+            "DATABASE_URL": f"sqlite:///{db_path.as_posix()}",
+            "SQLITE_PROFILE": profile,
+        }
+        command = [sys.executable, __file__, "--worker", *sys.argv[1:]]
+        output = subprocess.run(command, env=env, cwd=BACKEND_DIR, check=True, capture_output=True, text=True)
+        results[profile] = json.loads(output.stdout.strip().splitlines()[-1])
+    print(json.dumps(results, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,54 @@
+"""
+Upsert HCPs from a CSV or XLSX file into DATABASE_URL (same rules as POST /api/v1/hcps/import).
+
+    python scripts/import_hcps.py ../hcps.xlsx
+    python scripts/import_hcps.py hcps.csv --batch-size 5000 --report import-report.json
+
+Prints the import report as JSON: inserted/updated/unchanged/skipped counts and
+the rows that failed, by spreadsheet row number.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from core.db import SessionLocal  # noqa: E402
+from services import hcp_import  # noqa: E402
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--format", choices=("csv", "xlsx"), help="Default: from the file's contents.")
+    parser.add_argument("--batch-size", type=int, default=hcp_import.DEFAULT_BATCH_SIZE)
+    parser.add_argument("--report", type=Path, help="Also write the report to this file.")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    with open(args.path, "rb") as source, SessionLocal() as db:
+        file_format = args.format or hcp_import.detect_format(None, source.read(4))
+        source.seek(0)
+        rows = hcp_import.read_xlsx(source) if file_format == "xlsx" else hcp_import.read_csv(source)
+        try:
+            report = hcp_import.import_hcps(db, rows, batch_size=args.batch_size)
+        except hcp_import.ImportFormatError as exc:
+            print(f"{args.path}: {exc}", file=sys.stderr)
+            return 1
+
+    result = {**report.as_dict(), "seconds": round(time.perf_counter() - started, 2)}
+    rendered = json.dumps(result, indent=2, ensure_ascii=False)
+    if args.report:
+        args.report.write_text(rendered + "\n", encoding="utf-8")
+    print(rendered)
+    return 0 if not report.failed else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Apply pending schema migrations (see ``migrations/``) to DATABASE_URL.
+
+    python scripts/migrate.py --dry-run
+    python scripts/migrate.py --batch-size 5000
+
+``--dry-run`` lists pending migrations with the number of rows each backfill
+would touch. Startup applies the same migrations unless
+MIGRATIONS_ON_STARTUP=false; run this first for large backfills.
+"""
+
+from __future__ import annotations
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(BACKEND_DIR))
+
+from core.db import engine  # noqa: E402
+from migrations import MIGRATIONS, apply_migrations, migration_plan  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Print the plan without changing anything.")
+    parser.add_argument("--batch-size", type=int, default=None, help="Rows per backfill transaction.")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    plan = migration_plan(engine, MIGRATIONS)
+    if not plan:
+        print(f"{engine.url}: up to date.")
+        return
+    if args.dry_run:
+        for step in plan:
+            detail = "schema" if step["schema_step"] else ""
+            if step["backfill_table"]:
+                detail = f"{detail + ' + ' if detail else ''}backfill {step['backfill_rows']} {step['backfill_table']} rows"
+            print(f"{step['version']:04d} {step['name']}: {detail} - {step['description']}")
+        return
+    applied = apply_migrations(engine, MIGRATIONS, batch_size=args.batch_size, progress=print)
+    print(f"Applied {len(applied)} migration(s).")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""
+Customer account index behind ``/pwa/customers`` (SQLite).
+
+``account_index`` holds one row per doctor and pharmacy with the columns the
+customer list shows, plus the date and GPS fix of the account's latest
+completed (or in-progress) visit. Insert/update/delete triggers on doctors,
+pharmacies and visits keep it current, so a customer listing is one ordered,
+paginated scan of one table with no visit lookups per row.
+
+Other backends, and databases the migration has not reached yet, keep building
+the list from the doctors and pharmacies tables, without visit data.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+
+from sqlalchemy import Column, Date, Float, Index, Integer, MetaData, String, Table, inspect
+from sqlalchemy.engine import Connection
+
+from core import db as core_db
+
+logger = logging.getLogger(__name__)
+
+# Not on models.Base: create_all must not add the table without its triggers.
+metadata = MetaData()
+
+ACCOUNT_INDEX = Table(
+    "account_index",
+    metadata,
+    Column("kind", String(10), primary_key=True),
+    Column("id", Integer, primary_key=True),
+    Column("name", String(150), nullable=False),
+    Column("specialty", String(150)),
+    Column("clinic", String(255)),
+    Column("area", String(100)),
+    Column("city", String(100)),
+    Column("phone", String(50)),
+    Column("last_visit_date", Date),
+    Column("lat", Float),
+    Column("lng", Float),
+    # visit_date of the visit lat/lng come from.
+    Column("location_date", Date),
+)
+# One per listing order, so a page is read straight off an index: by name, by
+# name within a kind (type filter), and most recently visited first.
+Index("ix_account_index_name", ACCOUNT_INDEX.c.name, ACCOUNT_INDEX.c.kind, ACCOUNT_INDEX.c.id)
+Index("ix_account_index_kind_name", ACCOUNT_INDEX.c.kind, ACCOUNT_INDEX.c.name, ACCOUNT_INDEX.c.id)
+Index(
+    "ix_account_index_last_visit",
+    ACCOUNT_INDEX.c.last_visit_date.desc(),
+    ACCOUNT_INDEX.c.name,
+    ACCOUNT_INDEX.c.kind,
+    ACCOUNT_INDEX.c.id,
+)
+
+
+
+@dataclass(frozen=True)
+class AccountSource:
+    kind: str
+    table: str
+    # Column of visits pointing at this table.
+    visit_column: str
+    # account_index column -> source column; the rest stay NULL.
+    columns: tuple[tuple[str, str], ...]
+
+
+DOCTORS = AccountSource(
+    "doctor",
+    "doctors",
+    "doctor_id",
+    (("name", "name"), ("specialty", "specialty"), ("clinic", "clinic"), ("area", "area"), ("city", "city"), ("phone", "phone")),
+)
+PHARMACIES = AccountSource(
+    "pharmacy",
+    "pharmacies",
+    "pharmacy_id",
+    (("name", "name"), ("area", "area"), ("city", "city"), ("phone", "phone")),
+)
+SOURCES = (DOCTORS, PHARMACIES)
+
+_available: dict[str, bool] = {}
+
+
+def _visited(row: str = "") -> str:
+    """Visits that count as the account's last visit (scheduled and cancelled ones do not)."""
+    return f"{row}status IN ('completed', 'in_progress') AND {row}is_deleted = 0"
+
+
+def _refresh_visits(source: AccountSource, account_id: str) -> str:
+    """Recompute the last-visit columns of one account (``account_id`` is an SQL expression)."""
+    visits = f"FROM visits WHERE {source.visit_column} = {account_id} AND {_visited()}"
+    fix = f"{visits} AND start_lat IS NOT NULL AND start_lng IS NOT NULL ORDER BY visit_date DESC, id DESC LIMIT 1"
+    return (
+        f"UPDATE account_index SET last_visit_date = (SELECT MAX(visit_date) {visits}), "
+        f"lat = (SELECT start_lat {fix}), lng = (SELECT start_lng {fix}), location_date = (SELECT visit_date {fix}) "
+        f"WHERE kind = '{source.kind}' AND id = {account_id};"
+    )
+
+
+def _record_visit(source: AccountSource) -> str:
+    """
+    Fold one new visit into its account. A visit can only move the last visit
+    forward, so inserts skip the recompute that updates and deletes need (which
+    reads every visit of the account and would dominate bulk loads).
+    """
+    account = f"kind = '{source.kind}' AND id = new.{source.visit_column}"
+    return (
+        f"UPDATE account_index SET last_visit_date = new.visit_date "
+        f"WHERE {account} AND (last_visit_date IS NULL OR last_visit_date < new.visit_date); "
+        f"UPDATE account_index SET lat = new.start_lat, lng = new.start_lng, location_date = new.visit_date "
+        f"WHERE {account} AND new.start_lat IS NOT NULL AND new.start_lng IS NOT NULL "
+        f"AND (location_date IS NULL OR location_date <= new.visit_date);"
+    )
+
+
+def index_ddl() -> list[str]:
+    """Triggers that keep ``account_index`` in step with its sources and their visits."""
+    statements = []
+    for source in SOURCES:
+        targets = ", ".join(target for target, _ in source.columns)
+        values = ", ".join(f"new.{column}" for _, column in source.columns)
+        assignments = ", ".join(f"{target} = new.{column}" for target, column in source.columns)
+        watched = ", ".join(column for _, column in source.columns)
+        prefix = f"account_index_{source.table}"
+        statements += [
+            f"CREATE TRIGGER IF NOT EXISTS {prefix}_ai AFTER INSERT ON {source.table} BEGIN "
+            f"INSERT INTO account_index(kind, id, {targets}) VALUES ('{source.kind}', new.id, {values}); END",
+            f"CREATE TRIGGER IF NOT EXISTS {prefix}_au AFTER UPDATE OF {watched} ON {source.table} BEGIN "
+            f"UPDATE account_index SET {assignments} WHERE kind = '{source.kind}' AND id = new.id; END",
+            f"CREATE TRIGGER IF NOT EXISTS {prefix}_ad AFTER DELETE ON {source.table} BEGIN "
+            f"DELETE FROM account_index WHERE kind = '{source.kind}' AND id = old.id; END",
+        ]
+
+    def refresh(row: str) -> str:
+        return " ".join(_refresh_visits(source, f"{row}.{source.visit_column}") for source in SOURCES)
+
+    statements += [
+        f"CREATE TRIGGER IF NOT EXISTS account_index_visits_ai AFTER INSERT ON visits WHEN {_visited('new.')} "
+        f"BEGIN {' '.join(_record_visit(source) for source in SOURCES)} END",
+        f"CREATE TRIGGER IF NOT EXISTS account_index_visits_ad AFTER DELETE ON visits BEGIN {refresh('old')} END",
+        "CREATE TRIGGER IF NOT EXISTS account_index_visits_au AFTER UPDATE OF "
+        "doctor_id, pharmacy_id, visit_date, status, is_deleted, start_lat, start_lng ON visits "
+        f"BEGIN {refresh('old')} {refresh('new')} END",
+    ]
+    return statements
+
+
+def install_account_index(conn: Connection) -> int:
+    """Create (if needed) and rebuild ``account_index`` from its sources; returns rows indexed."""
+    ACCOUNT_INDEX.create(conn, checkfirst=True)
+    for statement in index_ddl():
+        conn.exec_driver_sql(statement)
+    conn.exec_driver_sql("DELETE FROM account_index")
+    indexed = 0
+    for source in SOURCES:
+        targets = ", ".join(target for target, _ in source.columns)
+        columns = ", ".join(column for _, column in source.columns)
+        indexed += conn.exec_driver_sql(
+            f"INSERT INTO account_index(kind, id, {targets}) SELECT '{source.kind}', id, {columns} FROM {source.table}"
+        ).rowcount
+        conn.exec_driver_sql(_refresh_visits(source, "account_index.id"))
+    _available.clear()
+    return indexed
+
+
+def index_available() -> bool:
+    """True when the primary database is SQLite and ``account_index`` exists there (checked once per process)."""
+    engine = core_db.engine
+    if engine.dialect.name != "sqlite":
+        return False
+    key = str(engine.url)
+    available = _available.get(key)
+    if available is None:
+        with engine.connect() as conn:
+            available = _available[key] = inspect(conn).has_table(ACCOUNT_INDEX.name)
+        if not available:
+            logger.warning("Account index is missing; customer listings read doctors and pharmacies directly.")
+    return available
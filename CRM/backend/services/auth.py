@@ -1,15 +1,22 @@
 from __future__ import annotations
 
+import asyncio
+import hashlib
+import json
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 
 import jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from starlette.concurrency import run_in_threadpool
 
 from core.config import settings
+from core.metrics import queue_depth, registry
 from models.crm import Role, User
+from services.meta import get_meta_value, set_meta_value
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +34,57 @@ def verify_password(password: str, password_hash: str) -> bool:
     return password_context.verify(password, password_hash)
 
 
+class PasswordPoolSaturated(RuntimeError):
+    """Raised when too many password checks are already queued."""
+
+
+class PasswordHasherPool:
+    """
+    Runs password verification on a small dedicated thread pool.
+
+    pbkdf2 is CPU bound; keeping it off the event loop and off the shared
+    request threadpool means a burst of logins cannot starve other requests.
+    Checks beyond ``max_pending`` are rejected instead of queueing forever.
+    """
+
+    def __init__(self, *, workers: int, max_pending: int) -> None:
+        self._workers = max(workers, 1)
+        self._max_pending = max(max_pending, self._workers)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.pending = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self._workers, thread_name_prefix="password-hash"
+            )
+        return self._executor
+
+    async def verify(self, password: str, password_hash: str) -> bool:
+        if self.pending >= self._max_pending:
+            raise PasswordPoolSaturated("Too many concurrent password checks.")
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._get_executor(), verify_password, password, password_hash
+            )
+        finally:
+            self.pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+
+password_pool = PasswordHasherPool(
+    workers=settings.password_hash_workers,
+    max_pending=settings.password_hash_max_pending,
+)
+registry.add_collector(lambda: [(queue_depth, [(("password_hash",), password_pool.pending)])])
+
+
 def issue_token(user: User, expires_in_minutes: int = 60) -> str:
     payload = {
         "sub": str(user.id),
@@ -39,7 +97,12 @@ def issue_token(user: User, expires_in_minutes: int = 60) -> str:
 
 
 def find_user_by_email(db: Session, email: str) -> Optional[User]:
-    return db.query(User).filter(User.email == email.lower()).first()
+    return (
+        db.query(User)
+        .options(joinedload(User.role))
+        .filter(User.email == email.lower())
+        .first()
+    )
 
 
 def authenticate(db: Session, email: str, password: str) -> Optional[User]:
@@ -53,6 +116,18 @@ def authenticate(db: Session, email: str, password: str) -> Optional[User]:
     return user
 
 
+async def authenticate_async(db: Session, email: str, password: str) -> Optional[User]:
+    """Like :func:`authenticate`, but never blocks the event loop."""
+    user = await run_in_threadpool(find_user_by_email, db, email)
+    if not user or not user.is_active:
+        return None
+
+    if not await password_pool.verify(password, user.password_hash):
+        return None
+
+    return user
+
+
 def seed_default_roles(db: Session) -> dict[str, Role]:
     defaults = [
         ("admin", "Admin"),
@@ -100,19 +175,47 @@ DEFAULT_USERS = [
 ]
 
 
+SEED_FINGERPRINT_KEY = "default_users_fingerprint"
+
+
+def _resolve_default_user(db: Session, candidates: list[str], role_id: int) -> Optional[User]:
+    user = db.query(User).filter(User.email.in_(candidates)).first()
+    if not user:
+        user = db.query(User).filter(User.role_id == role_id).first()
+    return user
+
+
+def _seed_fingerprint(users: list[Optional[User]]) -> str:
+    """Digest of the seed definitions plus the rows they resolved to."""
+    digest = hashlib.sha256()
+    for (email, name, role_slug, password, aliases), user in zip(DEFAULT_USERS, users):
+        digest.update(json.dumps([email, name, role_slug, password, aliases]).encode())
+        if user is None:
+            digest.update(b"<missing>")
+        else:
+            state = [user.id, user.email, user.name, user.role_id, bool(user.is_active), user.password_hash]
+            digest.update(json.dumps(state).encode())
+    return digest.hexdigest()
+
+
 def seed_default_users(db: Session, roles: dict[str, Role]) -> None:
     legacy_sales_reps = db.query(User).join(Role).filter(Role.slug == "sales_rep").all()
     for rep in legacy_sales_reps:
         rep.role_id = roles["medical_rep"].id
+    if legacy_sales_reps:
+        db.flush()
 
-    for email, name, role_slug, password, aliases in DEFAULT_USERS:
-        role_id = roles[role_slug].id
-        candidates = [email, *aliases]
-
-        user = db.query(User).filter(User.email.in_(candidates)).first()
-        if not user:
-            user = db.query(User).filter(User.role_id == role_id).first()
+    resolved = [
+        _resolve_default_user(db, [email, *aliases], roles[role_slug].id)
+        for email, _name, role_slug, _password, aliases in DEFAULT_USERS
+    ]
+    if not legacy_sales_reps and get_meta_value(db, SEED_FINGERPRINT_KEY) == _seed_fingerprint(resolved):
+        logger.debug("Default users unchanged; skipping seeding.")
+        return
 
+    users: list[Optional[User]] = []
+    for (email, name, role_slug, password, _aliases), user in zip(DEFAULT_USERS, resolved):
+        role_id = roles[role_slug].id
         if not user:
             user = User(email=email, name=name, role_id=role_id, is_active=True, password_hash="")
             db.add(user)
@@ -121,7 +224,13 @@ def seed_default_users(db: Session, roles: dict[str, Role]) -> None:
         user.name = name
         user.role_id = role_id
         user.is_active = True
-        user.password_hash = hash_password(password)
+        # Hashing is the expensive part of startup; only do it when the stored hash is stale.
+        if not user.password_hash or not verify_password(password, user.password_hash):
+            user.password_hash = hash_password(password)
+        users.append(user)
+
+    db.flush()
+    set_meta_value(db, SEED_FINGERPRINT_KEY, _seed_fingerprint(users))
     db.commit()
 
 
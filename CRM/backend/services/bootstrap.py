@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from core.config import settings
+from core.db import Base
+from migrations import LATEST_VERSION
+from models.meta import SchemaMeta
+from services.auth import DEFAULT_USERS
+from services.meta import set_meta_value
+from services.seed_data import SEED_DATA_VERSION
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION_KEY = "schema_version"
+BOOTSTRAP_FINGERPRINT_KEY = "bootstrap_fingerprint"
+
+
+def schema_version(engine: Engine) -> str:
+    """Digest of the DDL the models compile to on ``engine``'s dialect."""
+    digest = hashlib.sha256()
+    for table in Base.metadata.sorted_tables:
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode())
+        for index in sorted(table.indexes, key=lambda idx: idx.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=engine.dialect)).encode())
+    return digest.hexdigest()
+
+
+def bootstrap_fingerprint() -> str:
+    """Digest of the seed and migration inputs besides the database contents."""
+    inputs = [
+        SEED_DATA_VERSION,
+        LATEST_VERSION,
+        DEFAULT_USERS,
+        bool(settings.seed_default_users),
+        (settings.app_env or "").lower(),
+    ]
+    return hashlib.sha256(json.dumps(inputs, default=str).encode()).hexdigest()
+
+
+def _stored_values(engine: Engine) -> dict[str, Optional[str]]:
+    keys = (SCHEMA_VERSION_KEY, BOOTSTRAP_FINGERPRINT_KEY)
+    # Core table, not ORM attributes: keeps mapper configuration off the boot path.
+    meta = SchemaMeta.__table__
+    try:
+        with engine.connect() as conn:
+            rows = conn.execute(select(meta.c.key, meta.c.value).where(meta.c.key.in_(keys)))
+            return dict(rows.all())
+    except (OperationalError, ProgrammingError):
+        # Fresh database: schema_meta does not exist yet.
+        return {}
+
+
+def bootstrap_is_current(engine: Engine) -> bool:
+    stored = _stored_values(engine)
+    return (
+        stored.get(SCHEMA_VERSION_KEY) == schema_version(engine)
+        and stored.get(BOOTSTRAP_FINGERPRINT_KEY) == bootstrap_fingerprint()
+    )
+
+
+def record_bootstrap(db: Session) -> None:
+    """Mark the schema and seed data as current. Commits."""
+    set_meta_value(db, SCHEMA_VERSION_KEY, schema_version(db.get_bind()))
+    set_meta_value(db, BOOTSTRAP_FINGERPRINT_KEY, bootstrap_fingerprint())
+    db.commit()
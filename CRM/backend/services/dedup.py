@@ -0,0 +1,237 @@
+"""
+Duplicate detection across doctors, pharmacies and HCPs.
+
+Comparing every pair of 200k records is out of reach, so records are first
+grouped into blocks that a duplicate is very likely to share with its
+original:
+
+- the phonetic skeleton of all name words (``phonetic_code``: folded by
+  ``normalize_text``, so Arabic letter variants and diacritics already agree;
+  vowels dropped and repeats collapsed, so "Mohammad Haddad" and "Muhammed
+  Hadad" agree too),
+- for names of three or more words, the skeleton with one of the given names
+  left out, and with the family name cut to its first letter (catches a typo
+  in, or an added or missing, given name, and a typo in the family name),
+- the phone number's last eight digits.
+
+Pairs within a block are scored by trigram similarity of the names (the same
+trigrams as ``services.fuzzy``; a name contained in the other, such as one
+without the father's name, counts nearly as much as an equal one), nudged by
+agreeing or conflicting phone and area, and pairs at or above the threshold are clustered with union-find. A
+block too large to compare all pairs (a very common name) is sorted by area,
+phone and name and each record is compared with its next ``WINDOW``
+neighbours only.
+
+Records are only compared within a kind: a doctor is never a duplicate of a
+pharmacy.
+"""
+
+from __future__ import annotations
+
+import re
+from collections import defaultdict
+from dataclasses import dataclass, field
+from functools import lru_cache
+from itertools import combinations
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from models.crm import Doctor, Pharmacy
+from models.hcp import HCP
+from services.fuzzy import token_trigrams
+from services.normalization import name_tokens, normalize_text
+
+DEFAULT_THRESHOLD = 0.85
+# Weight of one name's trigrams all appearing in the other (given the shorter has two words or more).
+CONTAINED = 0.9
+# Blocks up to this size compare all pairs; larger ones use a sorted window.
+MAX_BLOCK_SIZE = 200
+WINDOW = 25
+# Score adjustments on top of name similarity.
+PHONE_MATCH = 0.15
+PHONE_CONFLICT = -0.1
+AREA_MATCH = 0.05
+AREA_CONFLICT = -0.2
+PHONE_DIGITS = 8
+
+_NON_DIGIT = re.compile(r"\D+")
+# Latin: c/q sound like k, v like f, "ph" is f. Arabic letters are already folded.
+_LATIN_SOUNDS = str.maketrans({"c": "k", "q": "k", "v": "f"})
+_SILENT = frozenset("aeiouywاويىء")
+
+
+class DedupRecord(NamedTuple):
+    kind: str
+    id: int
+    name: str
+    area: Optional[str] = None
+    phone: Optional[str] = None
+
+
+@dataclass
+class DuplicateCluster:
+    kind: str
+    # Most complete record first, then the oldest (lowest id).
+    records: list[DedupRecord]
+    # Lowest score among the pairs that joined the cluster.
+    score: float
+
+    @property
+    def keep(self) -> DedupRecord:
+        return self.records[0]
+
+    @property
+    def merge(self) -> list[DedupRecord]:
+        return self.records[1:]
+
+
+@dataclass(slots=True)
+class _Prepared:
+    record: DedupRecord
+    trigrams: frozenset[str]
+    # len(trigrams), and how many words the name has.
+    size: int
+    words: int
+    area: str
+    phone: str
+    keys: list[tuple] = field(default_factory=list)
+
+
+@lru_cache(maxsize=65536)
+def phonetic_code(word: str) -> str:
+    """Consonant skeleton of one folded word: first letter, then no vowels and no repeats."""
+    if word.isascii():
+        word = word.replace("ph", "f").translate(_LATIN_SOUNDS)
+    code = [word[0]]
+    for char in word[1:]:
+        if char not in _SILENT and char != code[-1]:
+            code.append(char)
+    return "".join(code)
+
+
+def phone_key(phone: Optional[str]) -> str:
+    digits = _NON_DIGIT.sub("", phone or "")
+    return digits[-PHONE_DIGITS:] if len(digits) >= 7 else ""
+
+
+def _prepare(record: DedupRecord) -> Optional[_Prepared]:
+    tokens = name_tokens(record.name)
+    if not tokens:
+        return None
+    grams = token_trigrams(tokens)
+    prepared = _Prepared(record, grams, len(grams), len(tokens), normalize_text(record.area), phone_key(record.phone))
+    codes = [phonetic_code(token) for token in tokens]
+    prepared.keys.append((record.kind, "name", " ".join(sorted(codes))))
+    if len(codes) > 2:
+        given, family = codes[:-1], codes[-1]
+        prepared.keys += [
+            (record.kind, "name", " ".join(sorted(given[:skip] + given[skip + 1 :] + [family])))
+            for skip in range(len(given))
+        ]
+        prepared.keys.append((record.kind, "family", " ".join(given), family[0]))
+    if prepared.phone:
+        prepared.keys.append((record.kind, "phone", prepared.phone))
+    return prepared
+
+
+def score_pair(left: _Prepared, right: _Prepared) -> float:
+    # Runs for every candidate pair (millions at 200k records), hence no min/max calls.
+    shared = len(left.trigrams & right.trigrams)
+    score = 2 * shared / (left.size + right.size)
+    if left.words > 1 and right.words > 1:
+        contained = CONTAINED * shared / (left.size if left.size < right.size else right.size)
+        if contained > score:
+            score = contained
+    if left.phone and right.phone:
+        score += PHONE_MATCH if left.phone == right.phone else PHONE_CONFLICT
+    if left.area and right.area:
+        score += AREA_MATCH if left.area == right.area else AREA_CONFLICT
+    return score
+
+
+def _candidate_pairs(block: list[int], prepared: list[_Prepared]) -> Iterator[tuple[int, int]]:
+    if len(block) <= MAX_BLOCK_SIZE:
+        yield from combinations(block, 2)
+        return
+    block = sorted(block, key=lambda index: (prepared[index].area, prepared[index].phone, prepared[index].record.name))
+    for position, left in enumerate(block):
+        for right in block[position + 1 : position + 1 + WINDOW]:
+            yield left, right
+
+
+def _find(parent: list[int], index: int) -> int:
+    while parent[index] != index:
+        parent[index] = parent[parent[index]]
+        index = parent[index]
+    return index
+
+
+def _completeness(record: DedupRecord) -> int:
+    return sum(1 for value in (record.area, record.phone) if value)
+
+
+def find_duplicates(records: Iterable[DedupRecord], threshold: float = DEFAULT_THRESHOLD) -> list[DuplicateCluster]:
+    """Clusters of two or more records of one kind that look like the same account, largest first."""
+    prepared = [item for item in map(_prepare, records) if item is not None]
+    blocks: dict[tuple, list[int]] = defaultdict(list)
+    for index, item in enumerate(prepared):
+        for key in item.keys:
+            blocks[key].append(index)
+
+    parent = list(range(len(prepared)))
+    weakest: dict[int, float] = {}
+    seen: set[int] = set()
+    size = len(prepared)
+    for block in blocks.values():
+        if len(block) < 2:
+            continue
+        for left, right in _candidate_pairs(block, prepared):
+            pair = left * size + right if left < right else right * size + left
+            if pair in seen:
+                continue
+            seen.add(pair)
+            score = score_pair(prepared[left], prepared[right])
+            if score < threshold:
+                continue
+            root_left, root_right = _find(parent, left), _find(parent, right)
+            if root_left != root_right:
+                parent[root_right] = root_left
+                weakest[root_left] = min(score, weakest.get(root_left, score), weakest.pop(root_right, score))
+
+    # weakest holds exactly the roots of clusters with two or more records.
+    members: dict[int, list[DedupRecord]] = defaultdict(list)
+    for index in range(size):
+        root = _find(parent, index)
+        if root in weakest:
+            members[root].append(prepared[index].record)
+    clusters = [
+        DuplicateCluster(
+            kind=group[0].kind,
+            records=sorted(group, key=lambda record: (-_completeness(record), record.id)),
+            score=round(min(weakest[root], 1.0), 3),
+        )
+        for root, group in members.items()
+    ]
+    clusters.sort(key=lambda cluster: (-len(cluster.records), cluster.kind, cluster.keep.id))
+    return clusters
+
+
+def load_records(db: Session) -> list[DedupRecord]:
+    """Every doctor, pharmacy and active HCP, selecting only the compared columns."""
+    records = [
+        DedupRecord("doctor", *row)
+        for row in db.execute(select(Doctor.id, Doctor.name, Doctor.area, Doctor.phone))
+    ]
+    records += [
+        DedupRecord("pharmacy", *row)
+        for row in db.execute(select(Pharmacy.id, Pharmacy.name, Pharmacy.area, Pharmacy.phone))
+    ]
+    records += [
+        DedupRecord("hcp", hcp_id, f"{first_name} {last_name}", area, phone)
+        for hcp_id, first_name, last_name, area, phone in db.execute(
+            select(HCP.id, HCP.first_name, HCP.last_name, HCP.area, HCP.phone).where(HCP.is_active.is_(True))
+        )
+    ]
+    return records
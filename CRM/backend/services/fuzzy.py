@@ -0,0 +1,311 @@
+"""
+Typo-tolerant name matching over doctors and pharmacies.
+
+``account_names`` keeps every doctor and pharmacy name in memory as character
+trigrams (``name_tokens`` first, so "Dr." and "Pharmacy" do not count, and
+each word padded as in pg_trgm). A query ranks names by the share of its own
+trigrams they contain, so "hadad" or "lina hadsad" still find "Dr. Lina
+Haddad"; among equal shares, names with fewer trigrams of their own (closer in
+length to the query) come first.
+
+Each trigram maps to the index slots holding it: a set while it is rare, an
+``int`` bitmap once it is common. A query adds up its trigrams' bitmaps with
+bitwise carries, giving every slot's shared-trigram count as a handful of bit
+planes, so the cost of a lookup does not grow with how many names share the
+query's common trigrams.
+
+Lookups never touch the database. The index loads once per process on first
+use, routes that create, rename or delete accounts update it in place, and it
+reloads after ``FUZZY_INDEX_TTL_S`` so changes made by other workers show up.
+"""
+
+from __future__ import annotations
+
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from itertools import chain, islice
+from typing import Iterable, Iterator, NamedTuple, Optional
+
+from sqlalchemy import select
+
+from core.config import settings
+from models.crm import Doctor, Pharmacy
+from services.normalization import name_tokens
+
+DEFAULT_THRESHOLD = 0.5
+# Most matches a fuzzy listing considers; past a couple hundred the tail is noise.
+MAX_MATCHES = 200
+KINDS = {"doctor": Doctor, "pharmacy": Pharmacy}
+# A trigram's slots switch from a set to a bitmap once they are at least this
+# many and cover 1/DENSE_RATIO of all slots; below that the set is smaller.
+DENSE_MIN_SLOTS = 64
+DENSE_RATIO = 256
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+class FuzzyMatch(NamedTuple):
+    kind: str
+    id: int
+    name: str
+    score: float
+
+
+@lru_cache(maxsize=65536)
+def _word_trigrams(word: str) -> tuple[str, ...]:
+    padded = f"  {word} "
+    return tuple(padded[index : index + 3] for index in range(len(padded) - 2))
+
+
+def token_trigrams(tokens: Iterable[str]) -> frozenset[str]:
+    # Given names and family names repeat across thousands of accounts.
+    return frozenset(chain.from_iterable(map(_word_trigrams, tokens)))
+
+
+def trigrams(value: Optional[str]) -> frozenset[str]:
+    return token_trigrams(name_tokens(value))
+
+
+def _bitmap(slots: Iterable[int]) -> int:
+    slots = list(slots)
+    if not slots:
+        return 0
+    data = bytearray(max(slots) // 8 + 1)
+    for slot in slots:
+        data[slot >> 3] |= 1 << (slot & 7)
+    return int.from_bytes(data, "little")
+
+
+def _slots_in(bitmap: int) -> Iterator[int]:
+    data = bitmap.to_bytes((bitmap.bit_length() + 7) // 8, "little")
+    for match in _NONZERO_BYTE.finditer(data):
+        base, byte = match.start() * 8, data[match.start()]
+        while byte:
+            low = byte & -byte
+            yield base + low.bit_length() - 1
+            byte ^= low
+
+
+class TrigramIndex:
+    """Trigram index over ``(kind, id) -> name``; updates and lookups may run from any thread."""
+
+    def __init__(self) -> None:
+        self._entries: list[Optional[tuple[str, int, str]]] = []
+        self._slots: dict[tuple[str, int], int] = {}
+        self._free: list[int] = []
+        self._sparse: dict[str, set[int]] = {}
+        self._dense: dict[str, int] = {}
+        # Slot bitmaps by trigram count and by kind; removed slots are in neither.
+        self._by_size: dict[int, int] = {}
+        self._by_kind: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    @classmethod
+    def build(cls, rows: Iterable[tuple[str, int, Optional[str]]]) -> "TrigramIndex":
+        """Index ``(kind, id, name)`` rows in one pass; much faster than upserting them one by one."""
+        index = cls()
+        postings: dict[str, set[int]] = defaultdict(set)
+        by_size: dict[int, list[int]] = defaultdict(list)
+        by_kind: dict[str, list[int]] = defaultdict(list)
+        for kind, entry_id, name in rows:
+            grams = trigrams(name)
+            key = (kind, int(entry_id))
+            if not grams or key in index._slots:
+                continue
+            slot = len(index._entries)
+            index._entries.append((kind, key[1], name or ""))
+            index._slots[key] = slot
+            for gram in grams:
+                postings[gram].add(slot)
+            by_size[len(grams)].append(slot)
+            by_kind[kind].append(slot)
+        for gram, slots in postings.items():
+            if index._is_dense(len(slots)):
+                index._dense[gram] = _bitmap(slots)
+            else:
+                index._sparse[gram] = slots
+        index._by_size = {size: _bitmap(slots) for size, slots in by_size.items()}
+        index._by_kind = {kind: _bitmap(slots) for kind, slots in by_kind.items()}
+        return index
+
+    def _is_dense(self, count: int) -> bool:
+        return count >= DENSE_MIN_SLOTS and count * DENSE_RATIO >= len(self._entries)
+
+    def _add(self, gram: str, slot: int) -> None:
+        bitmap = self._dense.get(gram)
+        if bitmap is not None:
+            self._dense[gram] = bitmap | (1 << slot)
+            return
+        slots = self._sparse.setdefault(gram, set())
+        slots.add(slot)
+        if self._is_dense(len(slots)):
+            self._dense[gram] = _bitmap(self._sparse.pop(gram))
+
+    def _remove(self, gram: str, slot: int) -> None:
+        bitmap = self._dense.get(gram)
+        if bitmap is not None:
+            bitmap &= ~(1 << slot)
+            if bitmap:
+                self._dense[gram] = bitmap
+            else:
+                del self._dense[gram]
+            return
+        slots = self._sparse.get(gram)
+        if slots is not None:
+            slots.discard(slot)
+            if not slots:
+                del self._sparse[gram]
+
+    @staticmethod
+    def _mark(bitmaps: dict, key, slot: int, present: bool) -> None:  # noqa: ANN001
+        bitmap = bitmaps.get(key, 0)
+        bitmap = bitmap | (1 << slot) if present else bitmap & ~(1 << slot)
+        if bitmap:
+            bitmaps[key] = bitmap
+        else:
+            bitmaps.pop(key, None)
+
+    def _release(self, slot: int) -> None:
+        kind, _, name = self._entries[slot]
+        grams = trigrams(name)
+        for gram in grams:
+            self._remove(gram, slot)
+        self._mark(self._by_size, len(grams), slot, False)
+        self._mark(self._by_kind, kind, slot, False)
+        self._entries[slot] = None
+        self._free.append(slot)
+
+    def upsert(self, kind: str, entry_id: int, name: Optional[str]) -> None:
+        key = (kind, int(entry_id))
+        grams = trigrams(name)
+        with self._lock:
+            slot = self._slots.pop(key, None)
+            if slot is not None:
+                self._release(slot)
+            if not grams:
+                return
+            if self._free:
+                slot = self._free.pop()
+            else:
+                slot = len(self._entries)
+                self._entries.append(None)
+            self._entries[slot] = (kind, key[1], name or "")
+            self._slots[key] = slot
+            for gram in grams:
+                self._add(gram, slot)
+            self._mark(self._by_size, len(grams), slot, True)
+            self._mark(self._by_kind, kind, slot, True)
+
+    def discard(self, kind: str, entry_id: int) -> None:
+        with self._lock:
+            slot = self._slots.pop((kind, int(entry_id)), None)
+            if slot is not None:
+                self._release(slot)
+
+    def search(
+        self,
+        query: Optional[str],
+        *,
+        limit: int = 20,
+        threshold: float = DEFAULT_THRESHOLD,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> list[FuzzyMatch]:
+        """Up to ``limit`` names holding at least ``threshold`` of the query's trigrams, best first."""
+        wanted = trigrams(query)
+        if not wanted:
+            return []
+        needed = max(1, math.ceil(threshold * len(wanted)))
+        allowed_kinds = None if kinds is None else set(kinds)
+        with self._lock:
+            allowed = 0
+            for kind, bitmap in self._by_kind.items():
+                if allowed_kinds is None or kind in allowed_kinds:
+                    allowed |= bitmap
+            # planes[j] holds bit j of every slot's shared-trigram count.
+            planes: list[int] = []
+            for gram in wanted:
+                carry = self._dense.get(gram)
+                if carry is None:
+                    carry = _bitmap(self._sparse.get(gram, ()))
+                for position, plane in enumerate(planes):
+                    if not carry:
+                        break
+                    carry, planes[position] = plane & carry, plane ^ carry
+                if carry:
+                    planes.append(carry)
+
+            def ranked() -> Iterator[tuple[int, int]]:
+                sizes = sorted(self._by_size)
+                for shared in range(len(wanted), needed - 1, -1):
+                    if shared >> len(planes):
+                        continue
+                    exact = allowed
+                    for position, plane in enumerate(planes):
+                        exact &= plane if shared >> position & 1 else ~plane
+                    if not exact:
+                        continue
+                    for size in sizes:
+                        if size >= shared:
+                            for slot in _slots_in(exact & self._by_size[size]):
+                                yield shared, slot
+
+            matches = [(shared, self._entries[slot]) for shared, slot in islice(ranked(), limit)]
+        return [
+            FuzzyMatch(kind, entry_id, name, round(shared / len(wanted), 3))
+            for shared, (kind, entry_id, name) in matches
+        ]
+
+
+class AccountNameIndex:
+    """Process-wide :class:`TrigramIndex` of doctor and pharmacy names, loaded lazily."""
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self.ttl_seconds = ttl_seconds
+        self._index = TrigramIndex()
+        self._loaded_at: Optional[float] = None
+        self._load_lock = threading.Lock()
+
+    def _load(self) -> None:
+        from core import db as core_db
+
+        with core_db.SessionLocal() as session:
+            rows = [
+                (kind, entry_id, name)
+                for kind, model in KINDS.items()
+                for entry_id, name in session.execute(select(model.id, model.name))
+            ]
+        self._index = TrigramIndex.build(rows)
+        self._loaded_at = time.monotonic()
+
+    def _ensure_loaded(self) -> TrigramIndex:
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at >= self.ttl_seconds:
+            with self._load_lock:
+                if self._loaded_at is None or time.monotonic() - self._loaded_at >= self.ttl_seconds:
+                    self._load()
+        return self._index
+
+    def search(self, query: Optional[str], **kwargs) -> list[FuzzyMatch]:
+        return self._ensure_loaded().search(query, **kwargs)
+
+    def upsert(self, kind: str, entry_id: int, name: Optional[str]) -> None:
+        # Before the first load there is nothing to keep current; the load reads the row.
+        if self._loaded_at is not None:
+            self._index.upsert(kind, entry_id, name)
+
+    def discard(self, kind: str, entry_id: int) -> None:
+        if self._loaded_at is not None:
+            self._index.discard(kind, entry_id)
+
+    def invalidate(self) -> None:
+        self._loaded_at = None
+
+
+account_names = AccountNameIndex(settings.fuzzy_index_ttl_s)
@@ -0,0 +1,362 @@
+"""
+Bulk HCP import from CSV or XLSX, as exported from the field-force sheet
+(``hcps.xlsx``: Name, Area Tag, Speciality, Phone, Email, City, ...).
+
+Files are parsed a row at a time: CSV through :mod:`csv`, XLSX by streaming
+the first worksheet out of the zip with ``iterparse``, so memory does not grow
+with the file. Rows are matched to existing HCPs on a natural key, the folded
+full name plus the folded area, and written in batches: new rows through one
+executemany INSERT, changed rows through one executemany UPDATE, one
+transaction per batch. Rows whose key repeats in the file update the row the
+earlier occurrence created.
+
+Blank cells never erase stored values, matched rows that were deleted are
+reactivated, and rows tagged as pharmacies are skipped; they are not HCPs.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import logging
+import re
+import zipfile
+from dataclasses import dataclass, field
+from typing import IO, Iterable, Iterator, Optional
+from xml.etree import ElementTree
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from models.hcp import HCP
+from services.normalization import name_key, normalize_text
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+# Errors kept in the report; the counts stay exact past this.
+MAX_REPORTED_ERRORS = 500
+FIELDS = ("first_name", "last_name", "specialty", "phone", "email", "clinic_address", "area", "city")
+# Folded header -> field. "name" is split into first_name/last_name like POST /hcps does.
+HEADER_ALIASES = {
+    "name": "name",
+    "full name": "name",
+    "hcp name": "name",
+    "speciality": "specialty",
+    "specialty": "specialty",
+    "area tag": "area",
+    "area": "area",
+    "city": "city",
+    "phone": "phone",
+    "mobile": "phone",
+    "email": "email",
+    "formatted address": "clinic_address",
+    "clinic address": "clinic_address",
+    "address": "clinic_address",
+    "client tag": "client_tag",
+}
+PHARMACY_TAG = "pharmacy"
+_LENGTH_LIMITS = {column: HCP.__table__.c[column].type.length for column in FIELDS}
+
+_SHEET_NS = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL_NS = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL_NS = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_CELL_COLUMN = re.compile(r"[A-Z]+")
+
+
+class ImportFormatError(ValueError):
+    """The upload is not a readable CSV/XLSX file with a Name column."""
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    inserted: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    skipped: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "errors": self.errors,
+            "errorsTruncated": self.failed > len(self.errors),
+        }
+
+
+def split_name(name: str) -> tuple[str, str]:
+    """``first_name``/``last_name`` for a full name; single-word names get last name "-"."""
+    parts = name.strip().split()
+    return parts[0], " ".join(parts[1:]) if len(parts) > 1 else "-"
+
+
+def natural_key(first_name: str, last_name: str, area: Optional[str]) -> tuple[str, str]:
+    last = "" if last_name == "-" else last_name
+    return name_key(f"{first_name} {last}"), normalize_text(area)
+
+
+# -- readers ------------------------------------------------------------------
+
+
+def read_csv(stream: IO[bytes]) -> Iterator[list[Optional[str]]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    try:
+        sample = text.readline()
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+        yield from csv.reader(io.StringIO(sample), dialect)
+        yield from csv.reader(text, dialect)
+    except (UnicodeDecodeError, csv.Error) as exc:
+        raise ImportFormatError(f"Unreadable CSV: {exc}") from exc
+    finally:
+        # Leave the caller's stream open; it may already be closed if we were abandoned part way.
+        if not stream.closed:
+            text.detach()
+
+
+def _column_index(reference: str) -> int:
+    index = 0
+    for letter in _CELL_COLUMN.match(reference).group():
+        index = index * 26 + ord(letter) - 64
+    return index - 1
+
+
+def _first_sheet_path(archive: zipfile.ZipFile) -> str:
+    workbook = ElementTree.fromstring(archive.read("xl/workbook.xml"))
+    sheet = workbook.find(f"{_SHEET_NS}sheets/{_SHEET_NS}sheet")
+    relationships = ElementTree.fromstring(archive.read("xl/_rels/workbook.xml.rels"))
+    for relationship in relationships.iter(f"{_PACKAGE_REL_NS}Relationship"):
+        if sheet is not None and relationship.get("Id") == sheet.get(f"{_REL_NS}id"):
+            target = relationship.get("Target", "").lstrip("/")
+            return target if target.startswith("xl/") else f"xl/{target}"
+    return "xl/worksheets/sheet1.xml"
+
+
+def _shared_strings(archive: zipfile.ZipFile) -> list[str]:
+    if "xl/sharedStrings.xml" not in archive.namelist():
+        return []
+    strings = []
+    with archive.open("xl/sharedStrings.xml") as source:
+        for _, element in ElementTree.iterparse(source):
+            if element.tag == f"{_SHEET_NS}si":
+                strings.append("".join(text.text or "" for text in element.iter(f"{_SHEET_NS}t")))
+                element.clear()
+    return strings
+
+
+def read_xlsx(stream: IO[bytes]) -> Iterator[list[Optional[str]]]:
+    """Rows of the workbook's first sheet as lists of cell text (None for empty cells)."""
+    try:
+        archive = zipfile.ZipFile(stream)
+        strings = _shared_strings(archive)
+        source = archive.open(_first_sheet_path(archive))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as exc:
+        raise ImportFormatError(f"Unreadable XLSX: {exc}") from exc
+    with archive, source:
+        parent = None
+        try:
+            for event, element in ElementTree.iterparse(source, events=("start", "end")):
+                if event == "start":
+                    if element.tag == f"{_SHEET_NS}sheetData":
+                        parent = element
+                    continue
+                if element.tag != f"{_SHEET_NS}row":
+                    continue
+                values: list[Optional[str]] = []
+                for cell in element.iter(f"{_SHEET_NS}c"):
+                    kind = cell.get("t")
+                    if kind == "inlineStr":
+                        value = "".join(text.text or "" for text in cell.iter(f"{_SHEET_NS}t"))
+                    else:
+                        raw = cell.find(f"{_SHEET_NS}v")
+                        value = raw.text if raw is not None else None
+                        if value is not None and kind == "s":
+                            value = strings[int(value)]
+                        elif kind == "e":
+                            value = None
+                    column = _column_index(cell.get("r")) if cell.get("r") else len(values)
+                    values.extend([None] * (column + 1 - len(values)))
+                    values[column] = value
+                yield values
+                # Drop parsed rows so the tree stays small however long the sheet is.
+                if parent is not None:
+                    parent.remove(element)
+        except ElementTree.ParseError as exc:
+            raise ImportFormatError(f"Unreadable XLSX: {exc}") from exc
+
+
+def detect_format(content_type: Optional[str], head: bytes) -> str:
+    media = (content_type or "").split(";")[0].strip().lower()
+    if media.endswith("spreadsheetml.sheet") or head.startswith(b"PK\x03\x04"):
+        return "xlsx"
+    return "csv"
+
+
+# -- import -------------------------------------------------------------------
+
+
+def _clean(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    value = " ".join(str(value).split())
+    return value or None
+
+
+def _parse_row(header: list[Optional[str]], values: list[Optional[str]]) -> dict[str, Optional[str]]:
+    parsed: dict[str, Optional[str]] = {}
+    for name, value in zip(header, values):
+        if name and parsed.get(name) is None:
+            parsed[name] = _clean(value)
+    return parsed
+
+
+def _validate(row: dict[str, Optional[str]]) -> tuple[Optional[dict], Optional[str]]:
+    """(values, None) for a valid row, (None, error) otherwise."""
+    name = row.get("name")
+    if not name:
+        return None, "Name is required."
+    first_name, last_name = split_name(name)
+    values = {"first_name": first_name, "last_name": last_name}
+    for column in FIELDS[2:]:
+        values[column] = row.get(column)
+    for column, value in values.items():
+        limit = _LENGTH_LIMITS[column]
+        if value is not None and limit and len(value) > limit:
+            return None, f"{column} is longer than {limit} characters."
+    return values, None
+
+
+@dataclass
+class _Pending:
+    hcp_id: Optional[int]  # None: not in the table yet
+    row_numbers: list[int]
+    values: dict
+    # What the table holds now, for matched rows that are active.
+    stored: Optional[dict] = None
+
+
+def _merge(current: dict, incoming: dict) -> dict:
+    return {column: incoming[column] if incoming.get(column) is not None else current.get(column) for column in FIELDS}
+
+
+def _inserted_id(db: Session, values: dict) -> int:
+    statement = select(HCP.id).where(
+        *(getattr(HCP, column).is_not_distinct_from(values[column]) for column in FIELDS)
+    )
+    return db.scalar(statement.order_by(HCP.id.desc()).limit(1))
+
+
+def import_hcps(
+    db: Session,
+    rows: Iterable[list[Optional[str]]],
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> ImportReport:
+    """Upsert HCPs from ``rows`` (header first); commits every ``batch_size`` written rows."""
+    rows = iter(rows)
+    header = [HEADER_ALIASES.get(normalize_text(value)) for value in next(rows, [])]
+    if "name" not in header:
+        raise ImportFormatError("The first row must be a header with a Name column.")
+
+    # natural key -> (id, stored values, is_active) for every HCP, deleted ones
+    # included; id is None for rows this import inserted.
+    known: dict[tuple[str, str], tuple[int, dict, bool]] = {}
+    stored = db.execute(select(HCP.id, HCP.is_active, *(getattr(HCP, column) for column in FIELDS)).order_by(HCP.id))
+    for hcp_id, is_active, *columns in stored:
+        values = dict(zip(FIELDS, columns))
+        known.setdefault(natural_key(values["first_name"], values["last_name"], values["area"]), (hcp_id, values, is_active))
+
+    report = ImportReport()
+    # natural key -> row to write in the current batch.
+    batch: dict[tuple[str, str], _Pending] = {}
+
+    def flush() -> None:
+        if not batch:
+            return
+        inserts = [(key, pending) for key, pending in batch.items() if pending.hcp_id is None]
+        updates = []
+        for key, pending in batch.items():
+            if pending.hcp_id is None:
+                continue
+            if pending.values == pending.stored:
+                # Repeats in the file that net out to what is already stored.
+                report.unchanged += len(pending.row_numbers)
+            else:
+                updates.append((key, pending))
+        batch.clear()
+        try:
+            if inserts:
+                # No RETURNING: SQLite cannot match returned ids to rows of a
+                # multi-row INSERT, so SQLAlchemy would send one statement per row.
+                db.execute(insert(HCP), [pending.values for _, pending in inserts])
+            if updates:
+                db.execute(
+                    update(HCP),
+                    [{"id": pending.hcp_id, "is_active": True, **pending.values} for _, pending in updates],
+                )
+            db.commit()
+        except SQLAlchemyError as exc:
+            db.rollback()
+            logger.exception("HCP import batch failed")
+            for _, pending in inserts + updates:
+                for number in pending.row_numbers:
+                    report.error(number, f"Not saved: {exc.__class__.__name__}.")
+            return
+        for key, pending in inserts + updates:
+            known[key] = (pending.hcp_id, pending.values, True)
+        # Repeats of a key fold into one write; the first row of a new key inserts, the rest update.
+        report.inserted += len(inserts)
+        report.updated += sum(len(pending.row_numbers) for _, pending in inserts + updates) - len(inserts)
+
+    for number, values in enumerate(rows, start=2):
+        parsed = _parse_row(header, values)
+        if not any(parsed.values()):
+            continue
+        report.rows += 1
+        tags = ((parsed.get("client_tag") or "").lower(), (parsed.get("specialty") or "").lower())
+        if PHARMACY_TAG in tags:
+            report.skipped += 1
+            continue
+        incoming, error = _validate(parsed)
+        if error:
+            report.error(number, error)
+            continue
+        key = natural_key(incoming["first_name"], incoming["last_name"], incoming["area"])
+        pending = batch.get(key)
+        if pending is not None:
+            pending.row_numbers.append(number)
+            pending.values = _merge(pending.values, incoming)
+            continue
+        match = known.get(key)
+        if match is not None and match[0] is None:
+            # Inserted by an earlier batch of this import; the id is needed only now.
+            match = (_inserted_id(db, match[1]), *match[1:])
+            known[key] = match
+        if match is None:
+            batch[key] = _Pending(None, [number], _merge({}, incoming))
+        else:
+            hcp_id, current, is_active = match
+            merged = _merge(current, incoming)
+            if merged == current and is_active:
+                report.unchanged += 1
+                continue
+            batch[key] = _Pending(hcp_id, [number], merged, current if is_active else None)
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return report
@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from models.meta import SchemaMeta
+
+
+def get_meta_value(db: Session, key: str) -> Optional[str]:
+    row = db.get(SchemaMeta, key)
+    return row.value if row else None
+
+
+def set_meta_value(db: Session, key: str, value: str) -> None:
+    """Upsert a bookkeeping value. The caller owns the commit."""
+    row = db.get(SchemaMeta, key)
+    if row:
+        row.value = value
+    else:
+        db.add(SchemaMeta(key=key, value=value))
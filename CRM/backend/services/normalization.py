@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import Iterable, Optional
+
+# Letters that survive NFKD decomposition but should still compare equal.
+# Hamza/madda forms of alef, waw and yaa decompose into a base letter plus a
+# combining mark, so they are folded by the combining-mark strip below.
+_ARABIC_FOLD = str.maketrans(
+    {
+        "ٱ": "ا",  # alef wasla -> alef
+        "ى": "ي",  # alef maksura -> yaa
+        "ة": "ه",  # taa marbuta -> haa
+        "ـ": None,  # tatweel
+    }
+)
+_NON_WORD = re.compile(r"[^\w\s]+", re.UNICODE)
+_WHITESPACE = re.compile(r"\s+")
+
+NAME_STOPWORDS = frozenset(
+    {
+        "dr",
+        "doctor",
+        "pharmacy",
+        "pharmacies",
+        "pharma",
+        "the",
+        "al",
+        "el",
+        "د",  # "d" abbreviation of doctor
+        "دكتور",  # doctor
+        "الدكتور",  # the doctor
+        "صيدليه",  # pharmacy (folded)
+        "صيدليات",  # pharmacies
+    }
+)
+
+
+def normalize_text(value: Optional[str]) -> str:
+    """
+    Fold a name for matching: lower-case, strip Latin accents and Arabic
+    diacritics, unify alef/yaa/taa-marbuta variants and collapse punctuation.
+    """
+    if not value:
+        return ""
+    text = str(value)
+    # ASCII has nothing to decompose or fold, and most names are ASCII.
+    if not text.isascii():
+        text = unicodedata.normalize("NFKD", text)
+        text = "".join(ch for ch in text if not unicodedata.combining(ch))
+        text = text.translate(_ARABIC_FOLD)
+    text = text.lower()
+    text = _NON_WORD.sub(" ", text).replace("_", " ")
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def name_tokens(value: Optional[str], stopwords: Iterable[str] = NAME_STOPWORDS) -> list[str]:
+    """Normalized tokens with honorifics and business words removed."""
+    stop = stopwords if isinstance(stopwords, (set, frozenset)) else set(stopwords)
+    return [token for token in normalize_text(value).split() if token not in stop]
+
+
+def name_key(value: Optional[str]) -> str:
+    """Order-insensitive normalized name used for exact-match comparisons."""
+    return " ".join(sorted(name_tokens(value)))
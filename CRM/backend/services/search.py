@@ -0,0 +1,132 @@
+"""
+Full-text search over accounts and products (SQLite FTS5).
+
+Each searchable table has a ``<table>_fts`` FTS5 table holding the folded
+(``normalize_text``) copy of its text columns, keyed by rowid = id and kept in
+sync by insert/update/delete triggers. Folding runs in Python through the
+``crm_fold`` SQL function that ``core.db`` registers on every SQLite
+connection, so Arabic and English variants index and match alike. Queries are
+ranked prefix matches: every search word must prefix a word in one of the
+columns, and hits are ordered by bm25 with the name weighted highest.
+
+Other backends, and databases the migration has not reached yet, keep the
+``LIKE`` filters the routes already had.
+"""
+
+from __future__ import annotations
+
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import inspect, literal_column, select, table
+from sqlalchemy.engine import Connection
+from sqlalchemy.sql import Subquery
+
+from core import db as core_db
+from services.normalization import normalize_text
+
+logger = logging.getLogger(__name__)
+
+FOLD_FUNCTION = "crm_fold"
+# bm25 costs a few microseconds per hit; a query of only one- or two-letter
+# prefixes hits most rows, so those are ordered by the caller's fallback instead.
+MIN_RANKED_PREFIX = 3
+
+
+@dataclass(frozen=True)
+class SearchIndex:
+    table: str
+    columns: tuple[str, ...]
+    # bm25 weight per column, in ``columns`` order.
+    weights: tuple[float, ...]
+
+    @property
+    def name(self) -> str:
+        return f"{self.table}_fts"
+
+
+DOCTORS = SearchIndex("doctors", ("name", "specialty", "clinic", "area", "city"), (10.0, 3.0, 3.0, 1.0, 1.0))
+PHARMACIES = SearchIndex("pharmacies", ("name", "area", "city"), (10.0, 1.0, 1.0))
+HCPS = SearchIndex("hcps", ("first_name", "last_name", "specialty", "area", "city"), (10.0, 10.0, 3.0, 1.0, 1.0))
+PRODUCTS = SearchIndex("products", ("name", "code", "line"), (10.0, 5.0, 1.0))
+INDEXES = (DOCTORS, PHARMACIES, HCPS, PRODUCTS)
+
+_available: dict[tuple[str, str], bool] = {}
+
+
+def index_ddl(index: SearchIndex) -> list[str]:
+    """The FTS table and the triggers that keep it in step with ``index.table``."""
+    columns = ", ".join(index.columns)
+    folded = ", ".join(f"{FOLD_FUNCTION}(new.{column})" for column in index.columns)
+    insert = f"INSERT INTO {index.name}(rowid, {columns}) VALUES (new.id, {folded});"
+    delete = f"DELETE FROM {index.name} WHERE rowid = old.id;"
+    return [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {index.name} USING fts5("
+        f"{columns}, tokenize='unicode61 remove_diacritics 2', prefix='2 3')",
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_ai AFTER INSERT ON {index.table} BEGIN {insert} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_ad AFTER DELETE ON {index.table} BEGIN {delete} END",
+        f"CREATE TRIGGER IF NOT EXISTS {index.name}_au AFTER UPDATE OF id, {columns} ON {index.table} "
+        f"BEGIN {delete} {insert} END",
+    ]
+
+
+def install_index(conn: Connection, index: SearchIndex) -> int:
+    """Create (if needed) and rebuild one index from its table; returns rows indexed."""
+    # Connections from engines built outside core.db (scripts, tests) lack crm_fold.
+    core_db.register_sqlite_functions(conn.connection.driver_connection)
+    for statement in index_ddl(index):
+        conn.exec_driver_sql(statement)
+    weights = ", ".join(str(weight) for weight in index.weights)
+    conn.exec_driver_sql(f"INSERT INTO {index.name}({index.name}, rank) VALUES ('rank', 'bm25({weights})')")
+    conn.exec_driver_sql(f"DELETE FROM {index.name}")
+    columns = ", ".join(index.columns)
+    folded = ", ".join(f"{FOLD_FUNCTION}({column})" for column in index.columns)
+    result = conn.exec_driver_sql(
+        f"INSERT INTO {index.name}(rowid, {columns}) SELECT id, {folded} FROM {index.table}"
+    )
+    _available.clear()
+    return result.rowcount
+
+
+def index_available(index: SearchIndex) -> bool:
+    """True when the primary database is SQLite and ``index`` exists there (checked once per process)."""
+    engine = core_db.engine
+    if engine.dialect.name != "sqlite":
+        return False
+    key = (str(engine.url), index.name)
+    available = _available.get(key)
+    if available is None:
+        with engine.connect() as conn:
+            available = _available[key] = inspect(conn).has_table(index.name)
+        if not available:
+            logger.warning("Search index %s is missing; %s searches fall back to LIKE.", index.name, index.table)
+    return available
+
+
+def match_expression(term: Optional[str]) -> Optional[str]:
+    """FTS5 query requiring every folded word of ``term`` as a prefix, or None if nothing is left."""
+    # normalize_text leaves only word characters and spaces, so nothing needs quoting inside "...".
+    words = normalize_text(term).split()
+    if not words:
+        return None
+    return " ".join(f'"{word}"*' for word in words)
+
+
+def ranked_matches(index: SearchIndex, term: Optional[str]) -> Optional[Subquery]:
+    """
+    ``(id, rank)`` rows of ``index.table`` matching ``term``, best first by
+    ascending ``rank``. None when FTS cannot serve the search and the caller
+    should filter with LIKE instead.
+    """
+    expression = match_expression(term)
+    if expression is None or not index_available(index):
+        return None
+    words = normalize_text(term).split()
+    rank = literal_column("rank") if max(map(len, words)) >= MIN_RANKED_PREFIX else literal_column("0")
+    return (
+        select(literal_column("rowid").label("id"), rank.label("rank"))
+        .select_from(table(index.name))
+        .where(literal_column(index.name).op("MATCH")(expression))
+        .subquery(f"{index.table}_search")
+    )
@@ -24,6 +24,10 @@ from models.crm import (
 )
 from services.auth import seed_admin_and_rep
 
+# Bump whenever seed_reference_data changes what it inserts, so existing
+# databases take the full bootstrap path once on their next start.
+SEED_DATA_VERSION = 1
+
 
 def seed_reference_data(db: Session) -> None:
     seed_admin_and_rep(db)
@@ -0,0 +1,583 @@
+"""
+Deterministic synthetic CRM data for scale testing.
+
+``generate(engine, scale, seed=...)`` bulk-inserts reps (with territories,
+rep profiles, routes and stock cars), doctors, pharmacies, products, visits,
+orders with lines, stock movements and collections through Core
+``INSERT ... VALUES`` batches, and can write matching legacy ledger files.
+The same seed, scale and anchor date always produce the same rows: ids are
+assigned explicitly after the existing maximum, and every table draws from
+its own seeded RNG, so growing one table does not reshuffle the others.
+Password hashes are salted and therefore the one thing that differs between
+runs.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import sqlite3
+from contextlib import closing
+from dataclasses import dataclass
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import Decimal
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Optional
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.engine import Connection, Engine
+
+from models.crm import (
+    Collection,
+    Doctor,
+    Order,
+    OrderLine,
+    Pharmacy,
+    Product,
+    RepProfile,
+    Role,
+    Route,
+    RouteAccount,
+    StockLocation,
+    StockMovement,
+    Territory,
+    User,
+    Visit,
+)
+from services.auth import hash_password
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ANCHOR = date(2024, 12, 31)
+SYNTHETIC_PASSWORD = "Synthetic123!"
+SYNTHETIC_EMAIL_DOMAIN = "synthetic.example.com"
+ROUTE_ACCOUNTS_PER_REP = 25
+
+CITIES = {
+    "Amman": ((31.95, 35.91), ["Abdali", "Shmeisani", "Jabal Amman", "Sweifieh", "Khalda", "Tla' Al Ali", "Marka"]),
+    "Irbid": ((32.55, 35.85), ["University St", "Al Hashmi", "Downtown"]),
+    "Zarqa": ((32.07, 36.09), ["New Zarqa", "Russeifa", "Hashemite"]),
+    "Aqaba": ((29.53, 35.01), ["Downtown", "Al Shallaleh"]),
+    "Salt": ((32.04, 35.73), ["Al Balqa", "Downtown"]),
+}
+SPECIALTIES = ["GP", "Cardiology", "Pediatrics", "Dermatology", "Endocrinology", "Neurology", "Orthopedics", "ENT"]
+PRODUCT_LINES = ["Cardio", "Diabetes", "Derma", "Pediatric", "Neuro", "OTC"]
+PACKS = ["10 tablets", "20 tablets", "30 tablets", "60 capsules", "100 ml syrup", "30 g cream"]
+FIRST_NAMES = [
+    "Ahmad", "Lina", "Omar", "Rania", "Khaled", "Sara", "Yousef", "Dana", "Hani", "Maha",
+    "Tareq", "Noor", "Fadi", "Reem", "Samer", "Hala", "Zaid", "Leen", "Majed", "Aseel",
+]
+LAST_NAMES = [
+    "Haddad", "Khoury", "Nasser", "Saleh", "Awad", "Hamdan", "Qasem", "Masri", "Zoubi", "Abbadi",
+    "Tamimi", "Rawashdeh", "Shami", "Jaber", "Hijazi", "Obeidat", "Khalil", "Barakat", "Darwish", "Odeh",
+]
+PHARMACY_WORDS = ["Care", "Life", "Health", "Family", "Al Shifa", "Green Cross", "Central", "City", "Al Amal", "Noor"]
+VISIT_STATUSES = (("completed", 70), ("scheduled", 15), ("cancelled", 10), ("in_progress", 5))
+ORDER_STATUSES = (("delivered", 60), ("submitted", 25), ("draft", 15))
+
+
+@dataclass(frozen=True)
+class SyntheticScale:
+    reps: int
+    doctors: int
+    pharmacies: int
+    products: int
+    visits: int
+    orders: int
+    stock_movements: int
+    collections: int
+    ledger_documents: int
+
+    @classmethod
+    def for_visits(cls, visits: int) -> "SyntheticScale":
+        """Field-force proportions (about 2,000 visits per rep a year) around ``visits`` rows."""
+        return cls(
+            reps=max(visits // 2000, 5),
+            doctors=max(visits // 20, 50),
+            pharmacies=max(visits // 40, 25),
+            products=min(max(visits // 1000, 20), 2000),
+            visits=visits,
+            orders=visits // 5,
+            stock_movements=visits // 5,
+            collections=visits // 10,
+            ledger_documents=visits // 5,
+        )
+
+
+SCALES = {
+    "10k": SyntheticScale.for_visits(10_000),
+    "100k": SyntheticScale.for_visits(100_000),
+    "1m": SyntheticScale.for_visits(1_000_000),
+}
+
+Progress = Callable[[str, int, int], None]
+
+
+def _rng(seed: int, table: str) -> random.Random:
+    return random.Random(f"{seed}:{table}")
+
+
+def _weighted(rng: random.Random, choices: tuple[tuple[str, int], ...]) -> str:
+    return rng.choices([value for value, _ in choices], weights=[weight for _, weight in choices])[0]
+
+
+def _next_id(conn: Connection, table) -> int:  # noqa: ANN001
+    return (conn.scalar(select(func.max(table.c.id))) or 0) + 1
+
+
+def _person(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _place(rng: random.Random) -> tuple[str, str, float, float]:
+    city = rng.choice(list(CITIES))
+    (lat, lng), areas = CITIES[city]
+    return city, rng.choice(areas), lat + rng.uniform(-0.05, 0.05), lng + rng.uniform(-0.05, 0.05)
+
+
+def _money(value: float) -> Decimal:
+    return Decimal(str(value)).quantize(Decimal("0.01"))
+
+
+class _Writer:
+    """Batched Core inserts, one transaction per table."""
+
+    def __init__(self, engine: Engine, batch_size: int, progress: Optional[Progress]) -> None:
+        self.engine = engine
+        self.batch_size = max(batch_size, 1)
+        self.progress = progress
+        self.counts: dict[str, int] = {}
+
+    def write(self, table, rows: Iterable[dict], expected: int) -> None:  # noqa: ANN001
+        self.write_with_children(table, None, ((row, ()) for row in rows), expected)
+
+    def write_with_children(self, table, child_table, rows: Iterable[tuple[dict, Iterable[dict]]], expected: int) -> None:  # noqa: ANN001
+        """Parents and their child rows (order lines) in the same batches, parents first."""
+        written = children = 0
+        batch: list[dict] = []
+        child_batch: list[dict] = []
+        with self.engine.begin() as conn:
+
+            def flush() -> None:
+                conn.execute(insert(table), batch)
+                if child_batch:
+                    conn.execute(insert(child_table), child_batch)
+
+            for row, child_rows in rows:
+                batch.append(row)
+                child_batch.extend(child_rows)
+                if len(batch) >= self.batch_size:
+                    flush()
+                    written += len(batch)
+                    children += len(child_batch)
+                    batch, child_batch = [], []
+                    if self.progress:
+                        self.progress(table.name, written, expected)
+            if batch:
+                flush()
+                written += len(batch)
+                children += len(child_batch)
+        if self.progress:
+            self.progress(table.name, written, expected)
+        self.counts[table.name] = self.counts.get(table.name, 0) + written
+        if child_table is not None:
+            self.counts[child_table.name] = self.counts.get(child_table.name, 0) + children
+
+
+def generate(
+    engine: Engine,
+    scale: SyntheticScale,
+    *,
+    seed: int = 0,
+    anchor: date = DEFAULT_ANCHOR,
+    batch_size: int = 5000,
+    ledger_dir: Optional[Path] = None,
+    progress: Optional[Progress] = None,
+) -> dict[str, int]:
+    """
+    Insert a synthetic dataset covering the year before ``anchor``.
+
+    Requires the schema and reference roles (``init_database``). When
+    ``ledger_dir`` is given, ``ledger_<year>_{acc,other,stc}.sqlite`` files
+    for ``anchor.year`` are written there as well. Returns rows per table.
+    """
+    writer = _Writer(engine, batch_size, progress)
+    stamp = datetime.combine(anchor, time(6, 0), tzinfo=timezone.utc)
+
+    with engine.connect() as conn:
+        role_id = conn.scalar(select(Role.__table__.c.id).where(Role.__table__.c.slug == "medical_rep"))
+        if role_id is None:
+            raise ValueError("Role 'medical_rep' is missing; initialise the database first.")
+        first = {
+            name: _next_id(conn, model.__table__)
+            for name, model in (
+                ("territory", Territory),
+                ("user", User),
+                ("rep_profile", RepProfile),
+                ("doctor", Doctor),
+                ("pharmacy", Pharmacy),
+                ("product", Product),
+                ("route", Route),
+                ("route_account", RouteAccount),
+                ("stock_location", StockLocation),
+                ("stock_movement", StockMovement),
+                ("visit", Visit),
+                ("order", Order),
+                ("order_line", OrderLine),
+                ("collection", Collection),
+            )
+        }
+
+    territory_count = max(scale.reps // 5, 1)
+    territory_ids = list(range(first["territory"], first["territory"] + territory_count))
+    rep_ids = list(range(first["user"], first["user"] + scale.reps))
+    doctor_ids = list(range(first["doctor"], first["doctor"] + scale.doctors))
+    pharmacy_ids = list(range(first["pharmacy"], first["pharmacy"] + scale.pharmacies))
+    product_ids = list(range(first["product"], first["product"] + scale.products))
+
+    def stamped(row: dict) -> dict:
+        row.setdefault("created_at", stamp)
+        row.setdefault("updated_at", stamp)
+        return row
+
+    rng = _rng(seed, "territories")
+    writer.write(
+        Territory.__table__,
+        (
+            stamped({"id": tid, "name": f"{rng.choice(list(CITIES))} {index + 1:03d}", "code": f"SYN-T{tid:05d}"})
+            for index, tid in enumerate(territory_ids)
+        ),
+        territory_count,
+    )
+
+    rng = _rng(seed, "users")
+    password_hash = hash_password(SYNTHETIC_PASSWORD)
+    writer.write(
+        User.__table__,
+        (
+            stamped(
+                {
+                    "id": rid,
+                    "name": _person(rng),
+                    "email": f"rep{index + 1:05d}@{SYNTHETIC_EMAIL_DOMAIN}",
+                    "password_hash": password_hash,
+                    "is_active": True,
+                    "role_id": role_id,
+                }
+            )
+            for index, rid in enumerate(rep_ids)
+        ),
+        scale.reps,
+    )
+    writer.write(
+        RepProfile.__table__,
+        (
+            stamped(
+                {
+                    "id": first["rep_profile"] + index,
+                    "user_id": rid,
+                    "rep_type": "medical_rep",
+                    "territory_id": territory_ids[index % territory_count],
+                }
+            )
+            for index, rid in enumerate(rep_ids)
+        ),
+        scale.reps,
+    )
+
+    rng = _rng(seed, "doctors")
+
+    def doctor_rows() -> Iterator[dict]:
+        for did in doctor_ids:
+            city, area, _, _ = _place(rng)
+            name = _person(rng)
+            yield stamped(
+                {
+                    "id": did,
+                    "name": f"Dr. {name}",
+                    "specialty": rng.choice(SPECIALTIES),
+                    "clinic": f"{name.split()[1]} Clinic {did}",
+                    "area": area,
+                    "city": city,
+                    "classification": rng.choice("AABBBCCCC"),
+                    "phone": f"07{rng.randint(70000000, 99999999)}",
+                    "mobile": None,
+                    "email": None,
+                    "notes": None,
+                }
+            )
+
+    writer.write(Doctor.__table__, doctor_rows(), scale.doctors)
+
+    rng = _rng(seed, "pharmacies")
+    pharmacy_names: list[tuple[str, str, str]] = []
+
+    def pharmacy_rows() -> Iterator[dict]:
+        for pid in pharmacy_ids:
+            city, area, _, _ = _place(rng)
+            name = f"{rng.choice(PHARMACY_WORDS)} Pharmacy {area} {pid}"
+            pharmacy_names.append((name, city, area))
+            yield stamped(
+                {
+                    "id": pid,
+                    "name": name,
+                    "area": area,
+                    "city": city,
+                    "segment": rng.choice(["Retail", "Retail", "Chain", "Hospital"]),
+                    "credit_limit": _money(rng.choice([2000, 5000, 10000, 25000])),
+                    "payment_terms": rng.choice(["Cash", "30 days", "60 days"]),
+                    "phone": f"06{rng.randint(4000000, 5999999)}",
+                    "email": None,
+                }
+            )
+
+    writer.write(Pharmacy.__table__, pharmacy_rows(), scale.pharmacies)
+
+    rng = _rng(seed, "products")
+    prices: dict[int, Decimal] = {}
+
+    def product_rows() -> Iterator[dict]:
+        for index, product_id in enumerate(product_ids):
+            cost = _money(rng.uniform(1.5, 40))
+            price = _money(float(cost) * rng.uniform(1.2, 1.8))
+            prices[product_id] = price
+            line = rng.choice(PRODUCT_LINES)
+            yield stamped(
+                {
+                    "id": product_id,
+                    "code": f"SYN-{product_id:06d}",
+                    "name": f"{line} {rng.choice(['Forte', 'Plus', 'XR', 'Junior', 'Max'])} {index + 1}",
+                    "line": line,
+                    "pack": rng.choice(PACKS),
+                    "cost": cost,
+                    "selling_price": price,
+                    "bonus_rules": rng.choice([None, None, "Buy 10 get 1"]),
+                }
+            )
+
+    writer.write(Product.__table__, product_rows(), scale.products)
+
+    # Each rep covers a fixed book of accounts; visits, orders and collections draw from it.
+    rng = _rng(seed, "routes")
+    accounts = [("doctor", did) for did in doctor_ids] + [("pharmacy", pid) for pid in pharmacy_ids]
+    books: dict[int, list[tuple[str, int]]] = {
+        rid: rng.sample(accounts, min(ROUTE_ACCOUNTS_PER_REP, len(accounts))) for rid in rep_ids
+    }
+    writer.write(
+        Route.__table__,
+        (
+            stamped({"id": first["route"] + index, "name": f"Route {index + 1:04d}", "rep_id": rid, "frequency": "weekly", "notes": None})
+            for index, rid in enumerate(rep_ids)
+        ),
+        scale.reps,
+    )
+
+    def route_account_rows() -> Iterator[dict]:
+        next_id = first["route_account"]
+        for index, rid in enumerate(rep_ids):
+            for kind, account_id in books[rid]:
+                yield {
+                    "id": next_id,
+                    "route_id": first["route"] + index,
+                    "account_type": kind,
+                    "doctor_id": account_id if kind == "doctor" else None,
+                    "pharmacy_id": account_id if kind == "pharmacy" else None,
+                    "visit_frequency": rng.choice(["weekly", "biweekly", "monthly"]),
+                }
+                next_id += 1
+
+    writer.write(RouteAccount.__table__, route_account_rows(), scale.reps * ROUTE_ACCOUNTS_PER_REP)
+
+    rng = _rng(seed, "visits")
+
+    def visit_rows() -> Iterator[dict]:
+        for offset in range(scale.visits):
+            rep_id = rng.choice(rep_ids)
+            kind, account_id = rng.choice(books[rep_id])
+            visit_date = anchor - timedelta(days=rng.randint(0, 364))
+            status = _weighted(rng, VISIT_STATUSES)
+            _, _, lat, lng = _place(rng)
+            started = ended = None
+            duration = None
+            if status in ("completed", "in_progress"):
+                started = datetime.combine(visit_date, time(8), tzinfo=timezone.utc) + timedelta(minutes=rng.randint(0, 540))
+            if status == "completed":
+                duration = rng.randint(300, 2700)
+                ended = started + timedelta(seconds=duration)
+            yield {
+                "id": first["visit"] + offset,
+                "visit_date": visit_date,
+                "rep_id": rep_id,
+                "doctor_id": account_id if kind == "doctor" else None,
+                "pharmacy_id": account_id if kind == "pharmacy" else None,
+                "notes": rng.choice([None, None, None, "Discussed new pack", "Requested samples", "Follow up next week"]),
+                "samples_given": None,
+                "next_action": None,
+                "next_action_date": None,
+                "status": status,
+                "started_at": started,
+                "ended_at": ended,
+                "start_lat": lat if started else None,
+                "start_lng": lng if started else None,
+                "start_accuracy": rng.uniform(5, 40) if started else None,
+                "end_lat": lat if ended else None,
+                "end_lng": lng if ended else None,
+                "end_accuracy": rng.uniform(5, 40) if ended else None,
+                "duration_seconds": duration,
+                "is_deleted": False,
+                "created_at": started or stamp,
+                "updated_at": ended or started or stamp,
+            }
+
+    writer.write(Visit.__table__, visit_rows(), scale.visits)
+
+    rng = _rng(seed, "orders")
+
+    def order_rows() -> Iterator[tuple[dict, list[dict]]]:
+        line_id = first["order_line"]
+        for offset in range(scale.orders):
+            order_id = first["order"] + offset
+            kind, account_id = rng.choice(books[rng.choice(rep_ids)])
+            total = Decimal("0")
+            order_lines: list[dict] = []
+            for product_id in rng.sample(product_ids, min(rng.randint(1, 5), len(product_ids))):
+                quantity = rng.randint(1, 50)
+                discount = rng.choice([0, 0, 5, 10])
+                price = prices[product_id]
+                total += _money(float(price) * quantity * (100 - discount) / 100)
+                order_lines.append(
+                    {
+                        "id": line_id,
+                        "order_id": order_id,
+                        "product_id": product_id,
+                        "quantity": quantity,
+                        "price": price,
+                        "discount": float(discount),
+                        "bonus": quantity // 10 or None,
+                    }
+                )
+                line_id += 1
+            status = _weighted(rng, ORDER_STATUSES)
+            yield stamped(
+                {
+                    "id": order_id,
+                    "order_date": anchor - timedelta(days=rng.randint(0, 364)),
+                    "status": status,
+                    "payment_status": "paid" if status == "delivered" and rng.random() < 0.7 else "pending",
+                    "total_amount": total,
+                    "aljazeera_ref": None,
+                    "doctor_id": account_id if kind == "doctor" else None,
+                    "pharmacy_id": account_id if kind == "pharmacy" else None,
+                }
+            ), order_lines
+
+    writer.write_with_children(Order.__table__, OrderLine.__table__, order_rows(), scale.orders)
+
+    rng = _rng(seed, "stock")
+    warehouse_id = first["stock_location"]
+    writer.write(
+        StockLocation.__table__,
+        [stamped({"id": warehouse_id, "name": "Synthetic Main Warehouse", "location_type": "warehouse", "rep_id": None})]
+        + [
+            stamped({"id": warehouse_id + 1 + index, "name": f"Car {index + 1:04d}", "location_type": "rep_car", "rep_id": rid})
+            for index, rid in enumerate(rep_ids)
+        ],
+        scale.reps + 1,
+    )
+
+    def movement_rows() -> Iterator[dict]:
+        for offset in range(scale.stock_movements):
+            car_id = warehouse_id + 1 + rng.randrange(scale.reps)
+            reason = rng.choice(["sale", "sale", "samples", "return", "damage", "expiry"])
+            outbound = reason in ("sale", "samples")
+            yield {
+                "id": first["stock_movement"] + offset,
+                "movement_date": datetime.combine(anchor - timedelta(days=rng.randint(0, 364)), time(9), tzinfo=timezone.utc),
+                "location_from_id": warehouse_id if outbound else car_id,
+                "location_to_id": car_id if outbound else warehouse_id,
+                "product_id": rng.choice(product_ids),
+                "quantity": rng.randint(1, 100),
+                "reason": reason,
+                "notes": None,
+            }
+
+    writer.write(StockMovement.__table__, movement_rows(), scale.stock_movements)
+
+    rng = _rng(seed, "collections")
+
+    def collection_rows() -> Iterator[dict]:
+        for offset in range(scale.collections):
+            kind, account_id = rng.choice(books[rng.choice(rep_ids)])
+            method = rng.choice(["cash", "cash", "cheque", "transfer"])
+            yield stamped(
+                {
+                    "id": first["collection"] + offset,
+                    "collection_date": anchor - timedelta(days=rng.randint(0, 364)),
+                    "amount": _money(rng.uniform(20, 3000)),
+                    "method": method,
+                    "reference": f"R{first['collection'] + offset:08d}" if method != "cash" else None,
+                    "doctor_id": account_id if kind == "doctor" else None,
+                    "pharmacy_id": account_id if kind == "pharmacy" else None,
+                    "notes": None,
+                }
+            )
+
+    writer.write(Collection.__table__, collection_rows(), scale.collections)
+
+    if ledger_dir is not None:
+        writer.counts.update(write_ledger_files(Path(ledger_dir), pharmacy_names, scale.ledger_documents, seed=seed, year=anchor.year))
+    return writer.counts
+
+
+def legacy_account_id(index: int) -> str:
+    return f"P{index + 1:06d}"
+
+
+def write_ledger_files(
+    directory: Path,
+    pharmacies: list[tuple[str, str, str]],
+    documents: int,
+    *,
+    seed: int = 0,
+    year: int = DEFAULT_ANCHOR.year,
+) -> dict[str, int]:
+    """
+    Legacy ledger SQLite files in the layout ``dpm_ledger`` reflects:
+    customer accounts plus invoices in ``acc``, returns and cash receipts in
+    ``other``, cheques in ``stc``. Names follow the CRM pharmacies so link
+    rebuilding has something to match. Existing files are replaced.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    rng = _rng(seed, "ledger")
+    accounts = [legacy_account_id(index) for index in range(len(pharmacies))]
+    documents_by_table: dict[str, list[tuple]] = {"invoices": [], "returns": [], "receipts": [], "cheques": []}
+    weights = (("invoices", 55), ("returns", 5), ("receipts", 30), ("cheques", 10))
+    for number in range(1, documents + 1):
+        table = _weighted(rng, weights)
+        day = date(year, 1, 1) + timedelta(days=rng.randint(0, 364))
+        amount = round(rng.uniform(10, 5000), 2)
+        documents_by_table[table].append((f"{table[0].upper()}{number:08d}", day.isoformat(), rng.choice(accounts), amount))
+
+    layout = {
+        "acc": ("invoices",),
+        "other": ("returns", "receipts"),
+        "stc": ("cheques",),
+    }
+    counts: dict[str, int] = {}
+    for kind, tables in layout.items():
+        path = directory / f"ledger_{year}_{kind}.sqlite"
+        path.unlink(missing_ok=True)
+        with closing(sqlite3.connect(path)) as conn, conn:
+            if kind == "acc":
+                conn.execute("CREATE TABLE customers (customer_id TEXT PRIMARY KEY, name TEXT, city TEXT, area TEXT)")
+                conn.executemany(
+                    "INSERT INTO customers VALUES (?, ?, ?, ?)",
+                    [(accounts[index], name, city, area) for index, (name, city, area) in enumerate(pharmacies)],
+                )
+                counts["ledger_customers"] = len(pharmacies)
+            for table in tables:
+                conn.execute(f"CREATE TABLE {table} (number TEXT, date TEXT, customer_id TEXT, net REAL)")
+                conn.execute(f"CREATE INDEX ix_{table}_customer ON {table} (customer_id, date)")
+                conn.executemany(f"INSERT INTO {table} VALUES (?, ?, ?, ?)", documents_by_table[table])
+                counts[f"ledger_{table}"] = len(documents_by_table[table])
+    return counts
@@ -2,8 +2,9 @@ from __future__ import annotations
 
 import os
 from pathlib import Path
+import re
 import tempfile
-from typing import Generator
+from typing import Callable, Generator
 
 import pytest
 from fastapi.testclient import TestClient
@@ -14,7 +15,7 @@ tmp_dir = Path(tempfile.gettempdir())
 test_db_path = tmp_dir / "crm_backend_pytest.db"
 os.environ["DATABASE_URL"] = f"sqlite:///{test_db_path.as_posix()}"
 test_db_path.parent.mkdir(parents=True, exist_ok=True)
-for suffix in ("", "-journal"):
+for suffix in ("", "-journal", "-wal", "-shm"):
     candidate = Path(f"{test_db_path}{suffix}")
     if candidate.exists():
         try:
@@ -71,3 +72,27 @@ def manager_headers(client: TestClient) -> dict[str, str]:
 @pytest.fixture
 def rep_headers(client: TestClient) -> dict[str, str]:
     return _login_headers(client, email="rep@example.com", password="Rep12345!")
+
+
+_SERVER_TIMING_QUERIES = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def query_count(response) -> int:  # noqa: ANN001
+    """Statements the request issued, read from its Server-Timing header."""
+    match = _SERVER_TIMING_QUERIES.search(response.headers.get("server-timing", ""))
+    return int(match.group(1)) if match else 0
+
+
+@pytest.fixture
+def query_budget() -> Callable:
+    """``query_budget(response, n)`` fails the test when the request issued more than n statements."""
+
+    def check(response, max_queries: int) -> int:  # noqa: ANN001
+        count = query_count(response)
+        request = response.request
+        assert count <= max_queries, (
+            f"{request.method} {request.url.path} issued {count} queries (budget {max_queries})"
+        )
+        return count
+
+    return check
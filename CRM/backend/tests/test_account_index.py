@@ -0,0 +1,77 @@
+from __future__ import annotations
+
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from core import db as core_db
+from services.accounts import ACCOUNT_INDEX, install_account_index
+
+
+def _customers(client: TestClient, headers: dict[str, str], **params) -> list[dict] | dict:
+    resp = client.get("/api/v1/pwa/customers", params=params, headers=headers)
+    assert resp.status_code == 200, resp.text
+    return resp.json()
+
+
+def _visit(client: TestClient, headers: dict[str, str], doctor_id: int, visited_at: str, status: str, **extra) -> dict:
+    payload = {"customerId": str(doctor_id), "customerType": "doctor", "visitedAt": visited_at, "status": status, **extra}
+    resp = client.post("/api/v1/pwa/visits", json=payload, headers=headers)
+    assert resp.status_code == 201, resp.text
+    return resp.json()
+
+
+def test_customers_carry_last_visit(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    doctor = client.post("/api/v1/doctors/", json={"name": f"Dr. Lina Index{tag}"}, headers=auth_headers).json()
+    pharmacy = client.post("/api/v1/pharmacies/", json={"name": f"Index{tag} Pharmacy"}, headers=auth_headers).json()
+
+    [listed] = _customers(client, auth_headers, search=f"lina index{tag}")
+    assert (listed["lastVisit"], listed["location"]) == (None, None)
+
+    _visit(client, auth_headers, doctor["id"], "2026-03-02T09:00:00", "success", coordinates={"lat": 31.95, "lng": 35.91})
+    _visit(client, auth_headers, doctor["id"], "2026-03-05T09:00:00", "success")
+    # Scheduled visits are not visits that happened.
+    _visit(client, auth_headers, doctor["id"], "2026-04-01T09:00:00", "reminder")
+    [listed] = _customers(client, auth_headers, search=f"lina index{tag}")
+    assert listed["lastVisit"] == "2026-03-05"
+    assert listed["location"] == {"lat": 31.95, "lng": 35.91}
+
+    latest = _visit(client, auth_headers, doctor["id"], "2026-03-09T09:00:00", "success")
+    assert client.delete(f"/api/v1/visits/{latest['id']}", headers=auth_headers).status_code == 204
+    renamed = client.put(f"/api/v1/doctors/{doctor['id']}", json={"name": f"Dr. Lina Haddad Index{tag}"}, headers=auth_headers)
+    assert renamed.status_code == 200, renamed.text
+
+    by_visit = _customers(client, auth_headers, search=f"index{tag}", sortBy="lastVisit")
+    assert [(row["type"], row["name"], row["lastVisit"]) for row in by_visit] == [
+        ("doctor", f"Dr. Lina Haddad Index{tag}", "2026-03-05"),
+        ("pharmacy", pharmacy["name"], None),
+    ]
+
+    # The trigger-maintained rows match a rebuild from scratch.
+    with core_db.engine.connect() as conn:
+        before = conn.execute(select(ACCOUNT_INDEX).order_by(ACCOUNT_INDEX.c.kind, ACCOUNT_INDEX.c.id)).all()
+    with core_db.engine.begin() as conn:
+        assert install_account_index(conn) == len(before)
+        assert conn.execute(select(ACCOUNT_INDEX).order_by(ACCOUNT_INDEX.c.kind, ACCOUNT_INDEX.c.id)).all() == before
+
+
+def test_customers_paginate(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    names = [f"Dr. Amal Page{tag}", f"Dr. Basma Page{tag}", f"Page{tag} Care Pharmacy"]
+    area = f"Area{tag}"
+    for name in names[:2]:
+        assert client.post("/api/v1/doctors/", json={"name": name, "area": area}, headers=auth_headers).status_code == 201
+    assert client.post("/api/v1/pharmacies/", json={"name": names[2], "area": area}, headers=auth_headers).status_code == 201
+
+    # One listing ordered by name across both kinds.
+    assert [row["name"] for row in _customers(client, auth_headers, area=area)] == names
+    first = _customers(client, auth_headers, area=area, pageSize=2)
+    assert [row["name"] for row in first["data"]] == names[:2]
+    assert (first["meta"]["total"], first["meta"]["hasMore"]) == (3, True)
+    last = _customers(client, auth_headers, area=area, pageSize=2, page=2)
+    assert [row["name"] for row in last["data"]] == names[2:]
+    assert (last["meta"]["total"], last["meta"]["hasMore"]) == (3, False)
+    pharmacies = _customers(client, auth_headers, area=area, pageSize=2, type="pharmacy")
+    assert [row["name"] for row in pharmacies["data"]] == names[2:]
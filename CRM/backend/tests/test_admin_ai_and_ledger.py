@@ -26,3 +26,68 @@ def test_ledger_pharmacy_summary_graceful(client, legacy_id):
         headers=_auth_headers(client),
     )
     assert response.status_code in {200, 204, 404}
+
+
+def test_ledger_audit_entries_are_batched(client):
+    from core.db import SessionLocal
+    from dpm_ledger.audit import audit_queue
+    from models.ai import LedgerAuditLog
+
+    audit_queue.flush()
+    with SessionLocal() as session:
+        before = session.query(LedgerAuditLog).count()
+
+    headers = _auth_headers(client)
+    for _ in range(3):
+        response = client.get("/api/admin/dpm-ledger/pharmacies/audit-check/summary", headers=headers)
+        assert response.status_code in {200, 204, 404}
+
+    audit_queue.flush()
+    with SessionLocal() as session:
+        rows = (
+            session.query(LedgerAuditLog)
+            .filter(LedgerAuditLog.target_id == "audit-check")
+            .count()
+        )
+        after = session.query(LedgerAuditLog).count()
+    assert rows == 3
+    assert after == before + 3
+
+
+def test_ledger_audit_failed_batches_are_retried_then_counted():
+    from core.db import SessionLocal
+    from dpm_ledger.audit import LedgerAuditQueue
+
+    failures = {"left": 2}
+
+    def flaky_session():
+        if failures["left"]:
+            failures["left"] -= 1
+            raise RuntimeError("database unavailable")
+        return SessionLocal()
+
+    audit = LedgerAuditQueue(
+        max_size=10, batch_size=5, flush_interval=1, max_attempts=3, session_factory=flaky_session
+    )
+    for index in range(3):
+        audit.enqueue(user_id=None, action="other", target_type="pharmacy", target_id=f"retry-{index}")
+
+    assert audit.flush() == 0
+    assert audit.flush() == 0
+    assert audit.pending() == 3
+    assert audit.flush() == 3
+    assert (audit.written, audit.dropped, audit.pending()) == (3, 0, 0)
+
+    def broken_session():
+        raise RuntimeError("database unavailable")
+
+    doomed = LedgerAuditQueue(
+        max_size=10, batch_size=2, flush_interval=1, max_attempts=2, session_factory=broken_session
+    )
+    for index in range(3):
+        doomed.enqueue(user_id=None, action="other", target_type="pharmacy", target_id=f"doomed-{index}")
+    doomed.flush()
+    doomed.flush()
+    assert doomed.dropped == 2
+    doomed.stop()
+    assert (doomed.written, doomed.dropped, doomed.pending()) == (0, 3, 0)
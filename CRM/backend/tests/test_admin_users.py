@@ -56,3 +56,31 @@ def test_admin_users_role_change_clears_rep_profile(client: TestClient, auth_hea
     assert updated.status_code == 200, updated.text
     assert updated.json()["role"]["slug"] == "admin"
     assert updated.json()["salesRep"] is None
+
+
+def test_deactivated_user_loses_access_despite_auth_cache(
+    client: TestClient, auth_headers: dict[str, str]
+) -> None:
+    from core.security import user_cache
+
+    payload = {
+        "name": "Cached Rep",
+        "email": "cached.rep@example.com",
+        "password": "Rep12345!",
+        "userType": "medical_rep",
+    }
+    created = client.post("/api/v1/admin/users", json=payload, headers=auth_headers)
+    assert created.status_code == 201, created.text
+    user_id = created.json()["id"]
+
+    login = client.post("/api/v1/auth/login", json={"email": payload["email"], "password": payload["password"]})
+    rep_headers = {"Authorization": f"Bearer {login.json()['token']}"}
+    assert client.get("/api/v1/auth/me", headers=rep_headers).status_code == 200
+
+    hits_before = user_cache.hits
+    assert client.get("/api/v1/auth/me", headers=rep_headers).status_code == 200
+    assert user_cache.hits > hits_before
+
+    updated = client.patch(f"/api/v1/admin/users/{user_id}", json={"isActive": False}, headers=auth_headers)
+    assert updated.status_code == 200, updated.text
+    assert client.get("/api/v1/auth/me", headers=rep_headers).status_code == 401
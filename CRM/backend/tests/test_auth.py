@@ -17,3 +17,31 @@ def test_login_and_me(client):
     me = me_resp.json()
     assert me["email"] == "admin@example.com"
     assert me["role"]["slug"] == "admin"
+
+
+def test_seed_default_users_skips_rehash_when_unchanged(client, monkeypatch):
+    import services.auth as auth_service
+    from core.db import SessionLocal
+
+    with SessionLocal() as db:
+        auth_service.seed_admin_and_rep(db)
+
+    def fail(*_args, **_kwargs):
+        raise AssertionError("password hashing should be skipped")
+
+    monkeypatch.setattr(auth_service, "hash_password", fail)
+    monkeypatch.setattr(auth_service, "verify_password", fail)
+    with SessionLocal() as db:
+        auth_service.seed_admin_and_rep(db)
+
+
+def test_login_rejected_when_password_pool_saturated(client, monkeypatch):
+    from services.auth import password_pool
+
+    monkeypatch.setattr(password_pool, "pending", 10_000)
+    resp = client.post(
+        "/api/v1/auth/login",
+        json={"email": "admin@example.com", "password": "Admin12345!"},
+    )
+    assert resp.status_code == 503
+    assert resp.headers.get("retry-after") == "1"
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import main
+from core import db as core_db
+from core.db import SessionLocal
+from core.instrumentation import capture_queries
+from services import bootstrap
+from services.bootstrap import BOOTSTRAP_FINGERPRINT_KEY, SCHEMA_VERSION_KEY, bootstrap_is_current
+from services.meta import get_meta_value
+
+
+def test_second_start_skips_ddl_and_seeding():
+    assert bootstrap_is_current(core_db.engine)
+    with capture_queries() as stats:
+        main.init_database()
+    assert stats.count == 1
+    assert "schema_meta" in stats.slowest_sql
+
+
+def test_changed_seed_inputs_take_the_full_path(monkeypatch):
+    monkeypatch.setattr(bootstrap, "SEED_DATA_VERSION", bootstrap.SEED_DATA_VERSION + 1)
+    assert not bootstrap_is_current(core_db.engine)
+    with capture_queries() as stats:
+        main.init_database()
+    assert stats.count > 1
+    assert bootstrap_is_current(core_db.engine)
+    with SessionLocal() as session:
+        assert get_meta_value(session, BOOTSTRAP_FINGERPRINT_KEY) == bootstrap.bootstrap_fingerprint()
+        assert get_meta_value(session, SCHEMA_VERSION_KEY) == bootstrap.schema_version(core_db.engine)
+
+    monkeypatch.undo()
+    main.init_database(force=True)
+    assert bootstrap_is_current(core_db.engine)
+
+
+def test_forced_init_runs_the_full_path():
+    with capture_queries() as stats:
+        main.init_database(force=True)
+    assert stats.count > 1
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import os
+from pathlib import Path
+import tempfile
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import DBAPIError, OperationalError
+from sqlalchemy.schema import CreateTable
+
+from core import db as core_db
+
+TEST_POSTGRES_URL = os.getenv("TEST_POSTGRES_URL")
+requires_postgres = pytest.mark.skipif(not TEST_POSTGRES_URL, reason="TEST_POSTGRES_URL is not set")
+
+
+@pytest.fixture
+def replica_engine():
+    """Empty SQLite file standing in for a read replica."""
+    path = Path(tempfile.gettempdir()) / "crm_backend_pytest_replica.db"
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        Path(f"{path}{suffix}").unlink(missing_ok=True)
+    url = f"sqlite:///{path.as_posix()}"
+    setup = core_db._create_engine(url, allow_fallback=False)
+    core_db.Base.metadata.create_all(bind=setup)
+    setup.dispose()
+
+    replica = core_db._create_engine(url, allow_fallback=False, read_only=True)
+    core_db.swap_read_engine(replica)
+    try:
+        yield replica
+    finally:
+        core_db.swap_read_engine(core_db.engine)
+        replica.dispose()
+
+
+def test_report_endpoints_read_from_replica(client, auth_headers, replica_engine):
+    primary_visits = client.get("/api/v1/visits/", headers=auth_headers).json()
+    assert primary_visits["pagination"]["total"] >= 1
+
+    overview = client.get("/api/v1/reports/overview", headers=auth_headers)
+    assert overview.status_code == 200, overview.text
+    assert overview.json()["data"]["totalVisits"] == 0
+
+    summary = client.get("/api/v1/visits/summary", headers=auth_headers)
+    assert summary.status_code == 200, summary.text
+    assert summary.json()["data"]["totalVisits"] == 0
+
+    created = client.post(
+        "/api/v1/doctors",
+        json={"name": "Dr. Replica Check", "specialty": "GP"},
+        headers=auth_headers,
+    )
+    assert created.status_code == 201, created.text
+
+
+def test_replica_connections_reject_writes(replica_engine):
+    with pytest.raises(OperationalError):
+        with replica_engine.begin() as conn:
+            conn.execute(text("INSERT INTO roles (slug, name) VALUES ('x', 'X')"))
+
+
+def test_schema_compiles_for_postgres():
+    import models  # noqa: F401
+
+    dialect = postgresql.dialect()
+    for table in core_db.Base.metadata.sorted_tables:
+        CreateTable(table).compile(dialect=dialect)
+    ddl = str(CreateTable(core_db.Base.metadata.tables["visits"]).compile(dialect=dialect))
+    assert "is_deleted BOOLEAN DEFAULT false NOT NULL" in ddl
+
+
+def test_postgres_pool_settings():
+    kwargs = core_db._pool_kwargs(make_url("postgresql+psycopg://crm:secret@db:5432/crm"))
+    assert kwargs["pool_pre_ping"] is True
+    assert kwargs["pool_recycle"] > 0
+    assert "pool_pre_ping" not in core_db._pool_kwargs(make_url("sqlite:///./crm.db"))
+    assert core_db.normalize_database_url("postgres://u:p@h/db") == "postgresql+psycopg://u:p@h/db"
+
+
+@pytest.fixture
+def postgres_replica():
+    """Read-only engine on an empty Postgres schema, routed in as the replica."""
+    url = core_db.normalize_database_url(TEST_POSTGRES_URL)
+    setup = core_db._create_engine(url, allow_fallback=False)
+    core_db.Base.metadata.drop_all(bind=setup)
+    core_db.Base.metadata.create_all(bind=setup)
+
+    replica = core_db._create_engine(url, allow_fallback=False, read_only=True)
+    core_db.swap_read_engine(replica)
+    try:
+        yield replica
+    finally:
+        core_db.swap_read_engine(core_db.engine)
+        replica.dispose()
+        core_db.Base.metadata.drop_all(bind=setup)
+        setup.dispose()
+
+
+@requires_postgres
+def test_postgres_replica_rejects_writes(postgres_replica):
+    with pytest.raises(DBAPIError, match="read-only transaction"):
+        with postgres_replica.begin() as conn:
+            conn.execute(text("INSERT INTO roles (slug, name) VALUES ('x', 'X')"))
+
+    with postgres_replica.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM roles")).scalar() == 0
+
+
+@requires_postgres
+def test_report_endpoints_read_from_postgres_replica(client, auth_headers, postgres_replica):
+    assert core_db.async_read_engine is not None
+    assert core_db.async_read_engine.url.get_backend_name() == "postgresql"
+
+    for path in ("/api/v1/reports/overview", "/api/v1/visits/summary"):
+        response = client.get(path, headers=auth_headers)
+        assert response.status_code == 200, response.text
+        assert response.json()["data"]["totalVisits"] == 0
+
+    for path in ("/api/v1/reports/rep-performance", "/api/v1/reports/product-performance", "/api/v1/reports/territory-performance"):
+        response = client.get(path, headers=auth_headers)
+        assert response.status_code == 200, response.text
+
+
+def test_sqlite_async_routes_use_threaded_sessions_by_default(monkeypatch):
+    memory = core_db._build_engine("sqlite://", {"check_same_thread": False})
+    try:
+        monkeypatch.setattr(core_db.settings, "async_sqlite_enabled", True)
+        assert core_db._create_async_engine(memory) is None
+    finally:
+        memory.dispose()
+
+    monkeypatch.setattr(core_db.settings, "async_sqlite_enabled", False)
+    assert core_db._create_async_engine(core_db.engine) is None
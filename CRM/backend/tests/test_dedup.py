@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import asyncio
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from ai_agents import DataQualityAgent
+from core.db import SessionLocal
+from models.ai import AIInsight
+from services.dedup import DedupRecord, find_duplicates, phonetic_code
+from services.normalization import normalize_text
+
+
+def _code(name: str) -> str:
+    return " ".join(phonetic_code(word) for word in normalize_text(name).split())
+
+
+def test_phonetic_code_folds_spelling_variants() -> None:
+    assert _code("Mohammad Haddad") == _code("Muhammed Hadad") == _code("Mohamad Haddaad")
+    assert _code("Qasem") == _code("Kassem")
+    assert _code("أحمد") == _code("احمد") == _code("اَحْمَد")
+    assert _code("فاطمة") == _code("فاطمه")
+    assert _code("Zaid") != _code("Said")
+
+
+def test_find_duplicates_clusters_within_kind() -> None:
+    records = [
+        DedupRecord("doctor", 1, "Dr. Rami Khalil Haddad", "Abdoun", "0790001111"),
+        DedupRecord("doctor", 2, "Rami Hadad", "Abdoun"),
+        DedupRecord("doctor", 3, "Haddad Rami", "abdoun", "+962 79 000 1111"),
+        # Same name elsewhere with another phone: a different doctor.
+        DedupRecord("doctor", 4, "Rami Haddad", "Aqaba", "0780009999"),
+        DedupRecord("pharmacy", 5, "صيدلية النور", "الرابية"),
+        DedupRecord("pharmacy", 6, "صيدليه النوُر", "الرابيه"),
+        DedupRecord("hcp", 7, "Rami Haddad", "Abdoun"),
+        DedupRecord("pharmacy", 8, "Care Pharmacy", "Sweifieh"),
+        DedupRecord("pharmacy", 9, "Care Pharmacy", "Jubeiha"),
+    ]
+    clusters = find_duplicates(records)
+    assert [(cluster.kind, [record.id for record in cluster.records]) for cluster in clusters] == [
+        ("doctor", [1, 3, 2]),
+        ("pharmacy", [5, 6]),
+    ]
+    assert clusters[0].keep.id == 1
+    assert 0.85 <= clusters[0].score <= 1.0
+
+
+def test_agent_writes_one_suggestion_batch(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    names = [f"Dr. Nadia Saleh {tag}", f"Nadia Salih {tag}"]
+    doctors = [
+        client.post("/api/v1/doctors/", json={"name": name, "area": "Tla Al Ali"}, headers=auth_headers).json()
+        for name in names
+    ]
+    for name in names:
+        assert client.post("/api/v1/hcps", json={"name": name, "area": "Tla Al Ali"}, headers=auth_headers).status_code == 201
+
+    with SessionLocal() as db:
+        started = db.scalar(select(AIInsight.id).order_by(AIInsight.id.desc()).limit(1)) or 0
+        asyncio.run(DataQualityAgent(db).run())
+        written = db.scalars(select(AIInsight).where(AIInsight.id > started).order_by(AIInsight.id)).all()
+
+    summary, suggestions = written[0], written[1:]
+    assert summary.title == "Duplicate scan finished"
+    assert {insight.meta["batch"] for insight in written} == {summary.meta["batch"]}
+    doctor_ids = sorted(doctor["id"] for doctor in doctors)
+    [mine] = [s for s in suggestions if s.entity_type == "doctor" and s.meta["keep"] in doctor_ids]
+    assert [mine.meta["keep"], *mine.meta["merge"]] == doctor_ids
+    assert any(s.entity_type == "hcp" and tag in s.body for s in suggestions)
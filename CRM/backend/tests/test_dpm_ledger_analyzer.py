@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import sqlite3
+from pathlib import Path
+
+from dpm_ledger import analyzer, services
+
+
+def _make_ledger(path: Path, rows: int, *, analyze: bool) -> None:
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE invoices (id INTEGER PRIMARY KEY, CustomerID TEXT, Net REAL, Doc_Date TEXT)")
+    conn.execute("CREATE INDEX ix_invoices_customer ON invoices (CustomerID)")
+    conn.executemany(
+        "INSERT INTO invoices (CustomerID, Net, Doc_Date) VALUES (?, ?, ?)",
+        [(str(i % 7), float(i), "2024-01-01") for i in range(rows)],
+    )
+    if analyze:
+        conn.execute("ANALYZE")
+    conn.commit()
+    conn.close()
+
+
+def test_analyzer_uses_stat1_and_caches_by_mtime(tmp_path, monkeypatch):
+    stat_file = tmp_path / "ledger_2024_acc.sqlite"
+    plain_file = tmp_path / "ledger_2024_stc.sqlite"
+    _make_ledger(stat_file, 50, analyze=True)
+    _make_ledger(plain_file, 30, analyze=False)
+
+    results = analyzer.analyze_files([stat_file, plain_file], max_workers=2)
+    stat_table = results[str(stat_file)]["tables"][0]
+    plain_table = results[str(plain_file)]["tables"][0]
+    assert (stat_table["row_count"], stat_table["row_count_source"]) == (50, "sqlite_stat1")
+    assert (plain_table["row_count"], plain_table["row_count_source"]) == (30, "max_rowid")
+
+    def _fail(*_args, **_kwargs):
+        raise AssertionError("cached analysis should be reused")
+
+    monkeypatch.setattr(analyzer, "analyze_sqlite", _fail)
+    assert analyzer.analyze_files([stat_file, plain_file]) == results
+    assert analyzer.get_cached_analysis(plain_file) == results[str(plain_file)]
+
+
+def test_analyze_copy_leaves_source_untouched(tmp_path):
+    ledger = tmp_path / "ledger_2024_other.sqlite"
+    _make_ledger(ledger, 20, analyze=False)
+    before = ledger.stat().st_mtime_ns
+
+    analysis = analyzer.analyze_sqlite(ledger, analyze_copy=True)
+    assert analysis["tables"][0]["row_count"] == 20
+    assert analysis["tables"][0]["row_count_source"] == "analyze_copy"
+    assert ledger.stat().st_mtime_ns == before
+
+
+def test_analysis_primes_column_cache(tmp_path):
+    ledger = tmp_path / "ledger_2024_acc.sqlite"
+    _make_ledger(ledger, 5, analyze=False)
+    analysis = analyzer.analyze_sqlite(ledger)
+
+    services.prime_column_cache(str(ledger), analysis)
+    key = (str(ledger), "invoices", tuple(services.ACCOUNT_CANDIDATES))
+    assert services._COLUMN_CACHE[key] == "CustomerID"
+    date_key = (str(ledger), "invoices", tuple(services.DATE_CANDIDATES))
+    assert services._COLUMN_CACHE[date_key] == "Doc_Date"
+
+
+def test_stale_column_cache_entries_fall_back_to_reflection(tmp_path):
+    from sqlalchemy import create_engine
+
+    from dpm_ledger.models_raw import reflect_engine
+
+    ledger = tmp_path / "ledger_2024_stc.sqlite"
+    _make_ledger(ledger, 3, analyze=False)
+    engine = create_engine(f"sqlite:///{ledger}")
+    try:
+        _metadata, tables = reflect_engine(engine)
+        invoices = tables["invoices"]
+        key = (str(ledger), "invoices", tuple(services.ACCOUNT_CANDIDATES))
+
+        services._COLUMN_CACHE[key] = "AccountNo"
+        assert services._choose_column(invoices, services.ACCOUNT_CANDIDATES).name == "CustomerID"
+        assert services._COLUMN_CACHE[key] == "CustomerID"
+
+        services._COLUMN_CACHE[key] = None
+        assert services._choose_column(invoices, services.ACCOUNT_CANDIDATES).name == "CustomerID"
+    finally:
+        engine.dispose()
+
+
+def test_column_cache_is_dropped_when_ledger_file_changes(tmp_path):
+    ledger = tmp_path / "ledger_2024_other.sqlite"
+    _make_ledger(ledger, 3, analyze=False)
+    analyzer.analyze_files([ledger])
+    services._prime_from_analysis(ledger)
+    key = (str(ledger), "invoices", tuple(services.ACCOUNT_CANDIDATES))
+    assert services._COLUMN_CACHE[key] == "CustomerID"
+
+    services._COLUMN_CACHE[(str(ledger), "legacy_table", ("x",))] = "x"
+    conn = sqlite3.connect(ledger)
+    conn.execute("INSERT INTO invoices (CustomerID, Net, Doc_Date) VALUES ('9', 1.0, '2024-02-01')")
+    conn.commit()
+    conn.close()
+
+    services._prime_from_analysis(ledger)
+    assert (str(ledger), "legacy_table", ("x",)) not in services._COLUMN_CACHE
+    assert services._PRIMED_SIGNATURES[str(ledger)] == analyzer.file_signature(ledger)
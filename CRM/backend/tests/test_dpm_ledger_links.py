@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+from core.db import SessionLocal
+from dpm_ledger import mapping, services
+from dpm_ledger.mapping import LedgerCustomer
+from models.crm import Pharmacy
+from models.ledger import LedgerPharmacyLink
+
+
+def test_match_customers_uses_normalized_blocks():
+    pharmacies = [
+        (1, "صيدلية الأمل", "عمان", "الشميساني"),
+        (2, "Hope Pharmacy", "Amman", "Abdali"),
+        (3, "Hope Pharmacy", "Irbid", "Center"),
+    ]
+    customers = [
+        LedgerCustomer("A-1", "صيدليه الامل", "عمان", "الشميساني"),
+        LedgerCustomer("A-2", "HOPE pharmacy.", "amman", "abdali"),
+        LedgerCustomer("A-3", "Hope Pharmacy", "Zarqa", "Center"),
+    ]
+
+    matches = {match.legacy_id: match for match in mapping.match_customers(customers, pharmacies)}
+
+    assert matches["A-1"].pharmacy_id == 1 and matches["A-1"].method == "exact"
+    assert matches["A-2"].pharmacy_id == 2
+    assert "A-3" not in matches
+
+
+def test_match_customers_without_location_uses_name_blocks():
+    assert mapping._blocking_keys("Hope Pharmacy", None, "") == [("token", "hope")]
+
+    pharmacies = [(1, "Hope Pharmacy", "Amman", "Abdali"), (2, "Nour Pharmacy", None, None)]
+    customers = [
+        LedgerCustomer("B-1", "Hope Pharmacy"),
+        LedgerCustomer("B-2", "Nour Pharmacy", "Irbid", "Center"),
+        LedgerCustomer("B-3", "Salam Pharmacy"),
+    ]
+
+    matches = {match.legacy_id: match.pharmacy_id for match in mapping.match_customers(customers, pharmacies)}
+    assert matches == {"B-1": 1, "B-2": 2}
+
+
+def test_rebuild_links_exposes_both_directions(client, auth_headers):
+    suffix = uuid4().hex[:8]
+    with SessionLocal() as session:
+        pharmacy = Pharmacy(name=f"Link Test {suffix}", city="Amman", area="Sweifieh")
+        session.add(pharmacy)
+        session.commit()
+        pharmacy_id = pharmacy.id
+
+        stats = mapping.rebuild_links(
+            session,
+            customers=[LedgerCustomer(f"L-{suffix}", f"link test {suffix}", "AMMAN", "sweifieh")],
+        )
+    assert stats["linked"] >= 1
+
+    assert services.resolve_crm_pharmacy_id(f"L-{suffix}") == pharmacy_id
+    assert services.resolve_legacy_id(pharmacy_id) == f"L-{suffix}"
+
+    resp = client.get(
+        f"/api/admin/dpm-ledger/crm-pharmacies/{pharmacy_id}/summary",
+        headers=auth_headers,
+    )
+    assert resp.status_code == 200, resp.text
+    body = resp.json()
+    assert body["pharmacy_legacy_id"] == f"L-{suffix}"
+    assert body["crm_pharmacy_id"] == pharmacy_id
+
+
+def test_rebuild_links_refuses_to_run_without_customers(client, auth_headers, monkeypatch):
+    suffix = uuid4().hex[:8]
+    with SessionLocal() as session:
+        pharmacy = Pharmacy(name=f"Keep Link {suffix}", city="Amman", area="Abdoun")
+        session.add(pharmacy)
+        session.commit()
+        pharmacy_id = pharmacy.id
+        mapping.rebuild_links(session, customers=[LedgerCustomer(f"K-{suffix}", f"keep link {suffix}", "Amman")])
+        before = session.query(LedgerPharmacyLink).count()
+
+    monkeypatch.setattr(mapping, "load_ledger_customers", lambda year=None: [])
+    resp = client.post("/api/admin/dpm-ledger/pharmacy-links/rebuild", headers=auth_headers)
+    assert resp.status_code == 400
+    assert "No ledger customers" in resp.json()["detail"]
+
+    with SessionLocal() as session:
+        assert session.query(LedgerPharmacyLink).count() == before
+        assert services.resolve_legacy_id(pharmacy_id) == f"K-{suffix}"
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import uuid
+
+from fastapi.testclient import TestClient
+
+from services.fuzzy import TrigramIndex, trigrams
+from tests.conftest import query_count
+
+
+def test_trigrams_fold_and_pad_words() -> None:
+    assert trigrams("Ab") == {"  a", " ab", "ab "}
+    assert trigrams("ÉCOLE") == trigrams("ecole")
+    assert trigrams(" !! ") == frozenset()
+
+
+def test_index_ranks_typos_and_follows_changes() -> None:
+    index = TrigramIndex()
+    index.upsert("doctor", 1, "Dr. Lina Haddad")
+    index.upsert("doctor", 2, "Dr. Hadi Nasser")
+    index.upsert("pharmacy", 1, "Haddad Pharmacy")
+
+    assert [(match.kind, match.id) for match in index.search("lina hadad")] == [("doctor", 1)]
+    assert [match.id for match in index.search("hadad", kinds=["pharmacy"])] == [1]
+    assert index.search("hadad", limit=1)[0].score <= 1.0
+
+    index.upsert("doctor", 1, "Dr. Lina Khoury")
+    assert index.search("lina hadad") == []
+    assert [match.id for match in index.search("lina kouri")] == [1]
+    index.discard("doctor", 1)
+    assert index.search("lina kouri") == []
+    assert len(index) == 2
+
+
+def test_bulk_build_matches_incremental_updates() -> None:
+    # Enough shared trigrams that the common ones become bitmaps in both indexes.
+    first, last = ["Lina", "Omar", "Hala", "Sami"], ["Haddad", "Nasser", "Khoury", "Jaber", "Odeh"]
+    rows = [("doctor", i, f"Dr. {first[i % 4]} {last[i % 5]} {i}") for i in range(400)]
+    built, grown = TrigramIndex.build(rows), TrigramIndex()
+    for row in rows:
+        grown.upsert(*row)
+    for kind, entry_id, _ in rows[::3]:
+        built.discard(kind, entry_id)
+        grown.discard(kind, entry_id)
+
+    for query in ("lina hadad", "omar naser 12", "sami", "khoury 399"):
+        assert built.search(query, limit=50) == grown.search(query, limit=50), query
+    assert len(built) == len(grown) == 266
+
+
+def test_fuzzy_doctor_listing(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:6]
+    created = client.post("/api/v1/doctors/", json={"name": f"Dr. Zuhair Abughazaleh {tag}"}, headers=auth_headers)
+    assert created.status_code == 201, created.text
+    doctor_id = created.json()["id"]
+
+    params = {"search": f"zuhir abugazaleh {tag}", "page_size": 100}
+    assert client.get("/api/v1/doctors/", params=params, headers=auth_headers).json()["data"] == []
+    fuzzy = client.get("/api/v1/doctors/", params={**params, "fuzzy": "true"}, headers=auth_headers)
+    assert fuzzy.status_code == 200, fuzzy.text
+    assert fuzzy.json()["data"][0]["id"] == doctor_id
+
+    # Renames reach the in-memory index without a reload, and lookups never scan the table.
+    renamed = client.put(f"/api/v1/doctors/{doctor_id}", json={"name": f"Dr. Zuhair Tamimi {tag}"}, headers=auth_headers)
+    assert renamed.status_code == 200, renamed.text
+    before = client.get("/api/v1/doctors/", params={**params, "fuzzy": "true"}, headers=auth_headers)
+    assert doctor_id not in [row["id"] for row in before.json()["data"]]
+    after = client.get(
+        "/api/v1/doctors/", params={"search": f"zuhair tamimy {tag}", "fuzzy": "true"}, headers=auth_headers
+    )
+    assert after.json()["data"][0]["id"] == doctor_id
+    assert query_count(after) <= 2
+
+    assert client.delete(f"/api/v1/doctors/{doctor_id}", headers=auth_headers).status_code == 204
+    gone = client.get(
+        "/api/v1/doctors/", params={"search": f"zuhair tamimy {tag}", "fuzzy": "true"}, headers=auth_headers
+    )
+    assert doctor_id not in [row["id"] for row in gone.json()["data"]]
+
+
+def test_fuzzy_customer_listing(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:6]
+    pharmacy = client.post("/api/v1/pharmacies/", json={"name": f"Shifa Pharmacy {tag}"}, headers=auth_headers)
+    doctor = client.post("/api/v1/doctors/", json={"name": f"Dr. Shifaa Odeh {tag}"}, headers=auth_headers)
+    assert pharmacy.status_code == 201 and doctor.status_code == 201
+
+    resp = client.get(
+        "/api/v1/pwa/customers", params={"search": f"shifa farmacy {tag}", "fuzzy": "true"}, headers=auth_headers
+    )
+    assert resp.status_code == 200, resp.text
+    rows = [(row["type"], row["id"]) for row in resp.json()]
+    assert rows[0] == ("pharmacy", str(pharmacy.json()["id"]))
+    assert ("doctor", str(doctor.json()["id"])) in rows
+
+    only_doctors = client.get(
+        "/api/v1/pwa/customers",
+        params={"search": f"shifa farmacy {tag}", "fuzzy": "true", "type": "doctor"},
+        headers=auth_headers,
+    )
+    assert {row["type"] for row in only_doctors.json()} == {"doctor"}
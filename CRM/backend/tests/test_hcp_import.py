@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import io
+import uuid
+import zipfile
+
+from fastapi.testclient import TestClient
+
+from services.hcp_import import read_xlsx
+
+
+def _import(client: TestClient, headers: dict[str, str], body: bytes, content_type: str = "text/csv", **params):
+    return client.post(
+        "/api/v1/hcps/import",
+        content=body,
+        params=params,
+        headers={**headers, "Content-Type": content_type},
+    )
+
+
+def _find(client: TestClient, headers: dict[str, str], tag: str) -> list[dict]:
+    resp = client.get("/api/v1/hcps", params={"search": tag, "pageSize": 100}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    return resp.json()["data"]
+
+
+def _xlsx(rows: list[list[str]]) -> bytes:
+    """Minimal workbook: first column through shared strings, the rest inline."""
+    shared = sorted({row[0] for row in rows})
+    cells = []
+    for number, row in enumerate(rows, start=1):
+        values = [f'<c r="A{number}" t="s"><v>{shared.index(row[0])}</v></c>']
+        values += [
+            f'<c r="{chr(66 + index)}{number}" t="inlineStr"><is><t>{value}</t></is></c>'
+            for index, value in enumerate(row[1:])
+            if value
+        ]
+        cells.append(f'<row r="{number}">{"".join(values)}</row>')
+    main = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+    rel = "http://schemas.openxmlformats.org/officeDocument/2006/relationships"
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w") as archive:
+        archive.writestr(
+            "xl/workbook.xml",
+            f'<workbook xmlns="{main}" xmlns:r="{rel}"><sheets><sheet name="HCPs" sheetId="1" r:id="rId1"/></sheets></workbook>',
+        )
+        archive.writestr(
+            "xl/_rels/workbook.xml.rels",
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Target="worksheets/data.xml" '
+            'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet"/></Relationships>',
+        )
+        archive.writestr(
+            "xl/sharedStrings.xml",
+            f'<sst xmlns="{main}">{"".join(f"<si><t>{value}</t></si>" for value in shared)}</sst>',
+        )
+        archive.writestr("xl/worksheets/data.xml", f'<worksheet xmlns="{main}"><sheetData>{"".join(cells)}</sheetData></worksheet>')
+    return buffer.getvalue()
+
+
+def test_csv_import_upserts_on_name_and_area(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    body = (
+        "Name,Area Tag,Speciality,Phone,Client Tag\n"
+        f"Dr. Rami Haddad {tag},Abdoun,Cardio,0790000001,A\n"
+        f"Nour Pharmacy {tag},Abdoun,Pharmacy,,Pharmacy\n"
+        f",Abdoun,GP,,B\n"
+        f"Dr. Sara {tag},Sweifieh,{'x' * 200},,B\n"
+        "\n"
+        f"Rami  Haddad {tag},abdoun,,0790000002,A\n"
+    ).encode()
+
+    resp = _import(client, auth_headers, body)
+    assert resp.status_code == 200, resp.text
+    report = resp.json()
+    assert {key: report[key] for key in ("rows", "inserted", "updated", "skipped", "failed")} == {
+        "rows": 5, "inserted": 1, "updated": 1, "skipped": 1, "failed": 2,
+    }
+    assert report["errors"] == [
+        {"row": 4, "error": "Name is required."},
+        {"row": 5, "error": "specialty is longer than 150 characters."},
+    ]
+    [hcp] = _find(client, auth_headers, tag)
+    # The repeat row's name and phone win; its blank specialty keeps "Cardio".
+    assert (hcp["name"], hcp["specialty"], hcp["phone"]) == (f"Rami Haddad {tag}", "Cardio", "0790000002")
+
+    again = _import(client, auth_headers, f"Name,Area\nRami Haddad {tag},abdoun\n".encode())
+    assert (again.json()["unchanged"], again.json()["inserted"]) == (1, 0)
+    assert client.delete(f"/api/v1/hcps/{hcp['id']}", headers=auth_headers).status_code == 204
+    revived = _import(client, auth_headers, f"Name;Area;City\nDr. Rami Haddad {tag};Abdoun;Amman\n".encode())
+    assert revived.json()["updated"] == 1
+    assert [(row["id"], row["city"]) for row in _find(client, auth_headers, tag)] == [(hcp["id"], "Amman")]
+
+
+def test_xlsx_import(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    workbook = _xlsx(
+        [
+            ["Name", "Representative Name", "Area Tag", "Speciality"],
+            [f"هبة الخطيب {tag}", "", "الرابية", "Gyna"],
+            [f"Omar Saleh {tag}", "Rep", "", "GP"],
+        ]
+    )
+    assert list(read_xlsx(io.BytesIO(workbook)))[1] == [f"هبة الخطيب {tag}", None, "الرابية", "Gyna"]
+
+    resp = _import(client, auth_headers, workbook, "application/octet-stream")
+    assert resp.status_code == 200, resp.text
+    assert resp.json()["inserted"] == 2
+    assert sorted(hcp["specialty"] for hcp in _find(client, auth_headers, tag)) == ["GP", "Gyna"]
+
+
+def test_import_rejects_bad_uploads(
+    client: TestClient, auth_headers: dict[str, str], rep_headers: dict[str, str]
+) -> None:
+    assert _import(client, rep_headers, b"Name\nA B\n").status_code == 403
+    assert _import(client, auth_headers, b"").status_code == 400
+    no_name = _import(client, auth_headers, b"Phone,City\n1,Amman\n")
+    assert no_name.status_code == 400
+    assert "Name column" in no_name.json()["detail"]
+    assert _import(client, auth_headers, b"PK\x03\x04 not a zip").status_code == 400
+    assert _import(client, auth_headers, b"Name\nA\n", format="pdf").status_code == 422
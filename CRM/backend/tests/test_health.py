@@ -22,3 +22,54 @@ def test_api_v1_health(client):
     assert data.get("status") == "ok"
     assert "db" in data
     assert "version" in data
+
+
+def test_sqlite_profile_pragmas_applied():
+    from core import db as core_db
+
+    assert core_db.engine.url.get_backend_name() == "sqlite"
+    pragmas = core_db.sqlite_pragma_report(core_db.engine)
+    assert str(pragmas["journal_mode"]).lower() == "wal"
+    assert pragmas["foreign_keys"] == 1
+    assert pragmas["busy_timeout"] > 0
+
+
+def test_sqlite_profile_off_installs_no_pragmas(tmp_path, monkeypatch):
+    from sqlalchemy.engine import make_url
+
+    from core import db as core_db
+
+    url = f"sqlite:///{(tmp_path / 'profile_off.db').as_posix()}"
+    monkeypatch.setattr(core_db.settings, "sqlite_profile", "off")
+    assert core_db.sqlite_pragmas(make_url(url)) == []
+
+    plain = core_db._build_engine(url, {"check_same_thread": False})
+    try:
+        pragmas = core_db.sqlite_pragma_report(plain)
+        assert str(pragmas["journal_mode"]).lower() == "delete"
+        assert pragmas["foreign_keys"] == 0
+    finally:
+        plain.dispose()
+
+
+def test_foreign_key_violations_are_reported(tmp_path):
+    import sqlite3
+
+    from core import db as core_db
+
+    path = tmp_path / "dangling.db"
+    conn = sqlite3.connect(path)
+    conn.executescript(
+        """
+        CREATE TABLE parents (id INTEGER PRIMARY KEY);
+        CREATE TABLE children (id INTEGER PRIMARY KEY, parent_id INTEGER REFERENCES parents(id));
+        INSERT INTO children (parent_id) VALUES (1), (2);
+        """
+    )
+    conn.close()
+
+    engine = core_db._build_engine(f"sqlite:///{path.as_posix()}", {"check_same_thread": False})
+    try:
+        assert core_db.sqlite_foreign_key_violations(engine) == {"children": 2}
+    finally:
+        engine.dispose()
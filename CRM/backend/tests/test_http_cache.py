@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import pytest
+
+from core import compression
+from core.http_cache import cache_policy, etag_matches
+
+
+def test_large_response_is_gzipped(client):
+    resp = client.get("/openapi.json", headers={"Accept-Encoding": "gzip"})
+    assert resp.status_code == 200
+    # httpx decodes transparently; the headers show what went over the wire.
+    assert resp.headers["content-encoding"] == "gzip"
+    assert "accept-encoding" in resp.headers["vary"].lower()
+    assert int(resp.headers["content-length"]) < len(resp.content) // 4
+    assert resp.json()["info"]["title"]
+
+
+@pytest.mark.skipif(compression.brotli is None, reason="brotli not installed")
+def test_brotli_preferred_when_accepted(client):
+    resp = client.get("/openapi.json", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.status_code == 200
+    assert resp.headers["content-encoding"] == "br"
+    assert resp.json()["info"]["title"]
+
+
+def test_small_responses_are_not_compressed(client):
+    resp = client.get("/status", headers={"Accept-Encoding": "gzip, br"})
+    assert resp.status_code == 200
+    assert "content-encoding" not in resp.headers
+
+
+def test_encoding_negotiation():
+    assert compression.choose_encoding("gzip;q=1.0, br;q=0") == "gzip"
+    assert compression.choose_encoding("identity") is None
+    assert compression.choose_encoding("*;q=0.5") in ("br", "gzip")
+
+
+def test_etag_round_trip_returns_304(client, auth_headers):
+    first = client.get("/api/v1/products", headers=auth_headers)
+    assert first.status_code == 200
+    etag = first.headers["etag"]
+    assert etag.startswith('W/"')
+    assert first.headers["cache-control"] == "private, max-age=300"
+
+    again = client.get("/api/v1/products", headers={**auth_headers, "If-None-Match": etag})
+    assert again.status_code == 304
+    assert again.content == b""
+    assert again.headers["etag"] == etag
+
+    changed = client.get("/api/v1/products?page_size=1", headers={**auth_headers, "If-None-Match": etag})
+    assert changed.status_code == 200
+
+
+def test_cache_policies():
+    assert cache_policy("/api/v1/territories") == "private, max-age=3600"
+    assert cache_policy("/api/v1/reps/3") == "private, max-age=120"
+    assert cache_policy("/api/v1/repsx") == "private, no-cache"
+    assert cache_policy("/api/v1/visits/") == "private, no-cache"
+    assert etag_matches('"abc", W/"def"', 'W/"def"')
+    assert etag_matches("*", 'W/"x"')
+    assert not etag_matches('W/"abc"', 'W/"def"')
+
+
+def test_errors_and_writes_carry_no_etag(client, auth_headers):
+    missing = client.get("/api/v1/doctors/999999", headers=auth_headers)
+    assert missing.status_code == 404
+    assert "etag" not in missing.headers
+    login = client.post("/api/v1/auth/login", json={"email": "nobody@example.com", "password": "x"})
+    assert "etag" not in login.headers
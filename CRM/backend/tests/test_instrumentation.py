@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import logging
+from uuid import uuid4
+
+from sqlalchemy import select
+
+from core.db import SessionLocal
+from core.instrumentation import capture_queries, report_repeated_queries
+from models.crm import Doctor, Role
+from tests.conftest import query_count
+
+
+def _record_visits(client, headers, doctor_id: int, count: int) -> None:
+    for _ in range(count):
+        resp = client.post(
+            "/api/v1/pwa/visits",
+            json={"customerId": str(doctor_id), "customerType": "doctor", "status": "success"},
+            headers=headers,
+        )
+        assert resp.status_code == 201, resp.text
+
+
+def test_server_timing_reports_queries(client, auth_headers):
+    resp = client.get("/api/v1/visits/", headers=auth_headers)
+    assert resp.status_code == 200
+    timing = resp.headers["server-timing"]
+    assert timing.startswith("db;dur=") and "db-slowest;dur=" in timing
+    assert query_count(resp) >= 1
+
+
+def test_pwa_visits_query_count_does_not_grow_with_rows(client, rep_headers, query_budget):
+    doctor = client.post(
+        "/api/v1/doctors",
+        json={"name": f"Dr. Budget {uuid4().hex[:6]}", "specialty": "GP"},
+        headers=rep_headers,
+    )
+    if doctor.status_code == 403:
+        with SessionLocal() as session:
+            doctor_id = session.scalars(select(Doctor.id).limit(1)).first()
+    else:
+        doctor_id = doctor.json()["id"]
+
+    _record_visits(client, rep_headers, doctor_id, 2)
+    baseline = query_count(client.get("/api/v1/pwa/visits", headers=rep_headers))
+
+    _record_visits(client, rep_headers, doctor_id, 5)
+    resp = client.get("/api/v1/pwa/visits", headers=rep_headers)
+    assert resp.status_code == 200
+    assert len(resp.json()) >= 7
+    query_budget(resp, baseline)
+    query_budget(client.get("/api/v1/visits/?page_size=50", headers=rep_headers), 4)
+
+
+def test_repeated_statements_are_flagged(caplog):
+    with SessionLocal() as session, capture_queries() as stats:
+        for role_id in range(1, 5):
+            session.get(Role, role_id)
+            session.expunge_all()
+
+    assert stats.count == 4
+    assert stats.slowest_sql.startswith("SELECT roles.")
+    with caplog.at_level(logging.WARNING, logger="core.instrumentation"):
+        report_repeated_queries(stats, "test", threshold=4)
+    assert "Possible N+1 in test: 4 x SELECT roles." in caplog.text
@@ -0,0 +1,97 @@
+from __future__ import annotations
+
+import asyncio
+
+from core.config import settings
+from core.metrics import MetricsRegistry, http_latency, http_requests
+
+
+def _samples(text: str) -> dict[str, float]:
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            name, _, value = line.rpartition(" ")
+            samples[name] = float(value)
+    return samples
+
+
+def test_metrics_endpoint_reports_routes_pools_and_caches(client, auth_headers):
+    route = "/api/v1/doctors/{doctor_id}"
+    before = http_requests.value("GET", route, 404)
+    for _ in range(3):
+        assert client.get("/api/v1/doctors/999999", headers=auth_headers).status_code == 404
+
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain; version=0.0.4")
+    samples = _samples(resp.text)
+
+    # Path parameters are folded into the route template.
+    assert samples[f'crm_http_requests_total{{method="GET",route="{route}",status="404"}}'] == before + 3
+    assert f'crm_http_request_duration_seconds_bucket{{method="GET",route="{route}",le="+Inf"}}' in samples
+    assert samples["crm_http_requests_in_flight"] == 1  # the scrape itself
+    assert any(name.startswith('crm_db_statement_duration_seconds_count{operation="SELECT"}') for name in samples)
+    assert samples['crm_db_pool_connections{pool="primary",state="size"}'] == settings.db_pool_size
+    assert 'crm_db_pool_checkout_wait_seconds_count{pool="primary"}' in samples
+    assert samples['crm_cache_requests_total{cache="auth_user",result="hit"}'] >= 2
+    assert 'crm_worker_queue_depth{queue="ledger_audit"}' in samples
+    assert 'crm_worker_queue_depth{queue="threadpool"}' in samples
+
+
+def test_metrics_token(client, monkeypatch):
+    monkeypatch.setattr(settings, "metrics_token", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+
+def test_unmatched_paths_share_one_label(client):
+    before = http_latency.count("GET", "unmatched")
+    client.get("/no/such/path/1")
+    client.get("/no/such/path/2")
+    assert http_latency.count("GET", "unmatched") == before + 2
+
+
+def test_histogram_exposition_is_cumulative():
+    registry = MetricsRegistry()
+    runs = registry.histogram("agent_seconds", "Runs.", ("agent",), buckets=(1.0, 5.0))
+    for value in (0.5, 2.0, 7.0):
+        runs.observe("sales_trend", value=value)
+    samples = _samples(registry.render())
+    assert samples['agent_seconds_bucket{agent="sales_trend",le="1"}'] == 1
+    assert samples['agent_seconds_bucket{agent="sales_trend",le="5"}'] == 2
+    assert samples['agent_seconds_bucket{agent="sales_trend",le="+Inf"}'] == 3
+    assert samples['agent_seconds_sum{agent="sales_trend"}'] == 9.5
+    assert samples['agent_seconds_count{agent="sales_trend"}'] == 3
+
+
+def test_agent_runs_are_timed(monkeypatch):
+    from ai_agents import scheduler
+    from core.metrics import agent_runs
+
+    class _Agent:
+        def __init__(self, name: str, fail: bool) -> None:
+            self.name, self.fail = name, fail
+
+        async def run(self) -> None:
+            if self.fail:
+                raise RuntimeError("boom")
+
+        def close(self) -> None:
+            pass
+
+    for cls_name, fail in (
+        ("SalesTrendAgent", False),
+        ("CreditRiskAgent", True),
+        ("CollectionPlannerAgent", False),
+        ("StockRiskAgent", False),
+        ("DataQualityAgent", False),
+        ("ContentHelperAgent", False),
+    ):
+        monkeypatch.setattr(scheduler, cls_name, lambda n=cls_name, f=fail: _Agent(n, f))
+
+    ok_before = agent_runs.count("SalesTrendAgent", "ok")
+    failed_before = agent_runs.count("CreditRiskAgent", "error")
+    asyncio.run(scheduler.run_agents_once())
+    assert agent_runs.count("SalesTrendAgent", "ok") == ok_before + 1
+    assert agent_runs.count("CreditRiskAgent", "error") == failed_before + 1
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from core import db as core_db
+from migrations import MIGRATIONS, Backfill, Migration, apply_migrations, migration_plan
+from migrations.runner import applied_versions, validate_migrations
+
+
+@pytest.fixture
+def legacy_engine(tmp_path):
+    """A visits table as it looked before is_deleted, the visit indexes and duration backfill."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    with engine.begin() as conn:
+        conn.execute(
+            text(
+                "CREATE TABLE visits (id INTEGER PRIMARY KEY, visit_date DATE NOT NULL, rep_id INTEGER NOT NULL,"
+                " doctor_id INTEGER, pharmacy_id INTEGER, started_at DATETIME, ended_at DATETIME,"
+                " duration_seconds INTEGER)"
+            )
+        )
+        for idx in range(1, 6):
+            conn.execute(
+                text(
+                    "INSERT INTO visits (id, visit_date, rep_id, doctor_id, started_at, ended_at)"
+                    " VALUES (:id, '2024-05-01', 1, 1, '2024-05-01 09:00:00.000000', :ended)"
+                ),
+                {"id": idx, "ended": f"2024-05-01 09:{idx:02d}:00.000000"},
+            )
+        conn.execute(text("INSERT INTO visits (id, visit_date, rep_id, doctor_id) VALUES (6, '2024-05-02', 1, 1)"))
+    yield engine
+    engine.dispose()
+
+
+def test_legacy_database_is_migrated_in_batches(legacy_engine):
+    plan = migration_plan(legacy_engine, MIGRATIONS)
+    assert [step["version"] for step in plan] == [1, 2, 3, 4, 5]
+    assert plan[2]["backfill_rows"] == 5
+
+    messages: list[str] = []
+    assert apply_migrations(legacy_engine, MIGRATIONS, batch_size=2, progress=messages.append) == [1, 2, 3, 4, 5]
+    assert [m for m in messages if "rows" in m] == [
+        "0003 visit_durations: 2/5 rows",
+        "0003 visit_durations: 4/5 rows",
+        "0003 visit_durations: 5/5 rows",
+    ]
+
+    inspector = inspect(legacy_engine)
+    assert "is_deleted" in {col["name"] for col in inspector.get_columns("visits")}
+    assert {"ix_visits_rep_id_visit_date", "ix_visits_doctor_id"} <= {ix["name"] for ix in inspector.get_indexes("visits")}
+    with legacy_engine.connect() as conn:
+        durations = conn.execute(text("SELECT duration_seconds FROM visits ORDER BY id")).scalars().all()
+    assert durations == [60, 120, 180, 240, 300, None]
+
+    assert applied_versions(legacy_engine) == {1, 2, 3, 4, 5}
+    assert migration_plan(legacy_engine, MIGRATIONS) == []
+    assert apply_migrations(legacy_engine, MIGRATIONS) == []
+
+
+def test_failed_schema_step_rolls_back(legacy_engine):
+    def upgrade(conn):
+        conn.execute(text("ALTER TABLE visits ADD COLUMN half_done INTEGER"))
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        apply_migrations(legacy_engine, [Migration(version=1, name="broken", upgrade=upgrade)])
+
+    assert "half_done" not in {col["name"] for col in inspect(legacy_engine).get_columns("visits")}
+    assert applied_versions(legacy_engine) == set()
+
+
+def test_interrupted_backfill_resumes(legacy_engine):
+    calls = {"n": 0}
+
+    def flaky(row):
+        calls["n"] += 1
+        if calls["n"] > 2:
+            raise RuntimeError("interrupted")
+        return {"duration_seconds": 1}
+
+    backfill = Backfill(
+        table="visits",
+        columns=(),
+        where="duration_seconds IS NULL AND started_at IS NOT NULL",
+        transform=flaky,
+    )
+    with pytest.raises(RuntimeError):
+        apply_migrations(legacy_engine, [Migration(version=1, name="fill", backfill=backfill)], batch_size=2)
+    assert applied_versions(legacy_engine) == set()
+    assert migration_plan(legacy_engine, [Migration(version=1, name="fill", backfill=backfill)])[0]["backfill_rows"] == 3
+
+    calls["n"] = -10
+    assert apply_migrations(legacy_engine, [Migration(version=1, name="fill", backfill=backfill)], batch_size=2) == [1]
+    with legacy_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM visits WHERE duration_seconds = 1")).scalar_one() == 5
+
+
+def test_startup_applies_every_migration():
+    assert applied_versions(core_db.engine) == {migration.version for migration in MIGRATIONS}
+
+
+def test_versions_must_increase():
+    with pytest.raises(ValueError):
+        validate_migrations([Migration(version=2, name="b"), Migration(version=1, name="a")])
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+import uuid
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from core.db import iter_partitions
+from models.hcp import HCP
+
+
+def _lines(resp) -> list[dict]:  # noqa: ANN001
+    assert resp.status_code == 200, resp.text
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    assert resp.text.endswith("\n")
+    return [json.loads(line) for line in resp.text.splitlines()]
+
+
+def test_iter_partitions_reads_in_batches(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    for index in range(5):
+        resp = client.post("/api/v1/hcps", json={"name": f"Batch{index} {tag}"}, headers=auth_headers)
+        assert resp.status_code == 201, resp.text
+
+    statement = select(HCP.first_name).where(HCP.last_name == tag).order_by(HCP.first_name)
+    batches = [[row.first_name for row in rows] for rows in iter_partitions(statement, 2)]
+    assert batches == [["Batch0", "Batch1"], ["Batch2", "Batch3"], ["Batch4"]]
+
+
+def test_hcp_listing_streams_ndjson(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    for name in ("Yara", "Basel", "Muna"):
+        resp = client.post("/api/v1/hcps", json={"name": f"{name} Stream{tag}", "area": "Jubeiha"}, headers=auth_headers)
+        assert resp.status_code == 201, resp.text
+
+    params = {"search": f"stream{tag}"}
+    paged = client.get("/api/v1/hcps", params={**params, "pageSize": 1}, headers=auth_headers).json()
+    streamed = _lines(client.get("/api/v1/hcps", params={**params, "format": "ndjson"}, headers=auth_headers))
+    # Every match regardless of pageSize, in listing order, with the listing's fields.
+    assert [row["name"] for row in streamed] == [f"{name} Stream{tag}" for name in ("Basel", "Muna", "Yara")]
+    assert streamed[0] == paged["data"][0]
+    assert client.get("/api/v1/hcps", params={"format": "csv"}, headers=auth_headers).status_code == 422
+
+
+def test_customer_listing_streams_ndjson(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    doctor = client.post("/api/v1/doctors/", json={"name": f"Dr. Kinan Ndjson{tag}"}, headers=auth_headers)
+    pharmacy = client.post("/api/v1/pharmacies/", json={"name": f"Ndjson{tag} Pharmacy"}, headers=auth_headers)
+    assert doctor.status_code == 201 and pharmacy.status_code == 201
+
+    for params in ({"search": f"ndjson{tag}"}, {"search": f"ndjsn{tag}", "fuzzy": "true"}):
+        listed = client.get("/api/v1/pwa/customers", params=params, headers=auth_headers).json()
+        streamed = _lines(
+            client.get("/api/v1/pwa/customers", params={**params, "format": "ndjson"}, headers=auth_headers)
+        )
+        assert streamed == listed
+    assert sorted(row["type"] for row in streamed) == ["doctor", "pharmacy"]
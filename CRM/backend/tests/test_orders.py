@@ -1,6 +1,8 @@
 from __future__ import annotations
 
+import uuid
 from datetime import date
+from decimal import Decimal
 
 
 def test_create_order_with_lines(client, auth_headers):
@@ -31,3 +33,59 @@ def test_create_order_with_lines(client, auth_headers):
     assert body["pharmacy_id"] == pharmacy_id
     assert body["lines"][0]["product_id"] == product_id
     assert float(body["total_amount"]) > 0
+
+
+def test_create_large_order_in_constant_queries(client, auth_headers, query_budget):
+    tag = uuid.uuid4().hex[:8]
+    pharmacy_id = client.get("/api/v1/pharmacies", headers=auth_headers).json()["data"][0]["id"]
+    product_ids = []
+    for index in range(120):
+        product = {"code": f"BULK-{tag}-{index}", "name": f"Bulk {tag} {index}", "selling_price": "2.50"}
+        resp = client.post("/api/v1/products/", json=product, headers=auth_headers)
+        assert resp.status_code == 201, resp.text
+        product_ids.append(resp.json()["id"])
+
+    # Every other line takes the catalog price; every third carries a discount.
+    lines = [
+        {"product_id": product_id, "quantity": 2, "discount": 0.1 if index % 3 == 0 else 0}
+        | ({} if index % 2 else {"price": "4.00"})
+        for index, product_id in enumerate(product_ids)
+    ]
+    payload = {"order_date": date.today().isoformat(), "pharmacy_id": pharmacy_id, "lines": lines}
+    resp = client.post("/api/v1/orders/", json=payload, headers=auth_headers)
+    assert resp.status_code == 201, resp.text
+    query_budget(resp, 8)
+
+    body = resp.json()
+    expected = sum(
+        Decimal(line.get("price", "2.50")) * 2 * (1 - Decimal(str(line["discount"]))) for line in lines
+    )
+    assert Decimal(body["total_amount"]) == expected
+    assert [line["product_id"] for line in body["lines"]] == product_ids
+    assert {Decimal(line["price"]) for line in body["lines"]} == {Decimal("2.50"), Decimal("4.00")}
+    assert body["lines"][0]["product"]["code"] == f"BULK-{tag}-0"
+    stored = client.get(f"/api/v1/orders/{body['id']}/lines", headers=auth_headers).json()
+    assert len(stored) == len(lines)
+
+
+def test_create_order_rejects_unknown_or_unpriced_products(client, auth_headers):
+    tag = uuid.uuid4().hex[:8]
+    pharmacy_id = client.get("/api/v1/pharmacies", headers=auth_headers).json()["data"][0]["id"]
+    unpriced = client.post(
+        "/api/v1/products/", json={"code": f"NOPRICE-{tag}", "name": f"No price {tag}"}, headers=auth_headers
+    ).json()
+    before = client.get("/api/v1/orders/", headers=auth_headers).json()["pagination"]["total"]
+
+    unknown = 10**9
+    cases = [
+        ([{"product_id": unpriced["id"], "quantity": 1, "price": "1.00"}, {"product_id": unknown, "quantity": 1}],
+         f"Product {unknown} not found."),
+        ([{"product_id": unpriced["id"], "quantity": 1}],
+         f"Product {unpriced['id']} has no price; send one with the line."),
+    ]
+    for lines, detail in cases:
+        payload = {"order_date": date.today().isoformat(), "pharmacy_id": pharmacy_id, "lines": lines}
+        resp = client.post("/api/v1/orders/", json=payload, headers=auth_headers)
+        assert resp.status_code == 400
+        assert resp.json()["detail"] == detail
+    assert client.get("/api/v1/orders/", headers=auth_headers).json()["pagination"]["total"] == before
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+import pytest
+from sqlalchemy import func, select, text
+
+from api.v1 import utils as pagination
+from core.db import SessionLocal
+from models.crm import Doctor
+from tests.conftest import query_count
+
+
+@pytest.fixture
+def doctor_total(client, auth_headers) -> int:
+    for _ in range(3):
+        resp = client.post(
+            "/api/v1/doctors/",
+            json={"name": f"Dr. Page {uuid4().hex[:8]}", "specialty": "GP"},
+            headers=auth_headers,
+        )
+        assert resp.status_code == 201, resp.text
+    with SessionLocal() as session:
+        return session.scalar(select(func.count()).select_from(Doctor))
+
+
+def test_exact_total_and_has_more(client, auth_headers, doctor_total):
+    resp = client.get("/api/v1/doctors/?page_size=1", headers=auth_headers)
+    assert resp.status_code == 200
+    meta = resp.json()["pagination"]
+    assert meta["total"] == meta["total_pages"] == doctor_total
+    assert meta["has_more"] is True and meta["total_estimated"] is False
+
+    last = client.get(f"/api/v1/doctors/?page_size=1&page={doctor_total}", headers=auth_headers).json()
+    assert last["pagination"]["has_more"] is False and last["pagination"]["total"] == doctor_total
+
+
+def test_total_mode_none_skips_the_count(client, auth_headers, doctor_total):
+    exact = client.get("/api/v1/doctors/?page_size=1", headers=auth_headers)
+    none = client.get("/api/v1/doctors/?page_size=1&total_mode=none", headers=auth_headers)
+    meta = none.json()["pagination"]
+    assert meta["total"] is None and meta["total_pages"] is None and meta["has_more"] is True
+    assert len(none.json()["data"]) == 1
+    assert query_count(none) == query_count(exact) - 1
+
+
+def test_partial_page_needs_no_count(client, auth_headers, doctor_total):
+    exact = client.get(f"/api/v1/doctors/?page_size={doctor_total + 5}", headers=auth_headers)
+    none = client.get(f"/api/v1/doctors/?page_size={doctor_total + 5}&total_mode=none", headers=auth_headers)
+    assert exact.json()["pagination"]["total"] == doctor_total
+    assert query_count(exact) == query_count(none)
+
+
+def test_estimate_caps_filtered_counts(client, auth_headers, doctor_total, monkeypatch):
+    monkeypatch.setattr(pagination, "ESTIMATE_CAP", 2)
+    resp = client.get("/api/v1/doctors/?page_size=1&total_mode=estimate&search=dr.", headers=auth_headers)
+    meta = resp.json()["pagination"]
+    assert (meta["total"], meta["total_estimated"], meta["has_more"]) == (2, True, True)
+
+
+def test_estimate_uses_table_statistics_when_unfiltered(client, auth_headers, doctor_total, monkeypatch):
+    monkeypatch.setattr(pagination, "ESTIMATE_CAP", 1)
+    with SessionLocal() as session:
+        session.execute(text("ANALYZE doctors"))
+        session.commit()
+    resp = client.get("/api/v1/doctors/?page_size=1&total_mode=estimate", headers=auth_headers)
+    meta = resp.json()["pagination"]
+    assert meta["total"] == doctor_total and meta["total_estimated"] is True
+
+
+def test_invalid_total_mode_is_rejected(client, auth_headers):
+    assert client.get("/api/v1/visits/?total_mode=maybe", headers=auth_headers).status_code == 422
+    resp = client.get("/api/v1/hcps?totalMode=none&pageSize=1", headers=auth_headers)
+    assert resp.status_code == 200 and resp.json()["meta"]["total"] is None
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import asyncio
+import time
+
+import anyio.to_thread
+import pytest
+
+from core import profiling
+from core.config import settings
+
+
+@pytest.fixture
+def profile_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "profiling_dir", str(tmp_path))
+    monkeypatch.setattr(profiling, "profile_gate", profiling.ProfileGate(per_minute=100))
+    return tmp_path
+
+
+def test_admin_can_profile_a_request(client, auth_headers, profile_dir):
+    resp = client.get("/api/v1/reports/rep-performance", headers={**auth_headers, "X-Profile": "1"})
+    assert resp.status_code == 200
+    profile_id = resp.headers["x-profile-id"]
+    assert (profile_dir / f"{profile_id}.folded").exists()
+
+    listed = client.get("/api/admin/profiles", headers=auth_headers)
+    assert listed.status_code == 200
+    meta = listed.json()[0]
+    assert meta["id"] == profile_id
+    assert meta["path"] == "/api/v1/reports/rep-performance" and meta["status"] == 200
+
+    download = client.get(f"/api/admin/profiles/{profile_id}", headers=auth_headers)
+    assert download.status_code == 200
+    assert download.headers["content-type"].startswith("text/plain")
+
+    by_query = client.get("/api/v1/reports/visits-summary?profile=1", headers=auth_headers)
+    assert "x-profile-id" in by_query.headers
+
+
+def test_non_admins_are_never_profiled(client, rep_headers, manager_headers, profile_dir):
+    for headers in (rep_headers, manager_headers, {}):
+        resp = client.get("/api/v1/products/", headers={**headers, "X-Profile": "1"})
+        assert "x-profile-id" not in resp.headers
+    assert client.get("/api/admin/profiles", headers=manager_headers).status_code == 403
+    assert not list(profile_dir.iterdir())
+
+
+def test_rate_limited_requests_run_unprofiled(client, auth_headers, profile_dir, monkeypatch):
+    monkeypatch.setattr(profiling, "profile_gate", profiling.ProfileGate(per_minute=1))
+    first = client.get("/api/v1/products/", headers={**auth_headers, "X-Profile": "1"})
+    second = client.get("/api/v1/products/", headers={**auth_headers, "X-Profile": "1"})
+    assert "x-profile-id" in first.headers
+    assert second.status_code == 200
+    assert second.headers["x-profile"] == "skipped"
+
+
+def test_profile_ids_are_validated(client, auth_headers, profile_dir):
+    assert client.get("/api/admin/profiles/..%2F..%2Fmain", headers=auth_headers).status_code == 404
+    assert client.get("/api/admin/profiles/20240101T000000-deadbeef", headers=auth_headers).status_code == 404
+
+
+def _busy_wait_for_profiler(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        pass
+
+
+def test_sampler_attributes_threadpool_work_to_the_request():
+    async def scenario() -> profiling.RequestProfile:
+        profile = profiling.RequestProfile("p", asyncio.get_running_loop(), asyncio.current_task())
+        token = profiling._active_profile.set(profile)
+        sampler = profiling._Sampler(profile, interval_s=0.002, max_seconds=5)
+        sampler.start()
+        try:
+            await anyio.to_thread.run_sync(_busy_wait_for_profiler, 0.1)
+        finally:
+            sampler.stopped.set()
+            profiling._active_profile.reset(token)
+            sampler.join()
+        # Work outside the profiled context is not attributed to it.
+        await anyio.to_thread.run_sync(profile.sample, -1)
+        return profile
+
+    profile = asyncio.run(scenario())
+    stacks = profile.folded().splitlines()
+    assert profile.samples > 5
+    assert any(line.startswith("threadpool;") and "_busy_wait_for_profiler" in line for line in stacks)
+    assert not any("run_sync" in line.split(";")[0] for line in stacks)
+
+
+def test_gate_limits_concurrency_and_rate():
+    gate = profiling.ProfileGate(per_minute=2)
+    assert gate.try_acquire()
+    assert not gate.try_acquire()  # one at a time
+    gate.release()
+    assert gate.try_acquire()
+    gate.release()
+    assert not gate.try_acquire()  # two per minute
@@ -0,0 +1,41 @@
+from __future__ import annotations
+
+import json
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+from core import responses
+from core.config import settings
+
+LIST_ENDPOINTS = (
+    "/api/v1/visits/?page_size=50",
+    "/api/v1/doctors/?page_size=50",
+    "/api/v1/hcps?pageSize=50",
+    "/api/v1/pwa/customers",
+    "/api/v1/pwa/visits",
+    "/api/v1/reports/overview",
+    "/api/v1/reports/rep-performance",
+    "/api/v1/reports/territory-performance",
+)
+
+
+@pytest.mark.parametrize("path", LIST_ENDPOINTS)
+def test_fast_path_matches_the_validated_path(client, auth_headers, monkeypatch, path):
+    fast = client.get(path, headers=auth_headers)
+    monkeypatch.setattr(settings, "fast_json_responses", False)
+    slow = client.get(path, headers=auth_headers)
+    assert fast.status_code == slow.status_code == 200
+    assert fast.headers["content-type"] == "application/json"
+    assert fast.json() == slow.json()
+
+
+@pytest.mark.parametrize("with_orjson", [True, False])
+def test_fast_json_response_encodes_plain_values(monkeypatch, with_orjson):
+    if not with_orjson:
+        monkeypatch.setattr(responses, "orjson", None)
+    body = responses.FastJSONResponse(
+        {"day": date(2024, 5, 1), "at": datetime(2024, 5, 1, 9, 30), "qty": Decimal("3"), "price": Decimal("1.50")}
+    ).body
+    assert json.loads(body) == {"day": "2024-05-01", "at": "2024-05-01T09:30:00", "qty": 3, "price": 1.5}
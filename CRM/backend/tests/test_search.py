@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import uuid
+
+from fastapi.testclient import TestClient
+
+from services.search import DOCTORS, index_available, match_expression
+
+
+def _doctor(client: TestClient, headers: dict[str, str], **fields) -> dict:
+    resp = client.post("/api/v1/doctors/", json=fields, headers=headers)
+    assert resp.status_code == 201, resp.text
+    return resp.json()
+
+
+def _doctor_ids(client: TestClient, headers: dict[str, str], search: str) -> list[int]:
+    resp = client.get("/api/v1/doctors/", params={"search": search, "page_size": 100}, headers=headers)
+    assert resp.status_code == 200, resp.text
+    return [row["id"] for row in resp.json()["data"]]
+
+
+def test_match_expression_folds_and_prefixes() -> None:
+    assert match_expression("  Dr. Haddād ") == '"dr"* "haddad"*'
+    assert match_expression("عِيادَة") == '"عياده"*'
+    assert match_expression("!!") is None
+
+
+def test_search_uses_the_fts_index(client: TestClient, auth_headers: dict[str, str]) -> None:
+    assert index_available(DOCTORS)
+    tag = uuid.uuid4().hex[:8]
+    doctor = _doctor(client, auth_headers, name=f"Zephyrine Qawasmi {tag}", specialty="Cardiology", city="Irbid")
+
+    assert doctor["id"] in _doctor_ids(client, auth_headers, "zephy")
+    assert doctor["id"] in _doctor_ids(client, auth_headers, f"qawasmi {tag} cardio")
+    assert doctor["id"] not in _doctor_ids(client, auth_headers, f"qawasmi {tag} pediatrics")
+
+
+def test_arabic_variants_match(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    doctor = _doctor(client, auth_headers, name=f"د. أحمد الحسيني {tag}", clinic="عيادة الشفاء")
+
+    # Hamza-less alef, taa marbuta as haa, and harakat in the query all fold away.
+    for search in (f"احمد {tag}", f"عياده {tag}", f"أَحْمَد {tag}"):
+        assert _doctor_ids(client, auth_headers, search) == [doctor["id"]], search
+
+
+def test_index_follows_updates_and_deletes(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    doctor = _doctor(client, auth_headers, name=f"Marwan Bitar {tag}")
+
+    resp = client.put(f"/api/v1/doctors/{doctor['id']}", json={"name": f"Marwan Sayegh {tag}"}, headers=auth_headers)
+    assert resp.status_code == 200, resp.text
+    assert _doctor_ids(client, auth_headers, f"bitar {tag}") == []
+    assert _doctor_ids(client, auth_headers, f"sayegh {tag}") == [doctor["id"]]
+
+    assert client.delete(f"/api/v1/doctors/{doctor['id']}", headers=auth_headers).status_code == 204
+    assert _doctor_ids(client, auth_headers, f"sayegh {tag}") == []
+
+
+def test_name_matches_rank_first(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    by_city = _doctor(client, auth_headers, name=f"Hana Odeh {tag}", city=f"Madaba{tag}")
+    by_name = _doctor(client, auth_headers, name=f"Madaba{tag} Khoury", city="Amman")
+
+    assert _doctor_ids(client, auth_headers, f"madaba{tag}") == [by_name["id"], by_city["id"]]
+
+
+def test_other_listings_search_through_fts(client: TestClient, auth_headers: dict[str, str]) -> None:
+    tag = uuid.uuid4().hex[:8]
+    pharmacy = client.post("/api/v1/pharmacies/", json={"name": f"صيدلية النور {tag}"}, headers=auth_headers)
+    assert pharmacy.status_code == 201, pharmacy.text
+    hcp = client.post("/api/v1/hcps", json={"name": f"Rasha Qudah {tag}", "specialty": "ENT"}, headers=auth_headers)
+    assert hcp.status_code == 201, hcp.text
+
+    customers = client.get("/api/v1/pwa/customers", params={"search": f"صيدليه {tag}"}, headers=auth_headers)
+    assert [row["id"] for row in customers.json()] == [str(pharmacy.json()["id"])]
+    pharmacies = client.get("/api/v1/pharmacies/", params={"search": f"النور {tag}"}, headers=auth_headers)
+    assert [row["id"] for row in pharmacies.json()["data"]] == [pharmacy.json()["id"]]
+    hcps = client.get("/api/v1/hcps", params={"search": f"qud {tag}"}, headers=auth_headers)
+    assert [row["id"] for row in hcps.json()["data"]] == [hcp.json()["id"]]
@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+from uuid import uuid4
+
+
+def test_stock_movement_rejects_unknown_location(client, auth_headers):
+    product = client.post(
+        "/api/v1/products",
+        json={"code": f"STK-{uuid4().hex[:8]}", "name": "Stock Check"},
+        headers=auth_headers,
+    )
+    assert product.status_code == 201, product.text
+    product_id = product.json()["id"]
+
+    missing = client.post(
+        "/api/v1/stock/movements",
+        json={"product_id": product_id, "quantity": 5, "reason": "sale", "location_to_id": 999999},
+        headers=auth_headers,
+    )
+    assert missing.status_code == 400
+    assert missing.json()["detail"] == "Stock location not found."
+
+    location = client.post(
+        "/api/v1/stock/locations",
+        json={"name": f"Warehouse {uuid4().hex[:8]}", "location_type": "warehouse"},
+        headers=auth_headers,
+    )
+    assert location.status_code == 201, location.text
+    created = client.post(
+        "/api/v1/stock/movements",
+        json={
+            "product_id": product_id,
+            "quantity": 5,
+            "reason": "sale",
+            "location_to_id": location.json()["id"],
+        },
+        headers=auth_headers,
+    )
+    assert created.status_code == 201, created.text
+
+
+def test_stock_location_rejects_unknown_rep(client, auth_headers):
+    response = client.post(
+        "/api/v1/stock/locations",
+        json={"name": "Ghost car", "location_type": "rep_car", "rep_id": 999999},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Rep not found."
+
+
+def test_route_rejects_unknown_rep(client, auth_headers):
+    response = client.post(
+        "/api/v1/routes",
+        json={"name": "Ghost route", "rep_id": 999999, "accounts": []},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Rep not found."
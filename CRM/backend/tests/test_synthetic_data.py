@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from core.db import Base
+from dpm_ledger.analyzer import analyze_sqlite
+from services.synthetic_data import SyntheticScale, generate, legacy_account_id
+
+TINY = SyntheticScale(
+    reps=3,
+    doctors=40,
+    pharmacies=20,
+    products=10,
+    visits=300,
+    orders=60,
+    stock_movements=50,
+    collections=30,
+    ledger_documents=80,
+)
+TABLES = ("doctors", "pharmacies", "products", "visits", "orders", "order_lines", "stock_movements", "collections")
+
+
+def _engine(path):
+    import models  # noqa: F401
+
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        conn.execute(text("INSERT INTO roles (slug, name) VALUES ('medical_rep', 'Medical Rep')"))
+    return engine
+
+
+def _dump(engine) -> dict[str, list[tuple]]:
+    with engine.connect() as conn:
+        dump = {table: conn.execute(text(f"SELECT * FROM {table} ORDER BY id")).all() for table in TABLES}
+        dump["users"] = conn.execute(text("SELECT id, email, name, role_id FROM users ORDER BY id")).all()
+    return dump
+
+
+@pytest.fixture
+def generated(tmp_path):
+    engine = _engine(tmp_path / "first.db")
+    counts = generate(engine, TINY, seed=7, ledger_dir=tmp_path / "ledger")
+    yield engine, counts, tmp_path
+    engine.dispose()
+
+
+def test_same_seed_produces_identical_rows(generated):
+    engine, counts, tmp_path = generated
+    assert counts["visits"] == TINY.visits
+    assert counts["users"] == TINY.reps
+
+    again = _engine(tmp_path / "second.db")
+    generate(again, TINY, seed=7)
+    assert _dump(again) == _dump(engine)
+
+    other = _engine(tmp_path / "third.db")
+    generate(other, TINY, seed=8)
+    assert _dump(other)["visits"] != _dump(engine)["visits"]
+    again.dispose()
+    other.dispose()
+
+
+def test_rows_are_consistent(generated):
+    engine, _, _ = generated
+    with engine.connect() as conn:
+        assert conn.execute(text("PRAGMA foreign_key_check")).all() == []
+        orphans = conn.scalar(
+            text(
+                "SELECT count(*) FROM visits v LEFT JOIN doctors d ON d.id = v.doctor_id "
+                "LEFT JOIN pharmacies p ON p.id = v.pharmacy_id WHERE d.id IS NULL AND p.id IS NULL"
+            )
+        )
+        assert orphans == 0
+        totals = conn.execute(
+            text(
+                "SELECT o.total_amount, sum(l.price * l.quantity * (100 - l.discount) / 100), count(*) "
+                "FROM orders o JOIN order_lines l ON l.order_id = o.id GROUP BY o.id"
+            )
+        ).all()
+    assert len(totals) == TINY.orders
+    # Each line total is rounded to cents before summing.
+    assert all(abs(stored - summed) <= 0.01 * lines for stored, summed, lines in totals)
+
+
+def test_ledger_files_have_the_expected_layout(generated):
+    _, counts, tmp_path = generated
+    files = sorted(path.name for path in (tmp_path / "ledger").iterdir())
+    assert files == ["ledger_2024_acc.sqlite", "ledger_2024_other.sqlite", "ledger_2024_stc.sqlite"]
+
+    acc = {table["name"]: table for table in analyze_sqlite(tmp_path / "ledger" / "ledger_2024_acc.sqlite")["tables"]}
+    assert {"customers", "invoices"} <= set(acc)
+    assert acc["customers"]["row_count"] == TINY.pharmacies
+    assert [column["name"] for column in acc["invoices"]["columns"]] == ["number", "date", "customer_id", "net"]
+    documents = sum(counts[f"ledger_{table}"] for table in ("invoices", "returns", "receipts", "cheques"))
+    assert documents == TINY.ledger_documents
+    assert legacy_account_id(0) == "P000001"